@@ -0,0 +1,193 @@
+import fcntl
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import namedtuple
+
+import chess
+import chess.polyglot
+
+# Başlık: sihirli dizi(8) sürüm(4) kova sayısı(4), toplam 16 byte
+HEADER = struct.Struct("<8sII")
+MAGIC = b"OXYACACH"
+VERSION = 1
+
+# Yuva: kontrol(8) + veri(16). kontrol = anahtar ^ veri[0:8] ^ veri[8:16]
+# veri: hamle(2) skor(2) derinlik(1) boş(1) damga(4, saat) düğüm(4) dolgu(2)
+SLOT = struct.Struct("<QHhBxII2x")
+WORDS = struct.Struct("<QQQ")
+BUCKET_SLOTS = 4
+BUCKET_SIZE = SLOT.size * BUCKET_SLOTS
+
+MATE_SCORE = 32000
+
+CacheHit = namedtuple("CacheHit", "move score depth nodes age")
+
+
+def encode_move(move):
+    promo = move.promotion - 1 if move.promotion else 0
+    return move.from_square | (move.to_square << 6) | (promo << 12)
+
+
+def decode_move(raw):
+    promo = (raw >> 12) & 0x7
+    return chess.Move(raw & 0x3f, (raw >> 6) & 0x3f, promo + 1 if promo else None)
+
+
+def _hours():
+    return int(time.time() // 3600)
+
+
+class AnalysisCache:
+    """
+    Maçlar ve yeniden başlatmalar arasında kalıcı analiz önbelleği:
+    Zobrist anahtarı -> (en iyi hamle, skor, derinlik, düğüm).
+
+    Dosya sabit boyutlu bir hash tablosudur (4 yuvalı kovalar) ve mmap ile
+    paylaşılır; boyutu açılışta belirlenir, hiç büyümez. Kovada yer yoksa
+    önceliği en düşük yuva ezilir: öncelik = derinlik - yaş / AGE_HOURS_PER_PLY.
+    MAX_AGE_HOURS'tan eski girdiler okunmaz ve boş sayılır.
+
+    Yazımlar kilitsizdir (Hyatt'ın XOR yöntemi): anahtar, verinin iki kelimesiyle
+    XOR'lanarak saklanır; yarım kalmış ya da başka süreçle çakışmış bir yazım
+    okurken kontrol tutmadığı için ıskalama olur. Böylece aynı dosyayı hem
+    eşzamanlı maçlar hem de üst üste binen iki bot süreci güvenle kullanır.
+
+    Skor hamle sırası olan tarafın bakış açısından cp'dir; mat ±(32000 - ply).
+    """
+
+    AGE_HOURS_PER_PLY = 24
+    MAX_AGE_HOURS = 24 * 30
+
+    def __init__(self, path, size_mb=16):
+        self.path = path
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "skipped": 0}
+
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)   # Aynı anda açan iki süreç başlığı birlikte yazmasın
+            self.buckets = self._prepare(fd, max(1, (size_mb << 20) // BUCKET_SIZE))
+            self._mmap = mmap.mmap(fd, HEADER.size + self.buckets * BUCKET_SIZE)
+        finally:
+            # mmap fd'nin kopyasını tuttuğu için kilit kapanışta bırakılmaz, açıkça çözülür
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+        try:
+            self._mmap.madvise(mmap.MADV_RANDOM)
+        except (AttributeError, OSError):
+            pass
+
+    @staticmethod
+    def _prepare(fd, buckets):
+        """Geçerli başlık varsa onun boyutunu kullanır, yoksa dosyayı sıfırdan kurar."""
+        size = os.fstat(fd).st_size
+        if size >= HEADER.size:
+            magic, version, existing = HEADER.unpack(os.pread(fd, HEADER.size, 0))
+            if magic == MAGIC and version == VERSION and size == HEADER.size + existing * BUCKET_SIZE:
+                return existing
+        os.ftruncate(fd, 0)
+        os.ftruncate(fd, HEADER.size + buckets * BUCKET_SIZE)
+        os.pwrite(fd, HEADER.pack(MAGIC, VERSION, buckets), 0)
+        return buckets
+
+    @classmethod
+    def open(cls, path, **kwargs):
+        """Dosya açılamazsa None döndürür (bot önbelleksiz devam eder)."""
+        if not path:
+            return None
+        try:
+            return cls(path, **kwargs)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Analiz önbelleği açılamadı ({path}): {e}", flush=True)
+            return None
+
+    def close(self):
+        self._mmap.flush()
+        self._mmap.close()
+
+    # --- Yuva erişimi ---
+    def _bucket(self, key):
+        return HEADER.size + (key % self.buckets) * BUCKET_SIZE
+
+    def _read(self, offset, key):
+        """Yuva bu anahtara aitse (raw_move, score, depth, stamp, nodes), değilse None."""
+        check, d0, d1 = WORDS.unpack_from(self._mmap, offset)
+        if check ^ d0 ^ d1 != key:
+            return None
+        _, raw_move, score, depth, stamp, nodes = SLOT.unpack_from(self._mmap, offset)
+        return raw_move, score, depth, stamp, nodes
+
+    def _write(self, offset, key, raw_move, score, depth, stamp, nodes):
+        data = SLOT.pack(0, raw_move, score, depth, stamp, nodes)
+        _, d0, d1 = WORDS.unpack(data)
+        self._mmap[offset:offset + SLOT.size] = WORDS.pack(key ^ d0 ^ d1, d0, d1)
+
+    def _priority(self, offset, now):
+        check, d0, d1 = WORDS.unpack_from(self._mmap, offset)
+        if check == d0 == d1 == 0:
+            return -1e9
+        _, _, _, depth, stamp, _ = SLOT.unpack_from(self._mmap, offset)
+        age = now - stamp
+        if age > self.MAX_AGE_HOURS or age < 0:
+            return -1e9
+        return depth - age / self.AGE_HOURS_PER_PLY
+
+    # --- Sorgu / kayıt ---
+    def probe(self, board):
+        """Pozisyonun kaydı varsa ve hamlesi yasalsa CacheHit, yoksa None."""
+        key = chess.polyglot.zobrist_hash(board)
+        base = self._bucket(key)
+        now = _hours()
+        for i in range(BUCKET_SLOTS):
+            found = self._read(base + i * SLOT.size, key)
+            if found is None: continue
+            raw_move, score, depth, stamp, nodes = found
+            if now - stamp > self.MAX_AGE_HOURS: break
+            move = decode_move(raw_move)
+            if not board.is_legal(move): break   # Zobrist çakışması
+            with self._lock:
+                if stamp != now:   # Sık kullanılan girdi tazelenir, yaşlanıp ezilmez
+                    self._write(base + i * SLOT.size, key, raw_move, score, depth, now, nodes)
+                self.stats["hits"] += 1
+            return CacheHit(move, score, depth, nodes, now - stamp)
+        self.stats["misses"] += 1
+        return None
+
+    def store(self, board, move, score, depth, nodes=0):
+        """
+        Arama sonucunu yazar. Aynı pozisyonun daha derin (ve taze) kaydı
+        varsa dokunulmaz; yoksa kovanın en düşük öncelikli yuvası kullanılır.
+        """
+        if move is None or not depth: return False
+        key = chess.polyglot.zobrist_hash(board)
+        base = self._bucket(key)
+        now = _hours()
+        score = max(-MATE_SCORE, min(MATE_SCORE, int(score or 0)))
+        depth, nodes = min(255, depth), min(0xFFFFFFFF, nodes or 0)
+        with self._lock:
+            victim, lowest = base, None
+            for i in range(BUCKET_SLOTS):
+                offset = base + i * SLOT.size
+                found = self._read(offset, key)
+                if found is not None:
+                    if found[2] > depth and now - found[3] <= self.MAX_AGE_HOURS:
+                        self.stats["skipped"] += 1
+                        return False
+                    victim = offset
+                    break
+                priority = self._priority(offset, now)
+                if lowest is None or priority < lowest:
+                    victim, lowest = offset, priority
+            self._write(victim, key, encode_move(move), score, depth, now, nodes)
+            self.stats["stores"] += 1
+        return True
+
+    def store_result(self, board, move, info):
+        """python-chess arama sonu info'sundan kayıt (skor yoksa yazılmaz)."""
+        score = (info or {}).get("score")
+        if score is None: return False
+        return self.store(board, move, score.relative.score(mate_score=MATE_SCORE),
+                          info.get("depth", 0), info.get("nodes", 0))
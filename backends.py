@@ -0,0 +1,106 @@
+import json
+import math
+import os
+import platform
+import time
+
+from resources import MOVES_LEFT, parse_tc
+
+# hce : el yapımı değerlendirme (+ piyon-şah ağı), USE_NNUE=0 derlemesi
+# nnue: gömülü ağ (makefile EVALFILE / incbin), USE_NNUE=1 derlemesi
+BACKENDS = ("hce", "nnue")
+
+
+def per_move_ms(base, inc):
+    """Tempodan hamle başı tahmini düşünme süresi (ms); resources.affordable ile aynı tahmin."""
+    return 1000.0 * (base / MOVES_LEFT + inc)
+
+
+def tc_key(base, inc):
+    """(180, 2) -> '3+2' (matchmaking TIME_CONTROLS biçimi)."""
+    return f"{base / 60:g}+{inc:g}"
+
+
+def cpu_model():
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+class RoutingTable:
+    """
+    Tempo -> değerlendirme arka ucu (hce / nnue) tablosu.
+
+    tools/backend_bench.py bu makinede iki derlemenin nps'ini, derinliğe
+    ulaşma süresini ve sabit hamle süresinde birbirine karşı gücünü ölçer;
+    tablo bu ölçümlerden üretilir. `strength` noktaları (movetime_ms, elo):
+    NNUE'nun HCE'ye karşı o hamle süresindeki Elo farkı. Her tempo kendi hamle
+    başı süresinde (per_move_ms) Elo farkı `margin`'i aşıyorsa NNUE'ya gider.
+    Tabloda olmayan tempolarda aynı kural ölçüm noktaları arasında log(süre)
+    üzerinden doğrusal ara değerle uygulanır (aralık dışında en yakın nokta).
+    """
+
+    def __init__(self, routes=None, strength=None, margin=0.0, cpu=None, bench=None, created_at=None):
+        self.routes = dict(routes or {})
+        self.strength = sorted(strength or [], key=lambda p: p["movetime_ms"])
+        self.margin = margin
+        self.cpu = cpu
+        self.bench = bench or {}
+        self.created_at = created_at
+
+    @classmethod
+    def from_measurements(cls, strength, time_controls, margin=0.0, bench=None):
+        table = cls(strength=strength, margin=margin, cpu=cpu_model(), bench=bench, created_at=int(time.time()))
+        table.routes = {tc: table.route(per_move_ms(*parse_tc(tc))) for tc in time_controls}
+        return table
+
+    @classmethod
+    def load(cls, path):
+        """Dosya yoksa / okunamıyorsa None (tüm maçlar HCE)."""
+        if not path or not os.path.exists(path): return None
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            table = cls(data.get("routes"), data.get("strength"), data.get("margin", 0.0),
+                        data.get("cpu"), data.get("bench"), data.get("created_at"))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"⚠️ Arka uç tablosu okunamadı ({path}): {e}", flush=True)
+            return None
+        if table.cpu and table.cpu != cpu_model():
+            print(f"⚠️ Arka uç tablosu başka bir CPU'da ölçülmüş ({table.cpu}); tools/backend_bench.py ile yenileyin.", flush=True)
+        return table
+
+    def save(self, path):
+        data = {"cpu": self.cpu, "created_at": self.created_at, "margin": self.margin,
+                "bench": self.bench, "strength": self.strength, "routes": self.routes}
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+
+    def nnue_elo(self, move_ms):
+        """Verilen hamle süresinde NNUE - HCE Elo farkı tahmini (ölçüm yoksa None)."""
+        points = self.strength
+        if not points: return None
+        if move_ms <= points[0]["movetime_ms"]: return points[0]["elo"]
+        if move_ms >= points[-1]["movetime_ms"]: return points[-1]["elo"]
+        for lo, hi in zip(points, points[1:]):
+            if move_ms <= hi["movetime_ms"]:
+                t = math.log(move_ms / lo["movetime_ms"]) / math.log(hi["movetime_ms"] / lo["movetime_ms"])
+                return lo["elo"] + t * (hi["elo"] - lo["elo"])
+
+    def route(self, move_ms):
+        elo = self.nnue_elo(move_ms)
+        return "nnue" if elo is not None and elo > self.margin else "hce"
+
+    def backend_for(self, base, inc):
+        """Tempo (sn) için arka uç: önce üretilmiş tablo, yoksa ölçümlerden ara değer."""
+        return self.routes.get(tc_key(base, inc)) or self.route(per_move_ms(base, inc))
+
+    def backends(self):
+        """Tablonun kullandığı arka uçlar (BACKENDS sırasıyla)."""
+        used = set(self.routes.values()) | {self.route(p["movetime_ms"]) for p in self.strength}
+        return tuple(b for b in BACKENDS if b in used) or ("hce",)
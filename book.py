@@ -0,0 +1,179 @@
+import bisect
+import mmap
+import os
+import struct
+import threading
+from array import array
+from collections import OrderedDict
+
+import chess
+import chess.polyglot
+
+# Polyglot girdisi: key(8) move(2) weight(2) learn(4), big-endian, 16 byte
+ENTRY = struct.Struct(">QHHI")
+KEY = struct.Struct(">Q")
+
+# Polyglot rok hamlelerini "şah kaleyi alır" şeklinde kodlar
+_CASTLING = {
+    (chess.E1, chess.H1): chess.G1, (chess.E1, chess.A1): chess.C1,
+    (chess.E8, chess.H8): chess.G8, (chess.E8, chess.A8): chess.C8,
+}
+
+
+class PolyglotBook:
+    """
+    Açılış kitabını bir kez belleğe eşler (mmap) ve tüm maç thread'leri
+    arasında paylaşılır. Her hamlede dosyayı yeniden açmak yerine:
+      - Seyrek bir anahtar indeksi (her INDEX_STRIDE girdide bir) RAM'de tutulur,
+        böylece ikili arama diskte sadece tek bir bloğa dokunur.
+      - mmap üzerinde kopyasız (unpack_from) ikili arama yapılır.
+      - Pozisyon -> girdiler sonuçları LRU önbellekte saklanır.
+    """
+
+    INDEX_STRIDE = 1024
+
+    def __init__(self, path, cache_size=4096):
+        self.path = path
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.cache_hits = 0
+
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            self._mmap = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+
+        if len(self._mmap) % ENTRY.size:
+            raise IOError(f"Geçersiz polyglot kitabı: {path}")
+        try:
+            self._mmap.madvise(mmap.MADV_RANDOM)
+        except (AttributeError, OSError):
+            pass
+
+        self._size = len(self._mmap) // ENTRY.size
+        self._index = array('Q', (KEY.unpack_from(self._mmap, i * ENTRY.size)[0]
+                                  for i in range(0, self._size, self.INDEX_STRIDE)))
+
+    @classmethod
+    def open(cls, path, **kwargs):
+        """Kitap yoksa veya bozuksa None döndürür (bot kitapsız devam eder)."""
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            return cls(path, **kwargs)
+        except (IOError, OSError, ValueError) as e:
+            print(f"⚠️ Kitap yüklenemedi ({path}): {e}", flush=True)
+            return None
+
+    def __len__(self):
+        return self._size
+
+    def close(self):
+        self._mmap.close()
+
+    def _lower_bound(self, key):
+        # Önce RAM'deki indeksle bloğu bul, sonra sadece o blokta ara
+        block = bisect.bisect_left(self._index, key)
+        lo = max(0, block - 1) * self.INDEX_STRIDE
+        hi = min(self._size, block * self.INDEX_STRIDE)
+        buf = self._mmap
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if KEY.unpack_from(buf, mid * ENTRY.size)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _scan(self, key):
+        entries = []
+        i = self._lower_bound(key)
+        while i < self._size:
+            k, raw_move, weight, _ = ENTRY.unpack_from(self._mmap, i * ENTRY.size)
+            if k != key: break
+            entries.append((raw_move, weight))
+            i += 1
+        return tuple(entries)
+
+    def entries(self, key):
+        """Zobrist anahtarına ait (raw_move, weight) girdilerini döndürür."""
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return cached
+
+        found = self._scan(key)
+
+        with self._lock:
+            self._cache[key] = found
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return found
+
+    @staticmethod
+    def decode(board, raw_move):
+        to_sq = raw_move & 0x3f
+        from_sq = (raw_move >> 6) & 0x3f
+        promo = (raw_move >> 12) & 0x7
+        if not board.chess960 and board.piece_type_at(from_sq) == chess.KING:
+            to_sq = _CASTLING.get((from_sq, to_sq), to_sq)
+        return chess.Move(from_sq, to_sq, promo + 1 if promo else None)
+
+    def best_move(self, board):
+        """En yüksek ağırlıklı yasal kitap hamlesini (move, weight) olarak döndürür."""
+        best = None
+        for raw_move, weight in self.entries(chess.polyglot.zobrist_hash(board)):
+            if weight < 1 or (best and weight <= best[1]): continue
+            move = self.decode(board, raw_move)
+            if board.is_legal(move):
+                best = (move, weight)
+
+        if best: self.hits += 1
+        else: self.misses += 1
+        return best
+
+
+class BookStack:
+    """
+    Katmanlı kitap: önce kendi maçlarımızdan derlenen overlay
+    (tools/book_builder.py), sonra ana kitap. Pozisyonda yasal girdisi olan
+    ilk kitap karar verir; overlay'in ağırlığını 0'a çektiği (bizde kaybeden)
+    hamleler alttaki kitaba düşüp yine de oynanmaz.
+    """
+
+    def __init__(self, books):
+        self.books = books   # [(ad, PolyglotBook)], öncelik sırasıyla
+        self.hits = {name: 0 for name, _ in books}
+        self.misses = 0
+
+    @classmethod
+    def open(cls, *named_paths):
+        """(ad, yol) çiftlerinden açılabilenleri yığar; hiçbiri yoksa None."""
+        books = [(name, book) for name, path in named_paths if (book := PolyglotBook.open(path))]
+        return cls(books) if books else None
+
+    def close(self):
+        for _, book in self.books:
+            book.close()
+
+    def probe(self, board):
+        """(move, weight, kitap adı) ya da None."""
+        key = chess.polyglot.zobrist_hash(board)
+        for name, book in self.books:
+            legal = [(move, weight) for raw_move, weight in book.entries(key)
+                     if board.is_legal(move := book.decode(board, raw_move))]
+            if not legal: continue
+            move, weight = max(legal, key=lambda e: e[1])
+            if weight < 1: break
+            self.hits[name] += 1
+            return move, weight, name
+        self.misses += 1
+        return None
+
+    def best_move(self, board):
+        found = self.probe(board)
+        return found[:2] if found else None
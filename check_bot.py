@@ -1,10 +1,10 @@
+import asyncio
 import chess
 import os
 import sys
 import importlib.util
-import time
 
-def run_diagnostic():
+async def run_diagnostic():
     print("🛠️ Oxydan V4 Pre-Flight Diagnostics...")
     
     # 1. Dosya Yollarını Tanımla
@@ -35,12 +35,13 @@ def run_diagnostic():
         # 4. Motor Havuzu Başlatma Testi (Düşük Hash ile)
         # UCI ayarlarını V4'ün beklediği formatta gönderiyoruz
         bot = OxydanAegisV4(exe_path, uci_options={"Hash": 16, "Threads": 1})
+        await bot.start()
         board = chess.Board()
         
         # 5. Hamle Üretme Testi
         print("♟️ Testing pool-based engine move generation...")
         # V4 yapısında get_best_move artık havuzdan motor çekiyor
-        move = bot.get_best_move(board, 10000, 10000, 1000, 1000)
+        move = await bot.get_best_move(board, 10000, 10000, 1000, 1000)
         
         if move and move in board.legal_moves:
             print(f"✅ SUCCESS: Engine produced legal move: {move.uci()}")
@@ -48,24 +49,11 @@ def run_diagnostic():
             # --- KRİTİK DEĞİŞİKLİK: HAVUZU GÜVENLİ BOŞALTMA ---
             print("🧹 Cleaning up engine pool processes...")
             
-            # Havuzdaki tüm motorları tek tek çek ve kapat
-            closed_engines = 0
-            while not bot.engine_pool.empty():
-                try:
-                    # Motoru havuzdan al
-                    engine = bot.engine_pool.get_nowait()
-                    
-                    # Motorun kapanması için QUIT komutu gönder ve kısa bir süre bekle
-                    engine.quit() 
-                    closed_engines += 1
-                except Exception as e:
-                    print(f"⚠️ Bir motor kapatılırken hata oluştu: {e}")
-                finally:
-                    # Havuz mantığında her get() için task_done() çağırmak iyidir
-                    bot.engine_pool.task_done()
+            # Havuzdaki (boşta veya maça sabitli) tüm motorlara QUIT gönder
+            closed_engines = await bot.close()
 
             # İşletim sistemine motorların kapanması için zaman tanı
-            time.sleep(1) 
+            await asyncio.sleep(1) 
             print(f"✅ {closed_engines} motor başarıyla kapatıldı ve süreçler temizlendi.")
             print("✅ Diagnostics passed. Ready for deployment.")
             
@@ -75,5 +63,9 @@ def run_diagnostic():
             print("❌ ERROR: Engine failed to produce a valid move!")
             sys.exit(1)
 
+    except Exception as e:
+        print(f"❌ ERROR: Diagnostics failed: {e}")
+        sys.exit(1)
+
 if __name__ == "__main__":
-    run_diagnostic()
+    asyncio.run(run_diagnostic())
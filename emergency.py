@@ -0,0 +1,125 @@
+import time
+
+import chess
+
+# Sığ arama için taş değerleri (cp)
+VALUES = {chess.PAWN: 100, chess.KNIGHT: 320, chess.BISHOP: 330, chess.ROOK: 500, chess.QUEEN: 900, chess.KING: 0}
+MATE = 100000
+
+
+class _Timeout(Exception):
+    pass
+
+
+def pv_move(board, last_pv):
+    """
+    Son motor aramasının PV'si bu pozisyona geldiysek (biz PV[0] oynadık, rakip
+    PV[1] ile cevap verdi) hazır cevap PV[2]'dir; değilse None.
+    """
+    if not last_pv: return None
+    ply, pv = last_pv
+    if len(pv) < 3 or len(board.move_stack) != ply + 2 or board.move_stack[-2:] != pv[:2]:
+        return None
+    return pv[2] if board.is_legal(pv[2]) else None
+
+
+def material(board):
+    """Sıradaki tarafın bakışından malzeme farkı."""
+    white, black = board.occupied_co[chess.WHITE], board.occupied_co[chess.BLACK]
+    score = 0
+    for piece_type, value in VALUES.items():
+        mask = board.pieces_mask(piece_type, chess.WHITE) | board.pieces_mask(piece_type, chess.BLACK)
+        score += value * (chess.popcount(mask & white) - chess.popcount(mask & black))
+    return score if board.turn == chess.WHITE else -score
+
+
+def _ordered(board, moves):
+    # MVV-LVA: önce değerli taşı ucuz taşla alan hamleler, sonra terfiler
+    def key(move):
+        victim = board.piece_type_at(move.to_square) or (chess.PAWN if board.is_en_passant(move) else None)
+        gain = 10 * VALUES[victim] - VALUES[board.piece_type_at(move.from_square)] if victim else 0
+        return -(gain + (VALUES[move.promotion] if move.promotion else 0))
+    return sorted(moves, key=key)
+
+
+class _Search:
+    """
+    Malzeme değerlendirmeli, alma-aramalı (quiescence) alfa-beta. Süre dolunca
+    _Timeout fırlatır ve tahtayı yarıda bırakır; bu yüzden kopyası üzerinde çalışır.
+    """
+
+    def __init__(self, board, deadline):
+        self.board = board
+        self.deadline = deadline
+        self.nodes = 0
+
+    def _tick(self):
+        self.nodes += 1
+        if self.nodes & 63 == 0 and time.monotonic() > self.deadline:
+            raise _Timeout
+
+    def quiesce(self, alpha, beta, depth=0):
+        self._tick()
+        stand = material(self.board)
+        if stand >= beta or depth >= 6: return stand
+        alpha = max(alpha, stand)
+        captures = [m for m in self.board.legal_moves if self.board.is_capture(m) or m.promotion]
+        for move in _ordered(self.board, captures):
+            self.board.push(move)
+            score = -self.quiesce(-beta, -alpha, depth + 1)
+            self.board.pop()
+            if score >= beta: return score
+            alpha = max(alpha, score)
+        return alpha
+
+    def negamax(self, depth, alpha, beta, ply):
+        self._tick()
+        board = self.board
+        if ply and (board.is_repetition(2) or board.halfmove_clock >= 100): return 0
+        moves = list(board.legal_moves)
+        if not moves: return -MATE + ply if board.is_check() else 0
+        if depth <= 0: return self.quiesce(alpha, beta)
+        best = -MATE
+        for move in _ordered(board, moves):
+            board.push(move)
+            score = -self.negamax(depth - 1, -beta, -alpha, ply + 1)
+            board.pop()
+            if score > best: best = score
+            if score > alpha: alpha = score
+            if alpha >= beta: break
+        return best
+
+    def root(self, depth, first):
+        """Önceki derinliğin en iyi hamlesi önce denenir; (hamle, skor)."""
+        board = self.board
+        moves = _ordered(board, list(board.legal_moves))
+        if first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+        best, alpha = None, -MATE - 1
+        for move in moves:
+            board.push(move)
+            score = -self.negamax(depth - 1, -MATE - 1, -alpha, 1)
+            board.pop()
+            if score > alpha: best, alpha = move, score
+        return best, alpha
+
+
+def quick_search(board, budget):
+    """
+    Motor yokken süreç içi sığ arama: derinlik 1'den başlayarak `budget`
+    saniye dolana kadar derinleşir, son tamamlanan derinliğin hamlesini verir.
+    (hamle, derinlik) döndürür; tahta değiştirilmez.
+    """
+    board = board.copy()
+    search = _Search(board, time.monotonic() + budget)
+    moves = list(board.legal_moves)
+    best, depth = (moves[0] if moves else None), 0
+    try:
+        for d in range(1, 64):
+            move, score = search.root(d, best)
+            best, depth = move, d
+            if abs(score) >= MATE - 64: break   # Mat bulundu
+    except _Timeout:
+        pass
+    return best, depth
@@ -0,0 +1,323 @@
+import asyncio
+import json
+import time
+from collections import deque
+
+import chess.engine
+
+
+def parse_tthits(info):
+    """Motorun arama sonunda yazdığı 'info string tthits X nodes Y' satırını okur."""
+    tokens = (info or {}).get("string", "").split()
+    if len(tokens) >= 4 and tokens[0] == "tthits" and tokens[2] == "nodes":
+        try: return int(tokens[1]), int(tokens[3])
+        except ValueError: pass
+    return None
+
+
+def check_options(options, wanted):
+    """
+    İstenen UCI ayarlarını motorun `uci` cevabındaki `option` listesine göre
+    ayıklar: (geçerli ayarlar, sorunlar). Bilinmeyen ayar, aralık dışı değer
+    ve python-chess'in kendisi yönettiği ayarlar (Ponder, MultiPV...) atlanır.
+    """
+    valid, problems = {}, []
+    for name, value in wanted.items():
+        opt = options.get(name)
+        if opt is None:
+            problems.append(f"{name}: motor bu ayarı bildirmiyor")
+        elif opt.is_managed():
+            problems.append(f"{name}: python-chess tarafından yönetiliyor")
+        else:
+            try: valid[opt.name] = opt.parse(value)
+            except chess.engine.EngineError as e: problems.append(f"{name}={value!r}: {e}")
+    return valid, problems
+
+
+class EngineScheduler:
+    """
+    Maç-motor eşleştirici. Her maça ilk hamlesinde bir motor sabitlenir ve maç
+    bitene kadar o maçın hamleleri hep aynı motorda aranır; böylece
+    transpozisyon tablosu (Hash) hamleler arasında sıcak kalır.
+
+    Açılış: motorlar eşzamanlı başlatılır, start() ilk motor readyok verdiği
+    anda döner. Diğerleri arka planda açılıp hazır oldukça havuza katılır;
+    yeni maç boş motor yoksa ilk hazır olanı bekler.
+
+    Havuzdaki fazladan motor yedektir: sabitlenen motor çökerse maç yedeğe
+    geçer. Kapanan her motor süreci (boşta ya da maçta) arka planda yenisiyle
+    değiştirilir; hiçbir maç yeniden başlatmayı beklemez. Yeni maçın ilk
+    aramasında python-chess `game=` anahtarı değiştiği için ucinewgame gönderilir.
+
+    Motorlar chess.engine'in asyncio protokolüyle (popen_uci) sürülür;
+    motor başına ayrı olay döngüsü thread'i yoktur.
+    """
+
+    RESTART_DELAYS = (0, 1, 4)   # Üst üste başarısız yeniden başlatma denemeleri arası (sn)
+
+    def __init__(self, exe_path, uci_options=None, size=3, timeout=30, stats_path=None, metrics=None):
+        self.exe_path = exe_path
+        self.uci_options = uci_options or {}
+        self.timeout = timeout
+        self.stats_path = stats_path
+        self.metrics = metrics
+        self.size = size
+        self._free = asyncio.Queue()
+        self._live = set()       # Süreci çalışan motorlar (boşta + sabitli)
+        self._pinned = {}
+        self._stats = {}
+        self._tasks = set()
+        self._closing = False
+        self.options = None      # Motorun kabul ettiği ayarlar (ilk motorda belirlenir)
+        self.option_problems = []
+        self.last_error = None
+        # Açılış süreleri: ilk motorun hazır olması ve motor başına popen -> readyok
+        self.startup = {"first_ready": None, "engines": []}
+        # Yeni maçın boş motor için beklediği süreler (yük testi / tavan ölçümü)
+        self.waits = deque(maxlen=4096)
+
+    async def start(self):
+        """Tüm motorları eşzamanlı başlatır, ilk motor hazır olunca döner."""
+        started = time.monotonic()
+        pending = {self._launch() for _ in range(self.size)}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            if any(not t.cancelled() and t.result() is not None for t in done):
+                self.startup["first_ready"] = round(time.monotonic() - started, 3)
+                if self.metrics: self.metrics.stage("pool_first_ready", self.startup["first_ready"])
+                return
+        raise RuntimeError(f"hiçbir motor açılamadı: {self.last_error}")
+
+    def _check(self, eng):
+        if self.options is None:
+            self.options, self.option_problems = check_options(eng.options, self.uci_options)
+            for problem in self.option_problems:
+                print(f"⚠️ UCI ayarı atlandı: {problem}", flush=True)
+        return self.options
+
+    async def _spawn(self):
+        started = time.monotonic()
+        transport, eng = await asyncio.wait_for(chess.engine.popen_uci(self.exe_path), self.timeout)
+        try:
+            await asyncio.wait_for(eng.configure(self._check(eng)), self.timeout)
+            # isready -> readyok: Hash ayrıldı, Syzygy yüklendi, arama alabilir
+            await asyncio.wait_for(eng.ping(), self.timeout)
+        except BaseException:
+            transport.close()
+            raise
+        elapsed = time.monotonic() - started
+        self.startup["engines"].append(round(elapsed, 3))
+        if self.metrics: self.metrics.stage("engine_start", elapsed)
+        return eng
+
+    async def _join(self):
+        """Bir motor açar ve havuza katar; başarısızsa None."""
+        try:
+            eng = await self._spawn()
+        except Exception as e:
+            self.last_error = e
+            if self.metrics: self.metrics.inc("engine_start_failures")
+            print(f"🚨 Motor açılamadı: {e!r}", flush=True)
+            return None
+        if self._closing:
+            await self._quit(eng)
+            return None
+        self._live.add(eng)
+        eng.returncode.add_done_callback(lambda _: self._exited(eng))
+        self._free.put_nowait(eng)
+        return eng
+
+    def _launch(self, coro=None):
+        task = asyncio.create_task(coro or self._join())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _exited(self, eng):
+        """Motor süreci kapandı: kapanış değilse arka planda yenisini aç."""
+        self._live.discard(eng)
+        if self._closing: return
+        if self.metrics: self.metrics.inc("engine_restarts")
+        print(f"🔧 Motor süreci kapandı (kod {eng.returncode.result()}), yenisi arka planda açılıyor.", flush=True)
+        self._launch(self._restart())
+
+    async def _restart(self):
+        for delay in self.RESTART_DELAYS:
+            await asyncio.sleep(delay)
+            if self._closing or await self._join() is not None: return
+        print("🚨 Motor yeniden başlatılamadı, havuz bir motor eksik çalışıyor.", flush=True)
+
+    # --- Kiralama ---
+    async def acquire(self, game_id):
+        """Maçın sabit motorunu döndürür; yoksa boştaki bir motoru maça sabitler."""
+        engine = self._pinned.get(game_id)
+        if engine is not None:
+            return engine
+
+        started = time.monotonic()
+        engine = await self._free.get()
+        while engine not in self._live:   # Boştayken kapanmış; yerine yenisi açılıyor
+            engine = await self._free.get()
+        self.waits.append(time.monotonic() - started)
+        if game_id is None:
+            return engine  # Maçsız (tek seferlik) kullanım, release() ile geri verilir
+        self._pinned[game_id] = engine
+        self._stats.setdefault(game_id, {"moves": 0, "nodes": 0, "tthits": 0, "crashes": 0})
+        return engine
+
+    def pinned(self, game_id):
+        return self._pinned.get(game_id)
+
+    def owns(self, engine):
+        """Motor bu havuzun çalışan süreçlerinden biri mi."""
+        return engine in self._live
+
+    def release(self, game_id, engine):
+        """Maçsız kiralanan motoru havuza iade eder (sabitli motorlar maçta kalır)."""
+        if game_id is None:
+            self._free.put_nowait(engine)
+
+    async def replace(self, game_id, engine):
+        """
+        Çöken motoru kapatır, maçı (veya tek seferlik kullanımı) boştaki motora
+        taşır. Yeni motoru süreç çıkış geri çağrısı (_exited) arka planda açar.
+        """
+        if self._pinned.get(game_id) is engine: del self._pinned[game_id]
+        if game_id in self._stats: self._stats[game_id]["crashes"] += 1
+        try: engine.transport.close()
+        except Exception: pass
+        print(f"♻️ [{game_id}] Motor çöktü, yedek motora geçiliyor.", flush=True)
+        return await self.acquire(game_id)
+
+    def finish_game(self, game_id):
+        """Maç bitti: motoru havuza döndürür ve maçın Hash istatistiğini yayınlar."""
+        engine = self._pinned.pop(game_id, None)
+        stats = self._stats.pop(game_id, None)
+        if engine is not None:
+            self._free.put_nowait(engine)
+        if stats and stats["moves"]:
+            self._export(game_id, stats)
+        return stats
+
+    # --- İstatistik ---
+    def record(self, game_id, info):
+        """Bir aramanın TT isabet sayısını maçın istatistiğine ekler."""
+        parsed = parse_tthits(info)
+        stats = self._stats.get(game_id)
+        if parsed is None or stats is None: return
+        tthits, nodes = parsed
+        stats["moves"] += 1
+        stats["nodes"] += nodes
+        stats["tthits"] += tthits
+
+    def game_stats(self, game_id):
+        return dict(self._stats.get(game_id, {}))
+
+    def _export(self, game_id, stats):
+        hit_rate = stats["tthits"] / max(1, stats["nodes"])
+        per_move = stats["tthits"] / stats["moves"]
+        print(f"♻️ [{game_id}] TT isabet oranı: %{100 * hit_rate:.1f} | Hamle başı yeniden kullanılan düğüm: {per_move:.0f}", flush=True)
+        if not self.stats_path: return
+        row = dict(stats, game_id=game_id, hit_rate=round(hit_rate, 4), tthits_per_move=round(per_move, 1), ts=int(time.time()))
+        try:
+            with open(self.stats_path, "a") as f:
+                f.write(json.dumps(row) + "\n")
+        except OSError:
+            pass
+
+    async def _quit(self, eng):
+        try: await asyncio.wait_for(eng.quit(), 5)
+        except Exception: pass
+
+    async def close(self):
+        self._closing = True
+        for task in list(self._tasks): task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        engines = list(self._live)
+        self._pinned.clear()
+        self._live.clear()
+        while not self._free.empty():
+            self._free.get_nowait()
+        await asyncio.gather(*(self._quit(eng) for eng in engines))
+        return len(engines)
+
+
+class BackendPool:
+    """
+    Karma motor havuzu: değerlendirme arka ucu (hce / nnue) başına ayrı bir
+    EngineScheduler. Maç ilk aramasından önce assign() ile tempoya göre bir
+    arka uca yönlendirilir (bkz. backends.RoutingTable) ve bitene kadar o
+    havuzun motorunu kullanır; atanmamış maç ve maçsız kullanım ilk havuza
+    gider. Arayüz EngineScheduler ile aynıdır.
+    """
+
+    def __init__(self, pools):
+        self.pools = dict(pools)
+        self.default = next(iter(self.pools))
+        self._routes = {}
+
+    @property
+    def options(self):
+        return self.pools[self.default].options
+
+    @property
+    def startup(self):
+        ready = [p.startup["first_ready"] for p in self.pools.values() if p.startup["first_ready"] is not None]
+        return {"first_ready": min(ready, default=None),
+                "engines": [t for p in self.pools.values() for t in p.startup["engines"]]}
+
+    @property
+    def waits(self):
+        return [w for p in self.pools.values() for w in p.waits]
+
+    async def start(self):
+        """Havuzlar eşzamanlı açılır; açılamayan arka ucun maçları ilk havuza düşer."""
+        results = await asyncio.gather(*(p.start() for p in self.pools.values()), return_exceptions=True)
+        for (backend, pool), result in zip(list(self.pools.items()), results):
+            if isinstance(result, BaseException):
+                print(f"🚨 {backend.upper()} havuzu açılamadı, maçları {self.default.upper()}'e yönlendiriliyor: {result}", flush=True)
+                await pool.close()
+                del self.pools[backend]
+        if not self.pools:
+            raise RuntimeError("hiçbir arka uç havuzu açılamadı")
+        self.default = next(iter(self.pools))
+
+    def assign(self, game_id, backend):
+        """Maçı arka uca yönlendirir (ilk atama geçerli); kullanılan arka ucu döndürür."""
+        if game_id not in self._routes:
+            self._routes[game_id] = backend if backend in self.pools else self.default
+        return self._routes[game_id]
+
+    def backend(self, game_id):
+        return self._routes.get(game_id, self.default)
+
+    def _pool(self, game_id):
+        return self.pools.get(self.backend(game_id)) or self.pools[self.default]
+
+    async def acquire(self, game_id):
+        return await self._pool(game_id).acquire(game_id)
+
+    def pinned(self, game_id):
+        return self._pool(game_id).pinned(game_id)
+
+    def release(self, game_id, engine):
+        if game_id is None:
+            owner = next((p for p in self.pools.values() if p.owns(engine)), self.pools[self.default])
+            owner.release(game_id, engine)
+
+    async def replace(self, game_id, engine):
+        return await self._pool(game_id).replace(game_id, engine)
+
+    def finish_game(self, game_id):
+        stats = self._pool(game_id).finish_game(game_id)
+        self._routes.pop(game_id, None)
+        return stats
+
+    def record(self, game_id, info):
+        self._pool(game_id).record(game_id, info)
+
+    def game_stats(self, game_id):
+        return self._pool(game_id).game_stats(game_id)
+
+    async def close(self):
+        return sum(await asyncio.gather(*(p.close() for p in self.pools.values())))
@@ -0,0 +1,64 @@
+import chess
+
+
+class GameSession:
+    """
+    Tek bir maçın tahtasını olaylar arasında canlı tutar.
+    Her gameState olayında tüm hamle listesini baştan oynamak yerine
+    sadece yeni gelen hamleleri uygular (O(n²) yerine O(n)).
+    """
+
+    def __init__(self, game_id, my_color=None, initial_fen=None, clock=None):
+        self.game_id = game_id
+        self.my_color = my_color
+        self.initial_fen = initial_fen if initial_fen and initial_fen != "startpos" else chess.STARTING_FEN
+        self.board = chess.Board(self.initial_fen)
+        self.moves = []        # Tahtaya uygulanmış hamleler (UCI)
+        self.rebuilds = 0      # Geri alma vb. yüzünden kaç kez sıfırdan kuruldu
+        self.out_of_book = False  # İlk kitap kaçırmasından sonra kitaba bakılmaz
+        self.ponder_expect = None  # (ply, [bizim hamle, beklenen cevap], başlangıç) ponder sürerken
+        self.last_pv = None        # (ply, PV) son motor aramasının ana varyantı (acil durum cevabı)
+        self.clock = clock         # (taban, artış) sn; saatsiz maçta None
+        self.backend = None        # Maçın değerlendirme arka ucu (karma havuzda ilk aramada seçilir)
+
+    @classmethod
+    def from_game_full(cls, game_id, event, my_id):
+        """gameFull olayından oturum oluşturur (renk, başlangıç FEN'i ve tempo dahil)."""
+        my_color = chess.WHITE if event.get('white', {}).get('id') == my_id else chess.BLACK
+        clock = event.get('clock')
+        if clock: clock = (clock.get('initial', 0) / 1000.0, clock.get('increment', 0) / 1000.0)
+        return cls(game_id, my_color=my_color, initial_fen=event.get('initialFen'), clock=clock or None)
+
+    def _rebuild(self, moves):
+        self.board = chess.Board(self.initial_fen)
+        self.moves = []
+        self.rebuilds += 1
+        self.out_of_book = False
+        self._apply(moves)
+
+    def _apply(self, moves):
+        for m in moves:
+            self.board.push_uci(m)
+            self.moves.append(m)
+
+    def sync(self, moves_str):
+        """
+        Lichess'ten gelen hamle dizisiyle tahtayı eşitler ve tahtayı döndürür.
+        Önek tutuyorsa yalnızca yeni hamleler oynanır; tutmuyorsa (takeback)
+        tahta baştan kurulur.
+        """
+        moves = moves_str.split() if moves_str else []
+        known = len(self.moves)
+
+        if len(moves) >= known and moves[:known] == self.moves:
+            try:
+                self._apply(moves[known:])
+                return self.board
+            except ValueError:
+                pass  # Beklenmedik hamle: güvenli yol, baştan kur
+
+        self._rebuild(moves)
+        return self.board
+
+    def is_my_turn(self):
+        return self.my_color is not None and self.board.turn == self.my_color
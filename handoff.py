@@ -0,0 +1,207 @@
+import asyncio
+import json
+import os
+import socket
+import time
+
+import chess
+import requests
+
+GITHUB_API = "https://api.github.com"
+MAX_STATE_CHARS = 8000   # workflow_dispatch input sınırının çok altında
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+        return True
+    except (OSError, TypeError):
+        return False
+
+
+class Handoff:
+    """
+    Yeniden başlatmada maç devri.
+
+    Çalışan örnek aktif maçları (id, renk, başlangıç FEN'i, son PV) küçük bir
+    JSON dosyasına periyodik olarak yazar. Yeni örnek eski örneğin kapanış anını
+    (takeover_at) bilerek erken başlar: motorlarını açar, süren maçlara
+    stream_game_state ile bağlanır ama bu ana kadar hamle yapmaz ve davet
+    kabul etmez (bekleme). Eski örnek tam bu anda durur, yenisi o andan
+    itibaren oynar; sınırda iki örneğin aynı pozisyona gönderdiği hamlelerden
+    biri 4xx alır ve reddedilmiş sayılır (bkz. move_sender.py).
+
+    Devir bilgisi iki yoldan gelir:
+      - aynı makinede: dosyayı yazan süreç hâlâ çalışıyorsa onun bitiş anı
+      - GitHub Actions'ta: önceki koşunun workflow_dispatch girdileri
+        (HANDOFF_TAKEOVER_AT, HANDOFF_STATE ortam değişkenleri)
+    """
+
+    def __init__(self, path, takeover_at=None, state=None):
+        self.path = path
+        self.takeover_at = takeover_at
+        self.games = (state or {}).get("games", {})
+        self.successor_confirmed = False   # Eski örnek: devralacak koşu çalışıyor mu?
+        self._listeners = []
+
+    @classmethod
+    def from_env(cls, path):
+        """Ortamda veya canlı bir sürecin dosyasında devir varsa bekleme modunda başlar."""
+        takeover_at = float(os.environ.get("HANDOFF_TAKEOVER_AT") or 0) or None
+        state = None
+        if os.environ.get("HANDOFF_STATE"):
+            try: state = json.loads(os.environ["HANDOFF_STATE"])
+            except ValueError: state = None
+        saved = cls.load(path)
+        if saved and takeover_at is None:
+            same_host = saved.get("host") == socket.gethostname() and saved.get("pid") != os.getpid()
+            if same_host and _pid_alive(saved.get("pid")) and saved.get("deadline", 0) > time.time():
+                takeover_at = saved["deadline"]
+        if saved and (state is None or saved.get("saved_at", 0) > state.get("saved_at", 0)):
+            state = saved
+        if takeover_at is not None and takeover_at <= time.time():
+            takeover_at = None   # Devir anı geçmiş: eski örnek kapanmış, doğrudan oyna
+        return cls(path, takeover_at, state)
+
+    @staticmethod
+    def load(path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    # --- Bekleme / devralma ---
+    @property
+    def standby(self):
+        return self.takeover_at is not None and time.time() < self.takeover_at
+
+    def on_takeover(self, callback):
+        """Devir anında çağrılır (bekleyen maçların son durumu yeniden değerlendirilir)."""
+        if self.standby: self._listeners.append(callback)
+
+    def forget(self, callback):
+        if callback in self._listeners: self._listeners.remove(callback)
+
+    async def run(self):
+        """Devir anına kadar uyur, eski örneğin son kaydını okur ve bekleyen maçları uyandırır."""
+        if self.takeover_at is None: return
+        await asyncio.sleep(max(0.0, self.takeover_at - time.time()))
+        saved = self.load(self.path) if self.path else None
+        if saved and saved.get("pid") != os.getpid():
+            self.games.update(saved.get("games", {}))
+        print(f"🤝 Devir anı: maçlar devralındı ({len(self._listeners)} maç).", flush=True)
+        for callback in self._listeners: callback()
+        self._listeners.clear()
+
+    async def wait_takeover(self):
+        if self.standby: await asyncio.sleep(self.takeover_at - time.time())
+
+    def restore(self, session):
+        """Kayıtlı maç durumunu (son PV) oturuma aktarır; kayıt yoksa False."""
+        data = self.games.get(session.game_id)
+        if not data: return False
+        pv = data.get("last_pv")
+        if pv:
+            session.last_pv = (pv[0], [chess.Move.from_uci(m) for m in pv[1]])
+        return True
+
+    # --- Kayıt ---
+    def snapshot(self, sessions, deadline):
+        games = {}
+        for game_id, session in sessions.items():
+            games[game_id] = {
+                "color": "white" if session.my_color else "black",
+                "initial_fen": session.initial_fen, "ply": len(session.moves),
+                "last_pv": [session.last_pv[0], [m.uci() for m in session.last_pv[1][:8]]] if session.last_pv else None,
+            }
+        return {"host": socket.gethostname(), "pid": os.getpid(), "deadline": deadline,
+                "saved_at": time.time(), "games": games}
+
+    def save(self, sessions, deadline):
+        """Atomik yazım (yarım dosya okunmasın)."""
+        state = self.snapshot(sessions, deadline)
+        if not self.path: return state
+        tmp = f"{self.path}.tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(state, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"⚠️ Devir dosyası yazılamadı: {e}", flush=True)
+        return state
+
+    async def checkpoint_periodically(self, sessions, deadline, interval):
+        """Her `interval` sn'de ve kapanıştan hemen önce (en taze PV'ler devralana kalsın) yazar."""
+        final = deadline - 1.0
+        while True:
+            now = time.time()
+            await asyncio.sleep(final - now if now < final < now + interval else interval)
+            if not self.standby:   # Beklerken dosya eski örneğindir, üzerine yazılmaz
+                self.save(sessions, deadline)
+
+    async def hand_over(self, dispatcher, sessions, deadline, lead):
+        """
+        Kapanıştan `lead` sn önce sonraki koşuyu başlatır (devir anı = kapanış).
+        Koşunun çalıştığı doğrulanınca successor_confirmed olur ve yeni maç
+        almayı kapanışa kadar sürdürmek güvenlidir.
+        """
+        await asyncio.sleep(max(0.0, deadline - lead - time.time()))
+        try:
+            await asyncio.to_thread(dispatcher.dispatch, deadline, self.snapshot(sessions, deadline))
+        except Exception as e:
+            print(f"⚠️ Sonraki koşu başlatılamadı, maçlar kapanışta bırakılacak: {e}", flush=True)
+            return
+        print(f"🤝 Sonraki koşu başlatıldı, devir {deadline - time.time():.0f}s sonra.", flush=True)
+        while not self.successor_confirmed and time.time() < deadline:
+            await asyncio.sleep(30)
+            try: self.successor_confirmed = await asyncio.to_thread(dispatcher.successor_running)
+            except Exception: pass
+        if self.successor_confirmed:
+            print("🤝 Devralacak koşu çalışıyor: kapanışa kadar maç alınmaya devam ediliyor.", flush=True)
+
+
+class GitHubDispatcher:
+    """
+    Bir sonraki koşuyu workflow_dispatch ile erken başlatır. GITHUB_TOKEN ile
+    tetiklenen workflow_dispatch yeni koşu açabilir (workflow'da
+    `permissions: actions: write` gerekir).
+    """
+
+    def __init__(self, token, repo, ref, workflow, run_id=None, timeout=10):
+        self.repo = repo
+        self.ref = ref
+        self.workflow = workflow
+        self.run_id = run_id
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({"Authorization": f"Bearer {token}", "Accept": "application/vnd.github+json"})
+        self.dispatched_at = None
+
+    @classmethod
+    def from_env(cls):
+        """Actions dışında (yerel çalışma) None."""
+        env = os.environ
+        token, repo, workflow_ref = env.get("GITHUB_TOKEN"), env.get("GITHUB_REPOSITORY"), env.get("GITHUB_WORKFLOW_REF")
+        if not (token and repo and workflow_ref): return None
+        # owner/repo/.github/workflows/main.yml@refs/heads/main
+        workflow = workflow_ref.split("@")[0].rsplit("/", 1)[-1]
+        return cls(token, repo, env.get("GITHUB_REF_NAME", "main"), workflow, env.get("GITHUB_RUN_ID"))
+
+    def dispatch(self, takeover_at, state):
+        payload = json.dumps(state, separators=(",", ":"))
+        if len(payload) > MAX_STATE_CHARS: payload = ""   # Maç id/renkleri devralan tarafça Lichess'ten de bulunur
+        r = self.session.post(f"{GITHUB_API}/repos/{self.repo}/actions/workflows/{self.workflow}/dispatches",
+                              json={"ref": self.ref, "inputs": {"takeover_at": f"{takeover_at:.3f}", "handoff": payload}},
+                              timeout=self.timeout)
+        r.raise_for_status()
+        self.dispatched_at = time.time()
+        return True
+
+    def successor_running(self):
+        """Bizden sonra açılmış, çalışan bir dispatch koşusu var mı?"""
+        r = self.session.get(f"{GITHUB_API}/repos/{self.repo}/actions/workflows/{self.workflow}/runs",
+                             params={"event": "workflow_dispatch", "status": "in_progress", "per_page": 10},
+                             timeout=self.timeout)
+        r.raise_for_status()
+        return any(str(run.get("id")) != str(self.run_id) for run in r.json().get("workflow_runs", []))
@@ -1,63 +1,153 @@
+import asyncio
+import math
 import os
 import sys
-import berserk
 import chess
 import chess.engine
 import time
-import chess.polyglot
-import threading
 import yaml
-import requests
-import queue
 from datetime import timedelta
 from matchmaking import Matchmaker
+from game_session import GameSession
+from book import BookStack
+from analysis_cache import AnalysisCache
+from tablebase import TablebaseProber, ONLINE_URL
+from time_manager import TIME_MODES, PANIC_CLOCK, build_limit, emergency_budget, pool_deadline, search_deadline, smart_think_time
+from emergency import pv_move, quick_search
+from engine_pool import EngineScheduler, BackendPool
+from backends import RoutingTable, tc_key
+from pondering import PonderManager
+from resources import ResourceScheduler
+from lichess_api import LichessClient
+from move_sender import MoveSender, submit_budget
+from handoff import Handoff, GitHubDispatcher
+from metrics import Metrics
 
 # ==========================================================
 # ⚙️ MODÜLER AYARLAR PANELİ (Burayı Değiştirmeniz Yeterli)
 # ==========================================================
 SETTINGS = {
     "TOKEN": os.environ.get('LICHESS_TOKEN'),
-    "ENGINE_PATH": "./src/Ethereal",
+    "ENGINE_PATH": os.environ.get('ENGINE_PATH', "./src/Ethereal"),
+    "NNUE_ENGINE_PATH": os.environ.get('NNUE_ENGINE_PATH', "./src/Ethereal-nnue"),  # Gömülü ağlı derleme (yoksa hep HCE)
+    "BACKEND_ROUTING_PATH": "backend_routing.json",  # Tempo -> HCE/NNUE (tools/backend_bench.py üretir)
     "BOOK_PATH": "./book.bin",
+    "BOOK_OVERLAY_PATH": "./book_overlay.bin",  # Kendi maçlarımızdan (tools/book_builder.py), önce buna bakılır
     
     # --- OYUN LİMİTLERİ ---
-    "MAX_PARALLEL_GAMES": 2,      # Aynı anda oynanacak maç sayısı
+    "MAX_PARALLEL_GAMES": None,   # Aynı anda oynanacak maç sayısı (None: çekirdek sayısına göre)
     "MAX_TOTAL_RUNTIME": 21300,   # Toplam çalışma süresi (5 saat 55 dk)
-    "STOP_ACCEPTING_MINS": 15,    # Kapanışa kaç dk kala yeni maç almasın?
+    "STOP_ACCEPTING_MINS": 15,    # Kapanışa kaç dk kala yeni maç almasın? (devralacak koşu doğrulanırsa uygulanmaz)
+    "ENGINE_POOL_SIZE": None,     # Motor sayısı (None: paralel maç + 1 yedek)
+    "THREAD_SHIFT": True,         # Boş çekirdekleri aramadan önce saati az kalan maça kaydır
     
     # --- MOTOR VE ZAMAN YÖNETİMİ ---
     "LATENCY_BUFFER": 0.15,       # Saniye cinsinden ağ gecikme payı (150ms)
     "TABLEBASE_PIECE_LIMIT": 6,   # Kaç taş kalınca tablebase'e sorsun? (6 güvenlidir)
+    "TABLEBASE_URL": os.environ.get('TABLEBASE_URL', ONLINE_URL),  # Test için yerel stub verilebilir
     "MIN_THINK_TIME": 0.05,       # En az düşünme süresi
+    "ENGINE_STATS_PATH": "engine_stats.jsonl",  # Maç başı TT isabet istatistikleri
+
+    # --- KALICI ANALİZ ÖNBELLEĞİ (yeniden başlatmalar arasında korunur) ---
+    "ANALYSIS_CACHE_PATH": "analysis_cache.bin",  # None: kapalı
+    "ANALYSIS_CACHE_MB": 16,      # Sabit dosya boyutu (~700 bin pozisyon)
+    "ANALYSIS_INSTANT_DEPTH": 16,  # Bu derinlikteki kayıt...
+    "ANALYSIS_INSTANT_CLOCK": 60,  # ...saatimiz bunun altındayken (sn) aramasız oynanır
+    "ANALYSIS_PREFER_MARGIN": 4,   # Kayıt aramadan bu kadar derinse motorun hamlesi yerine oynanır
+
+    # --- ÖLÇÜMLER ---
+    "METRICS_PORT": int(os.environ.get('METRICS_PORT', 0)) or None,  # /metrics uç noktası (None: kapalı)
+    "METRICS_PATH": "metrics.jsonl",        # Periyodik metrik anlık görüntüsü
+    "METRICS_INTERVAL": 60,                 # Anlık görüntü aralığı (sn)
+    "CLOCK_TRACE_PATH": "clock_traces.jsonl",  # Maç başı saat izi (tools/time_harness.py formatı)
     
+    # --- DEVİR (6 saatlik yeniden başlatmada maçlar sonraki koşuya geçer) ---
+    "HANDOFF_PATH": "handoff_state.json",  # Aktif maçlar + son PV (None: kapalı)
+    "HANDOFF_LEAD": 900,          # Kapanıştan kaç sn önce sonraki koşu başlatılsın (kurulum ~3-5 dk)
+    "HANDOFF_INTERVAL": 10,       # Devir dosyası yazma aralığı (sn)
+
     # --- MESAJLAR ---
     "GREETING": "Oxydan v7 InDev Active. System stabilized.",
 }
+GAME_OVER_STATUSES = ['mate', 'resign', 'draw', 'outoftime', 'aborted', 'stalemate']
 # ==========================================================
 
 class OxydanAegisV4:
-    def __init__(self, exe_path, uci_options=None):
+    def __init__(self, exe_path, uci_options=None, time_mode="smart", ponder=False):
         self.exe_path = exe_path
+        # smart: kendi bütçemiz | native: Ethereal timeman | hybrid: native + sert sınır
+        self.time_mode = time_mode if time_mode in TIME_MODES else "smart"
         self.book_path = SETTINGS["BOOK_PATH"]
+        # Kitaplar bir kez mmap'lenir ve tüm maç thread'leri tarafından paylaşılır; overlay önceliklidir
+        self.book = BookStack.open(("Overlay", SETTINGS["BOOK_OVERLAY_PATH"]), ("Cerebellum", self.book_path))
+        # Önceki aramaların sonuçları: tüm maçlar ve ardışık bot çalışmaları paylaşır
+        self.analysis = AnalysisCache.open(SETTINGS["ANALYSIS_CACHE_PATH"], size_mb=SETTINGS["ANALYSIS_CACHE_MB"])
+        # Değerlendirme arka ucu tempoya göre (HCE / NNUE): tablo ve NNUE derlemesi varsa karma havuz
+        self.routing = RoutingTable.load(SETTINGS["BACKEND_ROUTING_PATH"])
+        paths = {"hce": exe_path, "nnue": SETTINGS["NNUE_ENGINE_PATH"]}
+        self.backends = tuple(b for b in (self.routing.backends() if self.routing else ("hce",))
+                              if b == "hce" or (paths[b] and os.path.exists(paths[b]))) or ("hce",)
+        # Maç sınırı, havuz ve Threads/Hash ("auto" ya da eksikse) çekirdek ve belleğe göre
+        self.resources, uci_options = ResourceScheduler.detect(
+            SETTINGS["MAX_PARALLEL_GAMES"], SETTINGS["ENGINE_POOL_SIZE"], uci_options,
+            shift=SETTINGS["THREAD_SHIFT"] and not ponder,   # Ponder bütçesi sabit thread sayısıyla çalışır
+            backends=len(self.backends),
+        )
+        self.max_games = self.resources.games
+        self.sessions = {}   # game_id -> GameSession (devir dosyası için)
         self.uci_options = uci_options
-        self.engine_pool = queue.Queue()
+        # Önce yerel Syzygy (motorla aynı klasör), yoksa keep-alive API + önbellek
+        self.tablebase = TablebaseProber(
+            syzygy_path=(uci_options or {}).get("SyzygyPath"),
+            online_url=SETTINGS["TABLEBASE_URL"],
+        )
         
         # Havuz Boyutu: Paralel maç sayısı + 1 (Yedek ünite)
-        pool_size = SETTINGS["MAX_PARALLEL_GAMES"] + 1
-        
+        # Her maç kendi motoruna sabitlenir, TT hamleler arasında sıcak kalır
+        self.pool_size = self.resources.plan.pool_size
+
+        # Aşama süreleri, motor NPS/derinlik, motor açılış süreleri ve maç saat izleri
+        self.metrics = Metrics(dump_path=SETTINGS["METRICS_PATH"], trace_path=SETTINGS["CLOCK_TRACE_PATH"])
+        # Karma havuzda her arka uç tüm maçları taşıyabilir (hepsi aynı tempoda olabilir)
+        schedulers = {b: EngineScheduler(
+            paths[b], uci_options, size=self.pool_size,
+            stats_path=SETTINGS["ENGINE_STATS_PATH"], metrics=self.metrics,
+        ) for b in self.backends}
+        self.engines = BackendPool(schedulers) if len(schedulers) > 1 else schedulers[self.backends[0]]
+
+        # Ponder: rakibin süresinde beklenen cevap üzerinde arama (çekirdek bütçeli)
+        threads = int(uci_options.get("Threads", 1))
+        self.ponder = PonderManager(threads=threads) if ponder else None
+
+    async def start(self):
+        """Motorları paralel başlatır; ilk motor readyok verince hamle almaya hazırız."""
         try:
-            for i in range(pool_size):
-                eng = chess.engine.SimpleEngine.popen_uci(self.exe_path, timeout=30)
-                if uci_options:
-                    for opt, val in uci_options.items():
-                        try: eng.configure({opt: val})
-                        except: pass
-                self.engine_pool.put(eng)
-            print(f"🚀 Oxydan v7: {pool_size} Motor Ünitesi Havuza Alındı.", flush=True)
+            print(f"🧮 Kaynaklar: {self.resources.describe()}", flush=True)
+            await self.engines.start()
+            print(f"🚀 Oxydan v7: İlk motor {self.engines.startup['first_ready']:.2f}s'de hazır, "
+                  f"{self.pool_size - 1} yedek arka planda açılıyor.", flush=True)
+            if isinstance(self.engines, BackendPool):
+                print(f"🧠 Arka uçlar: {', '.join(b.upper() for b in self.engines.pools)} | tempo tablosu: "
+                      + " ".join(f"{tc}={b.upper()}" for tc, b in self.routing.routes.items()), flush=True)
         except Exception as e:
             print(f"KRİTİK HATA: Motorlar başlatılamadı: {e}", flush=True)
             sys.exit(1)
 
+    async def close(self):
+        closed = await self.engines.close()
+        self.tablebase.close()
+        if self.book: self.book.close()
+        if self.analysis: self.analysis.close()
+        return closed
+
+    def route_game(self, session):
+        """Karma havuzda maçı temposuna göre HCE/NNUE havuzuna yönlendirir (maç başına bir kez)."""
+        if not isinstance(self.engines, BackendPool) or session.backend is not None: return
+        base, inc = session.clock or (math.inf, 0.0)   # Saatsiz maç: en uzun ölçülen süre geçerli
+        session.backend = self.engines.assign(session.game_id, self.routing.backend_for(base, inc))
+        self.metrics.inc(f"backend_games_{session.backend}")
+        print(f"🧠 [{session.game_id}] {tc_key(base, inc) if session.clock else 'saatsiz'} -> {session.backend.upper()}", flush=True)
+
     def to_seconds(self, t):
         if t is None: return 0.0
         if isinstance(t, timedelta): return t.total_seconds()
@@ -67,57 +157,97 @@ class OxydanAegisV4:
         except: return 0.0
 
     def calculate_smart_time(self, t, inc, board):
-        move_num = board.fullmove_number if board else 1
-        
-        # 1. ACİL DURUM (3 saniye altı panik modu)
-        if t < 3.0:
-            return 0.05 if t > 1.0 else 0.02
-
-        # 2. TEMPO ANALİZİ (MTG - Moves To Go)
-        if t > 600: mtg = 45   # Classical
-        elif t > 180: mtg = 35 # Rapid
-        else: mtg = 25         # Blitz
-        
-        if move_num > 60: mtg = max(15, mtg - 10)
-
-        # 3. BÜTÇE VE KARMAŞIKLIK
-        base_budget = (t / mtg) + (inc * 0.85)
-        legal_moves = board.legal_moves.count()
-        complexity = 1.3 if legal_moves > 40 else (0.7 if legal_moves < 15 else 1.0)
-        target_time = base_budget * complexity
-
-        # 4. GÜVENLİK SINIRLARI
-        if t < 10.0:
-            target_time = min(target_time, t / 45)
-            min_think = SETTINGS["MIN_THINK_TIME"]
-        else:
-            min_think = 0.3 if t > 30 else 0.1
-
-        max_limit = t * 0.15 # Tek hamlede bütçenin %15'inden fazlasını harcama
-        final_time = max(min_think, min(target_time, max_limit))
-        
-        return max(0.01, final_time - SETTINGS["LATENCY_BUFFER"])
+        return smart_think_time(t, inc, board, SETTINGS["LATENCY_BUFFER"], SETTINGS["MIN_THINK_TIME"])
+
+    def time_limit(self, board, wtime, btime, winc, binc):
+        """Seçili zaman moduna göre motor limitini ve (hybrid için) sert sınırı verir."""
+        return build_limit(
+            self.time_mode, board,
+            self.to_seconds(wtime), self.to_seconds(btime),
+            self.to_seconds(winc), self.to_seconds(binc),
+            SETTINGS["LATENCY_BUFFER"], SETTINGS["MIN_THINK_TIME"],
+        )
+
+    async def play_capped(self, engine, board, limit, cap, game_id=None):
+        """Motorun kendi zaman yönetimiyle ara, ama en geç `cap` saniyede durdur."""
+        with await engine.analysis(board, limit, game=game_id, info=chess.engine.INFO_BASIC | chess.engine.INFO_SCORE | chess.engine.INFO_PV) as analysis:
+            try:
+                best = await asyncio.wait_for(asyncio.shield(analysis.wait()), cap)
+            except asyncio.TimeoutError:
+                analysis.stop()
+                best = await analysis.wait()
+            return best.move, analysis.info
 
-    def get_best_move(self, board, wtime, btime, winc, binc):
+    async def search(self, engine, board, limit, cap, game_id=None, ponder=False):
+        """
+        (hamle, info, ponder hamlesi) döndürür. game_id değişince python-chess
+        ucinewgame gönderir. Ponder açıkken hybrid sert sınırı uygulanmaz
+        (analysis ile ponder yapılamaz), motorun kendi zaman yönetimi geçerlidir.
+        """
+        if cap is None or ponder:
+            result = await engine.play(board, limit, game=game_id, info=chess.engine.INFO_BASIC | chess.engine.INFO_SCORE | chess.engine.INFO_PV, ponder=ponder)
+            return result.move, result.info, result.ponder
+        move, info = await self.play_capped(engine, board, limit, cap, game_id)
+        return move, info, None
+
+    async def end_game(self, game_id):
+        """Maç bitti: ponder'ı durdur, motoru havuza döndür."""
+        if self.ponder:
+            await self.ponder.end_game(game_id, self.engines.pinned(game_id))
+        self.engines.finish_game(game_id)
+        self.resources.forget(game_id)
+        self.metrics.end_game(game_id)
+
+    def cached_move_safe(self, board, move):
+        """Zobrist anahtarı tekrar ve 50 hamle sayacını bilmez; bunlara yaklaşan hamle önbellekten oynanmaz."""
+        if board.halfmove_clock >= 80: return False
+        board.push(move)
+        try: return not board.is_repetition(2)
+        finally: board.pop()
+
+    def fallback_move(self, board, session):
+        """Aramasız cevap: son PV'nin devamı, yoksa önbellekteki (her derinlikte) kayıt. (hamle, kaynak) ya da None."""
+        move = pv_move(board, session.last_pv if session else None)
+        if move: return move, "pv"
+        hit = self.analysis.probe(board) if self.analysis else None
+        if hit and self.cached_move_safe(board, hit.move): return hit.move, "cache"
+        return None
+
+    def panic(self, move, reason, source, started):
+        self.metrics.inc("panic_moves")
+        self.metrics.inc(f"panic_{reason}")
+        self.metrics.inc(f"panic_from_{source}")
+        self.metrics.stage("panic", time.perf_counter() - started)
+        print(f"🆘 Acil Durum Hamlesi ({reason} -> {source}): {move}", flush=True)
+        return move
+
+    async def emergency_move(self, board, session, clock, inc, reason):
+        """Motor yok, geç kaldı ya da hata verdi: hazır cevap, yoksa süreç içi sığ arama."""
+        started = time.perf_counter()
+        found = self.fallback_move(board, session)
+        if found: return self.panic(found[0], reason, found[1], started)
+        move, depth = await asyncio.to_thread(quick_search, board.copy(), emergency_budget(clock, inc))
+        return self.panic(move, reason, f"search_d{min(depth, 4)}", started)
+
+    async def get_best_move(self, board, wtime, btime, winc, binc, session=None):
         """
         Oxydan Bot Hamle Karar Mekanizması:
-        1. Cerebellum Book (.bin) -> Açılış
+        1. Overlay (kendi maçlarımız) + Cerebellum Book (.bin) -> Açılış
         2. Syzygy API -> Oyun Sonu (<= 6 taş)
-        3. Ethereal Engine -> Orta Oyun
+        3. Kalıcı analiz önbelleği -> Önceden aranmış pozisyon
+        4. Ethereal Engine -> Orta Oyun
         """
         
-        if os.path.exists(SETTINGS["BOOK_PATH"]):
+        # --- 1. ADIM: KİTAP (İlk kaçırmadan sonra bu maçta bir daha sorulmaz) ---
+        if self.book and not (session and session.out_of_book):
             try:
-                with chess.polyglot.open_reader(SETTINGS["BOOK_PATH"]) as reader:
-                    best_entry = None
-                    # Tahtadaki konum için tüm hamleleri tara, en yüksek ağırlıklıyı seç
-                    for entry in reader.find_all(board):
-                        if best_entry is None or entry.weight > best_entry.weight:
-                            best_entry = entry
-                    
-                    if best_entry:
-                        print(f"📖 Cerebellum Kitap Hamlesi: {best_entry.move} (W: {best_entry.weight})", flush=True)
-                        return best_entry.move
+                with self.metrics.timed("book"):
+                    found = self.book.probe(board)
+                if found:
+                    move, weight, name = found
+                    print(f"📖 {name} Kitap Hamlesi: {move} (W: {weight})", flush=True)
+                    return move
+                if session: session.out_of_book = True
             except Exception as e:
                 print(f"⚠️ Kitap okunurken hata: {e}", flush=True)
 
@@ -131,199 +261,388 @@ class OxydanAegisV4:
             syzygy_limit = 7 if current_time_sec > 30 else 6
             
             if len(board.piece_map()) <= syzygy_limit:
-                fen = board.fen().replace(" ", "_")
-                # Süre azaldıkça API'yi bekleme süresini (timeout) de kısaltıyoruz
+                # Yerel tablo yoksa API'yi bekleme süresi, kalan süreyle kısalır
                 api_timeout = 0.5 if current_time_sec > 10 else 0.3
+                with self.metrics.timed("tablebase"):
+                    tb_move = await self.tablebase.probe(board, timeout=api_timeout)
                 
-                r = requests.get(f"https://tablebase.lichess.ovh/standard?fen={fen}", timeout=api_timeout)
-                
-                if r.status_code == 200:
-                    data = r.json()
-                    if "moves" in data and len(data["moves"]) > 0:
-                        tb_move_uci = data["moves"][0]["uci"]
-                        print(f"🧩 Syzygy ({syzygy_limit}-Piece) Hamlesi: {tb_move_uci}", flush=True)
-                        return chess.Move.from_uci(tb_move_uci)
+                if tb_move:
+                    print(f"🧩 Syzygy ({syzygy_limit}-Piece) Hamlesi: {tb_move.uci()}", flush=True)
+                    return tb_move
         except Exception as e:
-            # API yavaşsa veya hata verirse vakit kaybetmeden motora pasla
+            # Hata verirse vakit kaybetmeden motora pasla
             print(f"⚠️ Syzygy atlandı (Hata veya Zaman Aşımı): {e}", flush=True)
 
-        # --- 3. ADIM: MOTOR HESAPLAMA (Ethereal) ---
+        # --- 3. ADIM: KALICI ANALİZ ÖNBELLEĞİ ---
+        # Kısa saatte yeterince derin kayıt aramasız oynanır (ponder sürüyorsa ponderhit daha iyi)
+        clock = self.to_seconds(wtime if board.turn == chess.WHITE else btime)
+        inc = self.to_seconds(winc if board.turn == chess.WHITE else binc)
+        cached = None
+        if self.analysis:
+            with self.metrics.timed("analysis_cache"):
+                cached = self.analysis.probe(board)
+            if (cached and cached.depth >= SETTINGS["ANALYSIS_INSTANT_DEPTH"] and clock <= SETTINGS["ANALYSIS_INSTANT_CLOCK"]
+                    and not (session and session.ponder_expect) and self.cached_move_safe(board, cached.move)):
+                self.metrics.inc("analysis_cache_instant")
+                print(f"💾 Önbellek Hamlesi: {cached.move} (Derinlik: {cached.depth}, Skor: {cached.score})", flush=True)
+                return cached.move
+
+        # Panik: saat çok azken hazır cevap varsa motor turuna (UCI gidiş-dönüş) bile girilmez
+        if clock < PANIC_CLOCK:
+            started = time.perf_counter()
+            found = self.fallback_move(board, session)
+            if found: return self.panic(found[0], "clock", found[1], started)
+
+        # --- 4. ADIM: MOTOR HESAPLAMA (Ethereal) ---
         # Eğer kitapta hamle yoksa veya oyun sonuna girilmemişse motor devreye girer
-        engine = self.engine_pool.get()
+        game_id = session.game_id if session else None
+        ponder = self.ponder is not None and game_id is not None
+        if session: self.route_game(session)
         try:
-            # Sıra kimdeyse onun süresini ve artışını (inc) al
-            my_time = wtime if board.turn == chess.WHITE else btime
-            my_inc = winc if board.turn == chess.WHITE else binc
-            
-            # Daha önce tanımladığın akıllı zaman yönetimi fonksiyonu (calculate_smart_time)
-            # Eğer o fonksiyonun adını değiştirdiysen burayı da güncelle.
-            think_time = self.calculate_smart_time(self.to_seconds(my_time), self.to_seconds(my_inc), board)
+            # Boş motor beklemesi saatle sınırlı: süre dolarsa motorsuz cevap
+            with self.metrics.timed("engine_wait"):
+                engine = await asyncio.wait_for(self.engines.acquire(game_id), pool_deadline(clock, inc))
+        except asyncio.TimeoutError:
+            return await self.emergency_move(board, session, clock, inc, "pool_timeout")
+        try:
+            # Boş çekirdekler saati az kalan maça: Threads değiştiyse hamleden önce setoption
+            if await self.resources.apply(engine, self.resources.threads_for(game_id, clock)):
+                self.metrics.inc("thread_shifts")
+
+            # Seçili zaman moduna göre limit (smart: movetime, native/hybrid: saatler)
+            limit, cap = self.time_limit(board, wtime, btime, winc, binc)
             
-            # Motoru belirtilen süre sınırıyla çalıştır
-            result = engine.play(board, chess.engine.Limit(time=think_time))
+            # Ponder tuttuysa aynı pozisyonla play() çağrısı ponderhit'e dönüşür
+            if ponder: self.ponder.before_search(session, board)
+            search_start = time.perf_counter()
+            # Takılan motor saati bitirmesin: hiçbir mod tek hamlede saatin yarısını kullanmaz
+            deadline = search_start + search_deadline(clock, inc, SETTINGS["LATENCY_BUFFER"])
+            try:
+                move, info, ponder_move = await asyncio.wait_for(
+                    self.search(engine, board, limit, cap, game_id, ponder), deadline - time.perf_counter())
+            except chess.engine.EngineTerminatedError:
+                # Sabit motor çöktü: maçı yedeğe taşı ve kalan süreyle bir kez daha dene (o da takılırsa acil hamle)
+                self.metrics.inc("engine_crashes")
+                engine = await asyncio.wait_for(self.engines.replace(game_id, engine), pool_deadline(clock, inc))
+                move, info, ponder_move = await asyncio.wait_for(
+                    self.search(engine, board, limit, cap, game_id, ponder), deadline - time.perf_counter())
+            self.metrics.stage("search", time.perf_counter() - search_start)
+            self.metrics.engine_info(info)
+            self.engines.record(game_id, info)
+            if self.analysis:
+                self.analysis.store_result(board, move, info)
+                # Önbellekteki kayıt bu aramadan belirgin derinse onu oyna (yanlış çizgideki ponder kesilir)
+                if (cached and cached.move != move and cached.depth >= info.get("depth", 0) + SETTINGS["ANALYSIS_PREFER_MARGIN"]
+                        and self.cached_move_safe(board, cached.move)):
+                    self.metrics.inc("analysis_cache_override")
+                    print(f"💾 Önbellek daha derin ({cached.depth}): {move} yerine {cached.move}", flush=True)
+                    move = cached.move
+                    if ponder_move:
+                        await engine.ping()
+                        ponder_move = None
+            if session and info.get("pv") and info["pv"][0] == move:
+                session.last_pv = (len(board.move_stack), info["pv"])
+            if ponder: await self.ponder.after_search(session, engine, board, move, ponder_move)
             
-            print(f"⚙️ Motor Hamlesi: {result.move} (Süre: {think_time:.2f}s)", flush=True)
-            return result.move
+            budget = f"{limit.time:.2f}s" if limit.time is not None else self.time_mode
+            print(f"⚙️ Motor Hamlesi: {move} (Süre: {budget})", flush=True)
+            return move
             
+        except asyncio.TimeoutError:
+            return await self.emergency_move(board, session, clock, inc, "search_timeout")
         except Exception as e:
-            print(f"🚨 Motor hatası: {e}", flush=True)
-            # Motor hata verirse bile botun çökmemesi için rastgele bir hamle döndür (acil durum)
-            return list(board.legal_moves)[0]
+            print(f"🚨 Motor hatası: {e!r}", flush=True)
+            # Motor hata verirse: son PV / önbellek / süreç içi sığ arama (rastgele hamle yerine)
+            return await self.emergency_move(board, session, clock, inc, "engine_error")
         finally:
-            # Motoru havuza geri bırak
-            self.engine_pool.put(engine)
-
-        # 2. TABLEBASE (7 taş ve altı için online sorgu)
-        if len(board.piece_map()) <= SETTINGS.get("TABLEBASE_PIECE_LIMIT", 6):
-            try:
-                fen_tb = board.fen().replace(" ", "_")
-                r_tb = requests.get(f"https://tablebase.lichess.ovh/standard?fen={fen_tb}", timeout=0.5)
-                if r_tb.status_code == 200:
-                    data_tb = r_tb.json()
-                    if data_tb.get("moves"):
-                        print(f"🎯 Tablebase Hamlesi: {data_tb['moves'][0]['uci']}", flush=True)
-                        return chess.Move.from_uci(data_tb["moves"][0]["uci"])
-            except:
-                pass
-
-        # 3. MOTOR HESAPLAMA (Kitap bittiğinde veya API yanıt vermediğinde)
-        engine = self.engine_pool.get()
+            # Maçsız kullanımda motoru havuza geri bırak (sabit motor maçta kalır)
+            self.resources.end_search(game_id)
+            self.engines.release(game_id, engine)
+
+async def handle_game(client, game_id, bot, my_id, sender=None, handoff=None):
+    """
+    Tek maçı yönetir. Maç akışı ayrı bir görevde okunur; maç arama sürerken
+    biterse (süre, terk, abort) süren arama iptal edilir ve motor durdurulur.
+
+    Hamle gönderimi beklenmez: gönderim arka planda saatle sınırlı denenirken
+    döngü akışı okumaya devam eder, rakibin cevabı akışta görünür görünmez
+    (POST cevabı henüz gelmemiş olsa bile) sonraki arama başlar. Akış hamlemizi
+    gösterene kadar aynı pozisyon için ikinci kez arama yapılmaz; gönderim
+    reddedilir ya da zaman aşımına uğrarsa döngü uyandırılır ve pozisyon
+    kalan saatle yeniden aranıp gönderilir.
+
+    Devir beklemesinde (handoff.standby) maç izlenir ama hamle yapılmaz; devir
+    anında son durum, bekleme süresi saatten düşülerek yeniden değerlendirilir.
+    """
+    states = asyncio.Queue()
+    current = {"search": None}
+    sender = sender or MoveSender(client, bot.metrics)
+    sending = set()
+    submitted = {"ply": None}   # Gönderilen ama akışta henüz görünmeyen hamlenin pozisyonu (yarım hamle)
+
+    async def read_stream():
         try:
-            my_time = wtime if board.turn == chess.WHITE else btime
-            my_inc = winc if board.turn == chess.WHITE else binc
-            
-            t_sec = self.to_seconds(my_time)
-            i_sec = self.to_seconds(my_inc)
-            
-            think_time = self.calculate_smart_time(t_sec, i_sec, board)
-            
-            # Motor hesaplama limiti
-            result = engine.play(board, chess.engine.Limit(time=think_time))
-            return result.move
-            
+            async for state in client.stream_game_state(game_id):
+                states.put_nowait(state)
+                status = state.get('status') or state.get('state', {}).get('status')
+                search = current["search"]
+                if ('error' in state or status in GAME_OVER_STATUSES) and search and not search.done():
+                    search.cancel()
         except Exception as e:
-            print(f"❌ Motor Hatası: {e}")
-            # Acil durum hamlesi (legal hamlelerden ilkini yap)
-            return next(iter(board.legal_moves)) if board.legal_moves else None
+            print(f"Maç akışı koptu ({game_id}): {e}", flush=True)
         finally:
-            # Motoru her durumda havuza geri ver
-            self.engine_pool.put(engine)
-
-def handle_game(client, game_id, bot, my_id):
+            states.put_nowait(None)
+
+    async def send(move, ply, color, clock, inc, fen, think, turn_start):
+        result = await sender.submit(game_id, move.uci(), submit_budget(clock, think))
+        bot.metrics.stage("move_total", time.perf_counter() - turn_start)
+        bot.metrics.trace_move(game_id, color, clock, inc, fen, move=move.uci(), think=round(think, 4),
+                               send=round(result.elapsed, 4), submit=result.status)
+        if result.status in ("rejected", "timeout"):
+            print(f"⚠️ [{game_id}] Hamle gönderilemedi ({result.status}, {result.attempts} deneme): {move} {result.error}", flush=True)
+            if submitted["ply"] == ply:
+                submitted["ply"] = None
+                states.put_nowait({"type": "resubmit"})   # Pozisyon yeniden aranıp gönderilsin
+        elif result.attempts > 1:
+            print(f"📨 [{game_id}] Hamle {result.attempts}. denemede gitti ({result.status}, {result.elapsed:.2f}s)", flush=True)
+
+    def wake():
+        states.put_nowait({"type": "takeover"})
+
+    reader = asyncio.create_task(read_stream())
+    adopted = handoff is not None and (handoff.standby or game_id in handoff.games)
+    if handoff: handoff.on_takeover(wake)
     try:
-        client.bots.post_message(game_id, SETTINGS["GREETING"])
-        stream = client.bots.stream_game_state(game_id)
-        my_color = None
+        if not adopted:   # Devralınan maçta selam zaten verildi
+            try: await client.post_message(game_id, SETTINGS["GREETING"])
+            except Exception: pass
+        session, curr_state, received = None, None, time.monotonic()
 
-        for state in stream:
+        while (state := await states.get()) is not None:
             if 'error' in state: break
 
             if state['type'] == 'gameFull':
-                my_color = chess.WHITE if state['white'].get('id') == my_id else chess.BLACK
-                curr_state = state['state']
+                session = GameSession.from_game_full(game_id, state, my_id)
+                bot.sessions[game_id] = session
+                if handoff and handoff.restore(session):
+                    print(f"🤝 [{game_id}] Devir kaydı yüklendi (son PV).", flush=True)
+                curr_state, received = state['state'], time.monotonic()
             elif state['type'] == 'gameState':
-                curr_state = state
+                curr_state, received = state, time.monotonic()
+            elif state['type'] in ('takeover', 'resubmit') and curr_state is not None and session is not None:
+                # Beklerken / gönderim denenirken geçen süre sıradaki tarafın saatinden düşülür
+                if state['type'] == 'takeover': handoff.restore(session)
+                key = 'wtime' if session.board.turn == chess.WHITE else 'btime'
+                if isinstance(curr_state.get(key), (int, float)):
+                    curr_state = dict(curr_state, **{key: max(0, curr_state[key] - int((time.monotonic() - received) * 1000))})
+                received = time.monotonic()
             else: continue
 
-            moves = curr_state.get('moves', "").split()
-            board = chess.Board()
-            for m in moves: board.push_uci(m)
+            if session is None: continue
+
+            # Sadece yeni hamleleri uygula (tahta maç boyunca tek kopya)
+            board = session.sync(curr_state.get('moves', ""))
 
-            if curr_state.get('status') in ['mate', 'resign', 'draw', 'outoftime', 'aborted', 'stalemate']:
+            if curr_state.get('status') in GAME_OVER_STATUSES:
                 break
 
-            if board.turn == my_color and not board.is_game_over():
+            if session.is_my_turn() and not board.is_game_over():
+                if submitted["ply"] == len(board.move_stack):
+                    continue   # Hamlemiz gönderiliyor / akışa yansımadı
+                if handoff and handoff.standby:
+                    continue   # Eski örnek hâlâ oynuyor; devir anında uyandırılırız
+                turn_start = time.perf_counter()
                 wtime, btime = curr_state.get('wtime'), curr_state.get('btime')
                 winc, binc = curr_state.get('winc'), curr_state.get('binc')
-                move = bot.get_best_move(board, wtime, btime, winc, binc)
+                my_white = session.my_color == chess.WHITE
+                clock = bot.to_seconds(wtime if my_white else btime)
+                fen = board.fen()
+                search = asyncio.create_task(bot.get_best_move(board, wtime, btime, winc, binc, session=session))
+                current["search"] = search
+                await asyncio.wait({search})
+                current["search"] = None
+                if search.cancelled():
+                    print(f"⏹️ [{game_id}] Maç arama sırasında bitti, arama iptal edildi.", flush=True)
+                    break
+                move = search.result()
+                think = time.perf_counter() - turn_start
+                bot.metrics.stage("think", think)
                 
                 if move:
-                    for attempt in range(3):
-                        try:
-                            client.bots.make_move(game_id, move.uci())
-                            break 
-                        except:
-                            time.sleep((attempt + 1) * 1)
+                    submitted["ply"] = len(board.move_stack)
+                    task = asyncio.create_task(send(
+                        move, submitted["ply"], "white" if my_white else "black", clock,
+                        bot.to_seconds(winc if my_white else binc), fen, think, turn_start))
+                    sending.add(task)
+                    task.add_done_callback(sending.discard)
     except Exception as e:
         print(f"Oyun Hatası ({game_id}): {e}", flush=True)
+    finally:
+        if current["search"]: current["search"].cancel()
+        for task in sending: task.cancel()   # Maç bitti, gönderim anlamsız
+        if handoff: handoff.forget(wake)
+        bot.sessions.pop(game_id, None)
+        reader.cancel()
 
-def handle_game_wrapper(client, game_id, bot, my_id, active_games):
+async def handle_game_wrapper(client, game_id, bot, my_id, active_games, sender=None, handoff=None):
     try:
-        handle_game(client, game_id, bot, my_id)
+        await handle_game(client, game_id, bot, my_id, sender, handoff)
     finally:
+        await bot.end_game(game_id)
         active_games.discard(game_id)
-        print(f"✅ [{game_id}] Bitti. Kalan Slot: {len(active_games)}/{SETTINGS['MAX_PARALLEL_GAMES']}", flush=True)
-
-def main():
-    start_time = time.time()
-    
-    try:
-        with open("config.yml", "r") as f:
-            config = yaml.safe_load(f)
-    except:
-        print("HATA: config.yml okunamadı.")
-        return
-
-    session = berserk.TokenSession(SETTINGS["TOKEN"])
-    client = berserk.Client(session=session)
-    try:
-        my_id = client.account.get()['id']
-    except:
-        print("Lichess bağlantısı kurulamadı.")
-        return
-
-    bot = OxydanAegisV4(SETTINGS["ENGINE_PATH"], uci_options=config.get('engine', {}).get('uci_options', {}))
-    active_games = set() 
-
-    if config.get("matchmaking"):
-        mm = Matchmaker(client, config, active_games) 
-        threading.Thread(target=mm.start, daemon=True).start()
-
-    print(f"🔥 Oxydan Aegis Hazır. ID: {my_id} | Max Slot: {SETTINGS['MAX_PARALLEL_GAMES']}", flush=True)
-
+        print(f"✅ [{game_id}] Bitti. Kalan Slot: {len(active_games)}/{bot.max_games}", flush=True)
+
+async def event_loop(client, bot, my_id, active_games, start_time, handoff=None):
+    """
+    Gelen olay akışı: davetleri kabul/ret eder, her maç için bir görev açar.
+    Açılışta (ve devir anında) Lichess'te süren maçlara geri bağlanılır.
+    """
+    tasks = set()
+    # Tek gönderici: tüm maçlar istemcinin keep-alive bağlantı havuzunu paylaşır
+    sender = MoveSender(client, bot.metrics)
+
+    def attach(game_id):
+        active_games.add(game_id)
+        task = asyncio.create_task(handle_game_wrapper(client, game_id, bot, my_id, active_games, sender, handoff))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    async def adopt_ongoing():
+        """Süren maçlar (yeniden başlatma / devir): slot sınırına bakılmaz, maç zaten var."""
+        try: ongoing = await client.get_ongoing_games()
+        except Exception as e:
+            print(f"⚠️ Süren maçlar alınamadı: {e}", flush=True)
+            return
+        for game in ongoing:
+            if game.get('gameId') and game['gameId'] not in active_games:
+                print(f"🔗 [{game['gameId']}] Süren maça bağlanıldı ({game.get('color')}).", flush=True)
+                attach(game['gameId'])
+
+    async def adopt_after_takeover():
+        await handoff.wait_takeover()
+        await adopt_ongoing()
+
+    await adopt_ongoing()
+    if handoff and handoff.standby:
+        tasks.add(asyncio.create_task(adopt_after_takeover()))
     while True:
         try:
-            stop_signal = os.path.exists("STOP.txt")
-            elapsed = time.time() - start_time
-
-            # Kritik zaman kontrolü
-            if elapsed > SETTINGS["MAX_TOTAL_RUNTIME"]:
-                print("🛑 Toplam süre doldu. Kapanıyor.")
-                sys.exit(0)
-
-            for event in client.bots.stream_incoming_events():
+            async for event in client.stream_incoming_events():
                 # Stream içindeyken periyodik kontroller
                 cur_elapsed = time.time() - start_time
                 should_stop = os.path.exists("STOP.txt") or cur_elapsed > SETTINGS["MAX_TOTAL_RUNTIME"]
                 
-                # Yeni maç kabul etmeme sınırı (son 15 dk)
+                # Yeni maç kabul etmeme sınırı (son 15 dk); süren maçları sonraki koşu devralacaksa yok
                 close_to_end = cur_elapsed > (SETTINGS["MAX_TOTAL_RUNTIME"] - (SETTINGS["STOP_ACCEPTING_MINS"] * 60))
+                if handoff and handoff.successor_confirmed: close_to_end = False
 
                 if event['type'] == 'challenge':
                     ch_id = event['challenge']['id']
-                    
-                    if should_stop or close_to_end or len(active_games) >= SETTINGS["MAX_PARALLEL_GAMES"]:
-                        client.challenges.decline(ch_id, reason='later')
-                        if should_stop and len(active_games) == 0: sys.exit(0)
+
+                    if handoff and handoff.standby:
+                        continue   # Devre kadar davetlere eski örnek cevap verir
+                    if should_stop or close_to_end or len(active_games) >= bot.max_games:
+                        await client.decline_challenge(ch_id, reason='later')
+                        if should_stop and len(active_games) == 0: return
                     else:
-                        client.challenges.accept(ch_id)
+                        await client.accept_challenge(ch_id)
 
                 elif event['type'] == 'gameStart':
                     game_id = event['game']['id']
-                    if game_id not in active_games and len(active_games) < SETTINGS["MAX_PARALLEL_GAMES"]:
-                        active_games.add(game_id)
-                        threading.Thread(
-                            target=handle_game_wrapper,
-                            args=(client, game_id, bot, my_id, active_games),
-                            daemon=True
-                        ).start()
+                    if game_id not in active_games and len(active_games) < bot.max_games:
+                        attach(game_id)
 
+        except asyncio.CancelledError:
+            for task in tasks: task.cancel()
+            raise
         except Exception as e:
             if "429" in str(e):
                 print("🚨 Hız sınırı (429). Bekleniyor...")
-                time.sleep(60)
+                await asyncio.sleep(60)
             else:
-                time.sleep(5)
+                await asyncio.sleep(5)
+
+async def start_matchmaker(mm, handoff=None):
+    """Devir beklemesindeyken davetleri eski örnek atar; matchmaker devirden sonra başlar."""
+    if handoff: await handoff.wait_takeover()
+    await mm.start()
+
+async def run_bot(client, config, start_time=None, bot=None):
+    """
+    Botun asyncio çalışma zamanı: motorlar, matchmaker görevi ve olay döngüsü.
+    client herhangi bir lichess_api.Transport olabilir; bot verilmezse
+    config'ten oluşturulur (yük testleri kendi örneğini verip ölçer).
+    """
+    start_time = start_time or time.time()
+    deadline = start_time + SETTINGS["MAX_TOTAL_RUNTIME"]
+    # Önceki örnek hâlâ oynuyorsa onun kapanışına kadar beklemede başlarız
+    handoff = Handoff.from_env(SETTINGS["HANDOFF_PATH"]) if SETTINGS["HANDOFF_PATH"] else None
+    if handoff and handoff.standby:
+        print(f"⏳ Devir bekleniyor: süren maçlar {handoff.takeover_at - time.time():.0f}s sonra devralınacak.", flush=True)
+    try:
+        my_id = (await client.get_account())['id']
+    except Exception:
+        print("Lichess bağlantısı kurulamadı.")
+        return
+
+    engine_cfg = config.get('engine', {})
+    bot = bot or OxydanAegisV4(
+        SETTINGS["ENGINE_PATH"],
+        uci_options=engine_cfg.get('uci_options', {}),
+        time_mode=engine_cfg.get('time_mode', 'smart'),
+        ponder=engine_cfg.get('ponder', False),
+    )
+    await bot.start()
+    active_games = set() 
+    # Her maçın hamle gönderimi + matchmaker/sohbet için havuzda sıcak bağlantı kalsın
+    if hasattr(client, "pool_size"): client.pool_size = max(client.pool_size, bot.max_games + 2)
+
+    background = []
+    metrics_server = None
+    if SETTINGS["METRICS_PORT"]:
+        metrics_server = await bot.metrics.serve(SETTINGS["METRICS_PORT"])
+        print(f"📈 Metrikler: http://127.0.0.1:{SETTINGS['METRICS_PORT']}/metrics", flush=True)
+    background.append(asyncio.create_task(bot.metrics.dump_periodically(SETTINGS["METRICS_INTERVAL"])))
+    if handoff:
+        background.append(asyncio.create_task(handoff.run()))
+        background.append(asyncio.create_task(
+            handoff.checkpoint_periodically(bot.sessions, deadline, SETTINGS["HANDOFF_INTERVAL"])))
+        # Actions'ta: kapanıştan önce sonraki koşuyu başlat, maçları ona devret
+        dispatcher = GitHubDispatcher.from_env()
+        if dispatcher:
+            background.append(asyncio.create_task(
+                handoff.hand_over(dispatcher, bot.sessions, deadline, SETTINGS["HANDOFF_LEAD"])))
+    if config.get("matchmaking"):
+        mm = Matchmaker(client, config, active_games, metrics=bot.metrics, resources=bot.resources)
+        background.append(asyncio.create_task(start_matchmaker(mm, handoff)))
+
+    print(f"🔥 Oxydan Aegis Hazır. ID: {my_id} | Max Slot: {bot.max_games}", flush=True)
+
+    # Kritik zaman kontrolü: süre dolunca olay döngüsü (ve maç görevleri) iptal edilir
+    remaining = SETTINGS["MAX_TOTAL_RUNTIME"] - (time.time() - start_time)
+    try:
+        await asyncio.wait_for(event_loop(client, bot, my_id, active_games, start_time, handoff), max(1.0, remaining))
+    except asyncio.TimeoutError:
+        print("🛑 Toplam süre doldu. Kapanıyor.")
+    finally:
+        for task in background: task.cancel()
+        if metrics_server: metrics_server.close()
+        bot.metrics.dump()
+        await bot.close()
+        await client.close()
+
+async def main():
+    try:
+        with open("config.yml", "r") as f:
+            config = yaml.safe_load(f)
+    except:
+        print("HATA: config.yml okunamadı.")
+        return
+
+    # Yerel sahte sunucuyla test için LICHESS_URL verilebilir
+    url = os.environ.get('LICHESS_URL') or config.get('url') or "https://lichess.org/"
+    client = LichessClient(SETTINGS["TOKEN"], base_url=url)
+    await run_bot(client, config)
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
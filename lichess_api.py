@@ -0,0 +1,172 @@
+import json
+from abc import ABC, abstractmethod
+from urllib.parse import quote
+
+import aiohttp
+
+
+class LichessError(Exception):
+    """HTTP hata cevabı. Mesaj durum kodunu içerir ("429" kontrolleri için)."""
+
+    def __init__(self, status, body=""):
+        super().__init__(f"HTTP {status}: {body[:200]}")
+        self.status = status
+        self.body = body
+
+    @property
+    def retryable(self):
+        """429 ve 5xx geçicidir; diğer 4xx cevaplar (yasadışı hamle, sıra bizde değil) tekrar denenmez."""
+        return self.status == 429 or self.status >= 500
+
+
+class Transport(ABC):
+    """
+    Botun (lichess-bot.py, matchmaking.py) Lichess ile konuştuğu arayüz.
+    LichessClient gerçek HTTP uygulamasıdır; yük testlerinde aynı metotları
+    sunan süreç içi bir taşıyıcı verilebilir (bkz. tools/mock_lichess.py).
+    Akış metotları async iterator döndürür, diğerleri coroutine'dir. Eksik
+    metodu olan bir taşıyıcı oluşturulurken TypeError verir.
+    """
+
+    @abstractmethod
+    async def get_account(self): ...
+    @abstractmethod
+    def stream_incoming_events(self): ...
+    @abstractmethod
+    def stream_game_state(self, game_id): ...
+    @abstractmethod
+    async def make_move(self, game_id, move): ...
+    @abstractmethod
+    async def post_message(self, game_id, text, room="player"): ...
+    @abstractmethod
+    async def accept_challenge(self, challenge_id): ...
+    @abstractmethod
+    async def decline_challenge(self, challenge_id, reason="generic"): ...
+    @abstractmethod
+    async def create_challenge(self, username, rated, clock_limit, clock_increment): ...
+    @abstractmethod
+    async def get_public_data(self, username): ...
+    @abstractmethod
+    async def get_users(self, user_ids): ...
+    @abstractmethod
+    async def get_ongoing_games(self): ...
+    @abstractmethod
+    def get_online_bots(self, limit=50): ...
+    async def close(self): pass
+
+
+class LichessClient(Transport):
+    """
+    Lichess Bot API'si için aiohttp üzerinde asyncio istemcisi.
+
+    - Normal istekler keep-alive bağlantı havuzunu paylaşır (en fazla
+      pool_size bağlantı, fazlası sırada bekler).
+    - Akışlar (olaylar, maç durumu) ayrı, sınırsız bir oturumdan açılır:
+      uzun ömürlü akışlar havuzdaki hamle bağlantılarını tutmaz. ndjson
+      satırları async iterator olarak verilir.
+    - base_url config.yml'deki `url`den gelir; yerel sahte sunucuya
+      (http://127.0.0.1:PORT/) yönlendirilebilir.
+    """
+
+    def __init__(self, token, base_url="https://lichess.org/", pool_size=8, timeout=15.0):
+        self.token = token
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._session = None
+        self._streams = None
+
+    # --- Oturum ---
+    def _headers(self, accept):
+        headers = {"Accept": accept, "User-Agent": "Oxydan-Bot"}
+        if self.token: headers["Authorization"] = f"Bearer {self.token}"
+        return headers
+
+    def _sessions(self):
+        # Oturumlar çalışan döngüde, ilk istekte açılır
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=aiohttp.ClientTimeout(total=self.timeout))
+            self._streams = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=0),
+                timeout=aiohttp.ClientTimeout(total=None, sock_connect=self.timeout))
+        return self._session, self._streams
+
+    # --- Genel istekler ---
+    async def request(self, method, path, params=None, data=None, resend=True):
+        session, _ = self._sessions()
+        headers = self._headers("application/json")
+        # dict -> form gövdesi, str -> düz metin gövde (ör. /api/users id listesi)
+        if isinstance(data, str):
+            headers["Content-Type"] = "text/plain"
+        elif data is not None:
+            data = {k: str(v) for k, v in data.items()}
+        # Havuzdaki bağlantı sunucu tarafından kapatılmış olabilir: bir kez yenisiyle dene.
+        # resend=False: istek sunucuya ulaşmış olabilir (hamle), tekrarı çağıran karar verir
+        for attempt in range(2):
+            try:
+                async with session.request(method, self.base_url + path, params=params,
+                                           data=data, headers=headers) as resp:
+                    status, text = resp.status, await resp.text(errors="replace")
+                break
+            except aiohttp.ServerDisconnectedError:
+                if attempt or not resend: raise
+        if status >= 400:
+            raise LichessError(status, text)
+        return json.loads(text) if text.strip() else {}
+
+    async def stream(self, path, params=None):
+        """ndjson akışı: her satırı dict olarak verir, boş keep-alive satırlarını atlar."""
+        _, streams = self._sessions()
+        async with streams.get(self.base_url + path, params=params,
+                               headers=self._headers("application/x-ndjson")) as resp:
+            if resp.status >= 400:
+                raise LichessError(resp.status, await resp.text(errors="replace"))
+            async for line in resp.content:
+                if line.strip(): yield json.loads(line)
+
+    async def close(self):
+        for session in (self._session, self._streams):
+            if session is not None: await session.close()
+        self._session = self._streams = None
+
+    # --- Bot API ---
+    async def get_account(self):
+        return await self.request("GET", "/api/account")
+
+    def stream_incoming_events(self):
+        return self.stream("/api/stream/event")
+
+    def stream_game_state(self, game_id):
+        return self.stream(f"/api/bot/game/stream/{game_id}")
+
+    async def make_move(self, game_id, move):
+        return await self.request("POST", f"/api/bot/game/{game_id}/move/{move}", resend=False)
+
+    async def post_message(self, game_id, text, room="player"):
+        return await self.request("POST", f"/api/bot/game/{game_id}/chat", data={"room": room, "text": text})
+
+    async def accept_challenge(self, challenge_id):
+        return await self.request("POST", f"/api/challenge/{challenge_id}/accept")
+
+    async def decline_challenge(self, challenge_id, reason="generic"):
+        return await self.request("POST", f"/api/challenge/{challenge_id}/decline", data={"reason": reason})
+
+    async def create_challenge(self, username, rated, clock_limit, clock_increment):
+        data = {"rated": str(bool(rated)).lower(), "clock.limit": clock_limit, "clock.increment": clock_increment}
+        return await self.request("POST", f"/api/challenge/{quote(username)}", data=data)
+
+    async def get_public_data(self, username):
+        return await self.request("GET", f"/api/user/{quote(username)}")
+
+    async def get_users(self, user_ids):
+        """Çoklu kullanıcı uç noktası: tek istekte en fazla 300 kullanıcı (perfs dahil)."""
+        return await self.request("POST", "/api/users", data=",".join(user_ids[:300]))
+
+    async def get_ongoing_games(self):
+        """Süren maçlar (gameId, color, isMyTurn...): yeniden başlatmada maçlara geri bağlanmak için."""
+        return (await self.request("GET", "/api/account/playing", params={"nb": 50})).get("nowPlaying", [])
+
+    def get_online_bots(self, limit=50):
+        return self.stream("/api/bot/online", params={"nb": limit})
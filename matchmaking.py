@@ -1,6 +1,6 @@
+import asyncio
 import time
 import random
-import itertools
 import os
 from datetime import datetime, timedelta
 
@@ -9,23 +9,60 @@ from datetime import datetime, timedelta
 # ==========================================================
 SETTINGS = {
     "RATED_MODE": True,          # True: Puanlı, False: Puansız (Test için False kalmalı)
-    "MAX_PARALLEL_GAMES": 2,     # Aynı anda kaç maç yapılsın? (GitHub için 1 önerilir)
+    "MAX_PARALLEL_GAMES": 2,     # Aynı anda kaç maç yapılsın? (ResourceScheduler verilirse onun sınırı geçerli)
     "MIN_RATING": 1500,          # Rakip minimum kaç elo olsun?
     "MAX_RATING": 4000,          # Rakip maksimum kaç elo olsun?
     "SAFETY_LOCK_TIME": 60,      # Davet attıktan sonra kaç saniye dondurulsun? (Beton Fren)
     "LOW_ELO_THRESHOLD": 2000,
     "STOP_FILE": "STOP.txt",     # Durdurma dosyası adı
+    "LOW_ELO_TIME_CONTROLS": ["1+0", "1+1", "2+1", "3+0", "5+0"],
     "TIME_CONTROLS": ["1+0", "1+1", "2+1",                  # Bullet
         "3+0", "3+2", "5+0", "5+3",            # Blitz
         "10+0", "10+5", "15+10",               # Rapid
         "30+0"], # Rastgele seçilecek süreler
     "POOL_REFRESH_SECONDS": 1800, # Bot listesi kaç saniyede bir güncellensin?
+    "RATING_TTL_SECONDS": 3600,   # Önbellekteki rating kaç saniye geçerli?
     "BLACKLIST_MINUTES": 30      # Reddeden veya maç yapılan botu kaç dk engelle?
 }
 # ==========================================================
 
+RATING_PERFS = ('blitz', 'bullet', 'rapid')
+
+
+def max_rating(user):
+    """Kullanıcının en yüksek ratingini (Blitz, Bullet veya Rapid) döndürür."""
+    perfs = (user or {}).get('perfs') or {}
+    return max([perfs.get(c, {}).get('rating', 0) for c in RATING_PERFS] or [0])
+
+
+class RatingCache:
+    """
+    Bot id -> rating önbelleği (TTL'li). Online bot akışı zaten `perfs`
+    taşıdığı için havuz yenilenirken toplu doldurulur; eksikler çoklu
+    kullanıcı uç noktasıyla tek istekte tamamlanır.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._ratings = {}
+
+    def put(self, user):
+        user_id = (user or {}).get('id')
+        if user_id and user.get('perfs') is not None:
+            self._ratings[user_id.lower()] = (max_rating(user), time.time() + self.ttl)
+
+    def get(self, user_id):
+        entry = self._ratings.get(user_id.lower())
+        if entry is None or entry[1] < time.time():
+            return None
+        return entry[0]
+
+    def missing(self, user_ids):
+        return [u for u in user_ids if self.get(u) is None]
+
+
 class Matchmaker:
-    def __init__(self, client, config, active_games): 
+    def __init__(self, client, config, active_games, metrics=None, resources=None):
         self.client = client
         self.config = config.get("matchmaking", {})
         self.enabled = self.config.get("allow_feed", True)
@@ -35,44 +72,57 @@ class Matchmaker:
         self.blacklist = {}
         self.last_pool_update = 0
         self.wait_timeout = 120
-        self._initialize_id()
-
-    def _initialize_id(self):
+        self.ratings = RatingCache(SETTINGS["RATING_TTL_SECONDS"])
+        # API çağrısı / gönderilen davet oranı için
+        self.metrics = metrics
+        self.stats = {"api_calls": 0, "challenges": 0}
+        # Host kaynakları: maç sınırı ve mevcut yükte kaldırılabilecek tempolar
+        self.resources = resources
+        self.max_games = resources.games if resources else SETTINGS["MAX_PARALLEL_GAMES"]
+
+    def _api_call(self, n=1):
+        self.stats["api_calls"] += n
+        if self.metrics: self.metrics.inc("matchmaker_api_calls", n)
+
+    async def _initialize_id(self):
         """Botun kendi ID'sini doğrular."""
         try:
-            self.my_id = self.client.account.get()['id']
+            self._api_call()
+            self.my_id = (await self.client.get_account())['id']
             print(f"[Matchmaker] Bağlantı Başarılı. ID: {self.my_id}")
         except: 
             self.my_id = "oxydan"
 
-    def _refresh_bot_pool(self):
-        """Online bot listesini çeker ve karıştırır."""
+    async def _refresh_bot_pool(self):
+        """Online bot listesini çeker, ratingleri önbelleğe yazar ve karıştırır."""
         now = time.time()
         if not self.bot_pool or (now - self.last_pool_update > SETTINGS["POOL_REFRESH_SECONDS"]):
             try:
-                stream = self.client.bots.get_online_bots()
-                online_bots = list(itertools.islice(stream, 50))
+                self._api_call()
+                online_bots = [b async for b in self.client.get_online_bots(50)]
+                for b in online_bots: self.ratings.put(b)
                 self.bot_pool = [b.get('id') for b in online_bots if b.get('id') and b.get('id').lower() != self.my_id.lower()]
                 random.shuffle(self.bot_pool)
                 self.last_pool_update = now
                 print(f"[Matchmaker] Bot havuzu güncellendi: {len(self.bot_pool)} bot bulundu.")
             except: 
-                time.sleep(10)
+                await asyncio.sleep(10)
 
-    def _get_bot_rating(self, bot_id):
-        """Botun en yüksek ratingini (Blitz, Bullet veya Rapid) döndürür."""
+    async def _fill_ratings(self, candidates):
+        """Önbellekte olmayan/eskimiş adayların ratinglerini tek toplu istekle getirir."""
+        missing = self.ratings.missing(candidates)
+        if not missing: return
         try:
-            user_data = self.client.users.get_public_data(bot_id)
-            perfs = user_data.get('perfs', {})
-            # Mevcut ratingleri topla, yoksa 0 say
-            ratings = [
-                perfs.get('blitz', {}).get('rating', 0),
-                perfs.get('bullet', {}).get('rating', 0),
-                perfs.get('rapid', {}).get('rating', 0)
-            ]
-            return max(ratings) if ratings else 0
-        except Exception:
-            return 0
+            self._api_call()
+            for user in await self.client.get_users(missing):
+                self.ratings.put(user)
+        except Exception as e:
+            if "429" in str(e): raise
+
+    def _affordable(self, time_controls):
+        """Yük altında hamle başı yeterli çekirdek süresi kalmayan tempolar elenir."""
+        if self.resources is None: return time_controls
+        return self.resources.affordable(time_controls, len(self.active_games))
 
     def _is_stop_triggered(self):
         """STOP.txt kontrolü yapar ve aktif maç yoksa sistemi tamamen kapatır."""
@@ -83,34 +133,28 @@ class Matchmaker:
             return True
         return False
 
-    def _find_suitable_target(self):
-        """Ayarlara uygun rakibi seçer."""
-        self._refresh_bot_pool()
+    async def _find_suitable_target(self):
+        """Ayarlara uygun rakibi önbellekteki ratinglerden seçer: (bot, rating) veya None."""
+        await self._refresh_bot_pool()
         now = datetime.now()
 
-        for candidate in self.bot_pool[:20]: # İlk 20 botu hızlıca tara
-            if candidate in self.blacklist and self.blacklist[candidate] > now:
-                continue
-            time.sleep(2)
-            
-            try:
-                user_data = self.client.users.get_public_data(candidate)
-                perfs = user_data.get('perfs', {})
-                # En yüksek rating hangisiyse onu baz al
-                max_r = max([perfs.get(c, {}).get('rating', 0) for c in ['blitz', 'bullet', 'rapid']] or [0])
-
-                if SETTINGS["MIN_RATING"] <= max_r <= SETTINGS["MAX_RATING"]:
-                    return candidate
-                else:
-                    # Kriter dışı botu 12 saat engelle
-                    self.blacklist[candidate] = now + timedelta(hours=12)
-            except: 
-                continue
+        candidates = [c for c in self.bot_pool[:20]   # İlk 20 bot
+                      if not (c in self.blacklist and self.blacklist[c] > now)]
+        await self._fill_ratings(candidates)
+
+        for candidate in candidates:
+            max_r = self.ratings.get(candidate)
+            if max_r is None: continue
+            if SETTINGS["MIN_RATING"] <= max_r <= SETTINGS["MAX_RATING"]:
+                return candidate, max_r
+            # Kriter dışı botu 12 saat engelle
+            self.blacklist[candidate] = now + timedelta(hours=12)
         return None
 
-    def start(self):
+    async def start(self):
         if not self.enabled: return
-        print(f"🚀 Oxydan Matchmaker Aktif. (Max Slot: {SETTINGS['MAX_PARALLEL_GAMES']})")
+        await self._initialize_id()
+        print(f"🚀 Oxydan Matchmaker Aktif. (Max Slot: {self.max_games})")
 
         while True:
             # --- 1. AKILLI STOP KONTROLÜ (Düzeltildi) ---
@@ -121,33 +165,39 @@ class Matchmaker:
                     os._exit(0)  # Süreci kesin olarak bitirir
                 else:
                     print(f"⏳ STOP algılandı! Mevcut {active_count} maçın bitmesi bekleniyor... Yeni davet atılmayacak.")
-                    time.sleep(30)
+                    await asyncio.sleep(30)
                     continue # Yeni maç arama adımını atla, döngü başına dön
 
             # --- 2. Maç Sayısı Kontrolü ---
-            if len(self.active_games) >= SETTINGS["MAX_PARALLEL_GAMES"]:
-                time.sleep(15)
+            if len(self.active_games) >= self.max_games:
+                await asyncio.sleep(15)
                 continue
 
             try:
                 # --- 3. Rakip Bulma ---
-                target = self._find_suitable_target()
-                if not target:
-                    time.sleep(20)
+                found = await self._find_suitable_target()
+                if not found:
+                    await asyncio.sleep(20)
                     continue
 
                 # --- 4. ELO BAZLI STRATEJİ (2000 ELO Altı Düzenlemesi) ---
-                target_rating = self._get_bot_rating(target)
-                
-                if target_rating < SETTINGS["LOW_ELO_THRESHOLD"]:
+                target, target_rating = found
+                low_elo = target_rating < SETTINGS["LOW_ELO_THRESHOLD"]
+                time_controls = self._affordable(SETTINGS["LOW_ELO_TIME_CONTROLS" if low_elo else "TIME_CONTROLS"])
+                if not time_controls:
+                    print("[Matchmaker] Mevcut yükte uygun tempo yok, davet ertelendi.")
+                    await asyncio.sleep(15)
+                    continue
+
+                if low_elo:
                     # 2000 Altı: Her zaman PUANSIZ ve Hızlı Tempo
                     is_rated = False
-                    tc = random.choice(["1+0", "1+1", "2+1", "3+0", "5+0"])
+                    tc = random.choice(time_controls)
                     print(f"🎯 Düşük ELO ({target_rating}): Puansız ve Hızlı Tempo seçildi.")
                 else:
                     # 2000 Üstü: Normal Ayarlar
                     is_rated = SETTINGS["RATED_MODE"]
-                    tc = random.choice(SETTINGS["TIME_CONTROLS"])
+                    tc = random.choice(time_controls)
 
                 t_limit, t_inc = map(int, tc.split('+'))
 
@@ -155,28 +205,34 @@ class Matchmaker:
                 print(f"[Matchmaker] -> {target} ({tc}) Davet ediliyor... (Rated: {is_rated})")
                 self.blacklist[target] = datetime.now() + timedelta(minutes=SETTINGS["BLACKLIST_MINUTES"])
                 
-                self.client.challenges.create(
+                self._api_call()
+                await self.client.create_challenge(
                     username=target,
                     rated=is_rated,
                     clock_limit=t_limit * 60,
                     clock_increment=t_inc
                 )
                 
+                self.stats["challenges"] += 1
+                if self.metrics: self.metrics.inc("matchmaker_challenges")
+                per_challenge = self.stats["api_calls"] / self.stats["challenges"]
+                print(f"[Matchmaker] API çağrısı/davet: {per_challenge:.1f} ({self.stats['api_calls']}/{self.stats['challenges']})")
+
                 # --- 6. Güvenlik Kilidi ---
                 print(f"[Matchmaker] ✅ Davet gitti. {SETTINGS['SAFETY_LOCK_TIME']}sn GÜVENLİK KİLİDİ aktif.")
-                time.sleep(SETTINGS["SAFETY_LOCK_TIME"]) 
+                await asyncio.sleep(SETTINGS["SAFETY_LOCK_TIME"]) 
 
             except Exception as e:
                 if "429" in str(e):
                     print(f"⚠️ [Matchmaker] Lichess Rate Limit uyarısı! {self.wait_timeout} saniye boyunca tüm istekler durduruluyor...")
-                    time.sleep(self.wait_timeout)
+                    await asyncio.sleep(self.wait_timeout)
                     
                     # Hata devam ederse bir sonraki bekleme süresini iki katına çıkar (Maksimum 1 saat olsun)
                     self.wait_timeout = min(self.wait_timeout * 2, 3600) 
                 else:
                     print(f"[Matchmaker] Hata: {e}")
                     # Normal hatalarda bekleme süresini sıfırlama, ama 30 saniye bekle
-                    time.sleep(30)
+                    await asyncio.sleep(30)
                     
                 continue
             self.wait_timeout = 120
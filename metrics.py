@@ -0,0 +1,175 @@
+import asyncio
+import json
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Saniye cinsinden aşama süreleri (1 ms .. 30 sn)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+NPS_BUCKETS = (1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 2e6, 4e6, 8e6, 1.6e7)
+DEPTH_BUCKETS = tuple(range(2, 42, 2))
+
+
+class Histogram:
+    """Sabit kovalı histogram. observe() bir bisect ve üç toplama; sıcak yolda ucuz."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Kova üst sınırından yaklaşık yüzdelik (son kova için son sınır)."""
+        if not self.count: return 0.0
+        target, seen = q * self.count, 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return self.bounds[min(i, len(self.bounds) - 1)]
+        return self.bounds[-1]
+
+    def snapshot(self):
+        return {"count": self.count, "sum": round(self.sum, 6),
+                "p50": self.quantile(0.5), "p90": self.quantile(0.9), "p99": self.quantile(0.99)}
+
+
+class Metrics:
+    """
+    Hamle gecikmesi ölçümleri:
+      - aşama histogramları (book, tablebase, engine_wait, search, make_move, think, move_total)
+      - sayaçlar (make_move tekrar/başarısızlık vb.)
+      - motorun arama sonu NPS ve derinliği (UCI info)
+      - maç başına saat izi: tools/time_harness.py'nin JSONL iz formatında
+        (game_id, color, clock, inc, plies[{fen, clock, ...}])
+
+    Dışa aktarım: Prometheus metin formatında yerel HTTP uç noktası (/metrics)
+    ve periyodik JSONL anlık görüntüsü.
+    """
+
+    def __init__(self, dump_path=None, trace_path=None, prefix="oxydan"):
+        self.dump_path = dump_path
+        self.trace_path = trace_path
+        self.prefix = prefix
+        self.started = time.time()
+        self._hist = {}      # (aile, etiket) -> Histogram
+        self._counters = {}
+        self._traces = {}
+
+    # --- Kayıt ---
+    def observe(self, family, value, label=None, buckets=LATENCY_BUCKETS):
+        hist = self._hist.get((family, label))
+        if hist is None:
+            hist = self._hist[(family, label)] = Histogram(buckets)
+        hist.observe(value)
+
+    def stage(self, name, seconds):
+        self.observe("stage_seconds", seconds, name)
+
+    @contextmanager
+    def timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage(name, time.perf_counter() - start)
+
+    def inc(self, name, n=1):
+        self._counters[name] = self._counters.get(name, 0) + n
+
+    def engine_info(self, info):
+        """Arama sonu info'sundan NPS ve derinlik."""
+        if not info: return
+        if info.get("nps"): self.observe("engine_nps", info["nps"], buckets=NPS_BUCKETS)
+        if info.get("depth"): self.observe("engine_depth", info["depth"], buckets=DEPTH_BUCKETS)
+
+    def histogram(self, family, label=None):
+        return self._hist.get((family, label))
+
+    # --- Saat izleri ---
+    def trace_move(self, game_id, color, clock, inc, fen, **extra):
+        trace = self._traces.get(game_id)
+        if trace is None:
+            trace = self._traces[game_id] = {"game_id": game_id, "color": color, "clock": clock,
+                                             "inc": inc, "plies": []}
+        trace["plies"].append(dict(extra, fen=fen, clock=round(clock, 3)))
+
+    def end_game(self, game_id):
+        trace = self._traces.pop(game_id, None)
+        if not trace or not trace["plies"] or not self.trace_path: return trace
+        self._append(self.trace_path, trace)
+        return trace
+
+    # --- Dışa aktarım ---
+    def snapshot(self):
+        return {
+            "ts": int(time.time()), "uptime": round(time.time() - self.started, 1),
+            "counters": dict(self._counters),
+            "histograms": {f"{f}:{l}" if l else f: h.snapshot() for (f, l), h in self._hist.items()},
+        }
+
+    def dump(self):
+        if self.dump_path: self._append(self.dump_path, self.snapshot())
+
+    @staticmethod
+    def _append(path, row):
+        try:
+            with open(path, "a") as f:
+                f.write(json.dumps(row) + "\n")
+        except OSError:
+            pass
+
+    def render_prometheus(self):
+        p, lines = self.prefix, []
+        for name, value in sorted(self._counters.items()):
+            lines.append(f"# TYPE {p}_{name}_total counter")
+            lines.append(f"{p}_{name}_total {value}")
+        seen = set()
+        for (family, label), hist in sorted(self._hist.items(), key=lambda kv: (kv[0][0], kv[0][1] or "")):
+            if family not in seen:
+                lines.append(f"# TYPE {p}_{family} histogram")
+                seen.add(family)
+            tag = f'stage="{label}",' if label else ""
+            cumulative = 0
+            for bound, n in zip(hist.bounds, hist.counts):
+                cumulative += n
+                lines.append(f'{p}_{family}_bucket{{{tag}le="{bound:g}"}} {cumulative}')
+            lines.append(f'{p}_{family}_bucket{{{tag}le="+Inf"}} {hist.count}')
+            suffix = f"{{{tag.rstrip(',')}}}" if tag else ""
+            lines.append(f"{p}_{family}_sum{suffix} {hist.sum:.6f}")
+            lines.append(f"{p}_{family}_count{suffix} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    async def serve(self, port, host="127.0.0.1"):
+        """GET /metrics (Prometheus metni) ve GET /metrics.json uç noktaları."""
+        async def handle(reader, writer):
+            try:
+                request = (await reader.readline()).decode("latin-1").split()
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""): pass
+                path = request[1] if len(request) > 1 else "/"
+                if path.startswith("/metrics.json"):
+                    body, ctype, code = json.dumps(self.snapshot()).encode(), "application/json", "200 OK"
+                elif path.startswith("/metrics"):
+                    body, ctype, code = self.render_prometheus().encode(), "text/plain; version=0.0.4", "200 OK"
+                else:
+                    body, ctype, code = b"not found\n", "text/plain", "404 Not Found"
+                writer.write(f"HTTP/1.1 {code}\r\nContent-Type: {ctype}\r\nContent-Length: {len(body)}\r\n"
+                             f"Connection: close\r\n\r\n".encode() + body)
+                await writer.drain()
+            except (ConnectionError, IndexError):
+                pass
+            finally:
+                writer.close()
+        return await asyncio.start_server(handle, host, port)
+
+    async def dump_periodically(self, interval=60.0):
+        while True:
+            await asyncio.sleep(interval)
+            self.dump()
@@ -0,0 +1,88 @@
+import asyncio
+import random
+import time
+from collections import namedtuple
+
+import aiohttp
+
+from lichess_api import LichessError
+
+# status: sent | already_played | rejected | timeout
+SubmitResult = namedtuple("SubmitResult", "status attempts elapsed error")
+
+TRANSPORT_ERRORS = (aiohttp.ClientError, ConnectionError, OSError, asyncio.TimeoutError)
+
+
+def submit_budget(clock, spent, margin=0.05, floor=0.3):
+    """
+    Hamleyi göndermek için kalan süre (sn): sıra bizdeyken sunucudaki saatimiz
+    akmaya devam eder, bu yüzden aramaya giden süre düşülür. Saat bitmek
+    üzereyse de en az bir deneme yapılır (floor).
+    """
+    return max(floor, clock - spent - margin)
+
+
+class MoveSender:
+    """
+    Saatle sınırlı hamle gönderimi. Tüm maçlar istemcinin keep-alive
+    bağlantı havuzunu paylaşır.
+
+    Denemeler `budget` saniyelik süre içinde yapılır: her deneme kalan süreyle
+    sınırlıdır, aralarında tam jitter'lı üstel bekleme vardır (0..min(MAX_BACKOFF,
+    BASE_BACKOFF * 2^n)) ve bekleme süreyi aşamaz. Sadece taşıma hataları (bağlantı
+    kopması, zaman aşımı, 429, 5xx) tekrar denenir. 4xx cevabı ilk denemede
+    gelirse hamle reddedilmiştir (yasadışı / sıra bizde değil / maç bitti);
+    önceki deneme sunucuya ulaşmış olabiliyorsa (bağlantı cevap beklerken
+    koptu) hamle zaten oynanmıştır, tekrar gönderilmez.
+    """
+
+    BASE_BACKOFF = 0.05
+    MAX_BACKOFF = 1.0
+    ATTEMPT_TIMEOUT = 5.0
+    MIN_ATTEMPT = 0.05   # Bundan az süre kaldıysa yeni deneme yapılmaz
+
+    def __init__(self, client, metrics=None, rng=None):
+        self.client = client
+        self.metrics = metrics
+        self.rng = rng or random.Random()
+        self.stats = {"sent": 0, "already_played": 0, "rejected": 0, "timeout": 0, "retries": 0}
+
+    def _backoff(self, attempt, remaining):
+        return min(remaining - self.MIN_ATTEMPT, self.rng.uniform(0, min(self.MAX_BACKOFF, self.BASE_BACKOFF * 2 ** attempt)))
+
+    async def submit(self, game_id, move, budget):
+        """Hamleyi en geç `budget` saniye içinde göndermeye çalışır; SubmitResult döndürür."""
+        started = time.monotonic()
+        deadline = started + budget
+        attempts, delivered, error = 0, False, None
+        while True:
+            remaining = deadline - time.monotonic()
+            if attempts and remaining < self.MIN_ATTEMPT:
+                status = "timeout"
+                break
+            attempts += 1
+            try:
+                await asyncio.wait_for(self.client.make_move(game_id, move),
+                                       max(self.MIN_ATTEMPT, min(self.ATTEMPT_TIMEOUT, remaining)))
+                status = "sent"
+                break
+            except LichessError as e:
+                error = e
+                if not e.retryable:
+                    status = "already_played" if delivered else "rejected"
+                    break
+            except TRANSPORT_ERRORS as e:
+                # İstek yazıldıktan sonra kopan bağlantı: sunucu hamleyi uygulamış olabilir
+                error, delivered = e, True
+            pause = self._backoff(attempts - 1, deadline - time.monotonic())
+            if pause > 0: await asyncio.sleep(pause)
+
+        elapsed = time.monotonic() - started
+        self.stats[status] += 1
+        self.stats["retries"] += attempts - 1
+        if self.metrics:
+            self.metrics.inc(f"move_submit_{status}")
+            if attempts > 1: self.metrics.inc("make_move_retries", attempts - 1)
+            if status in ("rejected", "timeout"): self.metrics.inc("make_move_failures")
+            self.metrics.stage("make_move", elapsed)
+        return SubmitResult(status, attempts, elapsed, None if status == "sent" else repr(error))
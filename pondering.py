@@ -0,0 +1,114 @@
+import asyncio
+import os
+import time
+
+
+def available_cores():
+    try: return len(os.sched_getaffinity(0))
+    except AttributeError: return os.cpu_count() or 1
+
+
+class CoreBudget:
+    """
+    Çekirdek bütçesi. Gerçek aramalar her zaman çalışır; ponder (rakibin
+    süresinde arama) sadece boş çekirdek varsa verilir. Yeni bir arama
+    bütçeyi aşarsa başka maçların ponder'ı durdurulur, böylece iki paralel
+    maç 2 çekirdekli makinede birbirinin CPU'sunu çalmaz.
+    """
+
+    def __init__(self, cores=None):
+        self.cores = cores or available_cores()
+        self._searching = {}   # game_id -> thread sayısı
+        self._pondering = {}   # game_id -> (thread sayısı, durdurma coroutine'i)
+
+    def _used(self):
+        return sum(self._searching.values()) + sum(t for t, _ in self._pondering.values())
+
+    def start_search(self, game_id, threads):
+        """Aramayı bütçeye yazar, bütçeyi aşan diğer ponder'ların durdurucularını döndürür."""
+        self._pondering.pop(game_id, None)   # Kendi ponder'ımız aramaya dönüşür
+        self._searching[game_id] = threads
+        victims = []
+        for other, (t, stop) in list(self._pondering.items()):
+            if self._used() <= self.cores: break
+            del self._pondering[other]
+            victims.append(stop)
+        return victims
+
+    def end_search(self, game_id):
+        self._searching.pop(game_id, None)
+
+    def try_ponder(self, game_id, threads, stop):
+        self._searching.pop(game_id, None)
+        if self._used() + threads > self.cores:
+            return False
+        self._pondering[game_id] = (threads, stop)
+        return True
+
+    def forget(self, game_id):
+        self._searching.pop(game_id, None)
+        return self._pondering.pop(game_id, None)
+
+
+class PonderManager:
+    """
+    Maç başına ponder durumu ve istatistikleri. python-chess `play(ponder=True)`
+    bestmove'dan sonra beklenen cevap üzerinde `go ponder` başlatır; bir
+    sonraki `play` aynı pozisyonla çağrılırsa `ponderhit` gönderir (harcanan
+    süre korunur), farklı pozisyonda ise `stop` ile temiz şekilde keser.
+    """
+
+    def __init__(self, cores=None, threads=1):
+        self.budget = CoreBudget(cores)
+        self.threads = threads
+        self.stats = {"hits": 0, "misses": 0, "denied": 0, "no_ponder_move": 0, "preempted": 0,
+                      "ponder_time_on_hits": 0.0}
+        self._tasks = set()
+
+    def before_search(self, session, board):
+        """Ponder tuttu mu? Sonra çekirdek bütçesinden arama payını alır."""
+        expect = session.ponder_expect
+        if expect:
+            base, moves, since = expect
+            hit = len(board.move_stack) == base + 2 and board.move_stack[-2:] == moves
+            self.stats["hits" if hit else "misses"] += 1
+            if hit: self.stats["ponder_time_on_hits"] += time.monotonic() - since
+            session.ponder_expect = None
+        victims = self.budget.start_search(session.game_id, self.threads)
+        self.stats["preempted"] += len(victims)
+        for stop in victims:
+            # Diğer maçların ponder'ı arka planda kesilir, aramamız beklemez
+            task = asyncio.create_task(stop())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def after_search(self, session, engine, board, move, ponder_move):
+        """Arama bitti: ponder başladıysa bütçeye yaz, bütçe yoksa hemen durdur."""
+        if not ponder_move:
+            self.stats["no_ponder_move"] += 1
+            self.budget.end_search(session.game_id)
+            return
+
+        async def stop():
+            # Kesilen ponder isabet sayılmaz; yeni komut ponder'ı iptal eder (stop)
+            session.ponder_expect = None
+            try: await engine.ping()
+            except Exception: pass
+
+        session.ponder_expect = (len(board.move_stack), [move, ponder_move], time.monotonic())
+        if not self.budget.try_ponder(session.game_id, self.threads, stop):
+            self.stats["denied"] += 1
+            await stop()
+
+    async def end_game(self, game_id, engine):
+        """Maç bitti: süren ponder'ı durdur ve bütçeden çıkar."""
+        self.budget.forget(game_id)
+        if engine is not None:
+            try: await asyncio.wait_for(engine.ping(), 5)
+            except Exception: pass
+
+    def summary(self):
+        s = dict(self.stats)
+        total = s["hits"] + s["misses"]
+        s["hit_rate"] = s["hits"] / total if total else 0.0
+        return s
@@ -0,0 +1,152 @@
+import os
+from collections import namedtuple
+
+from pondering import available_cores
+
+# Host planı: paralel maç, motor havuzu (arka uç başına), motor başı Threads / Hash (MB)
+HostPlan = namedtuple("HostPlan", "cores memory_mb games pool_size threads hash_mb backends", defaults=(1,))
+
+MAX_AUTO_GAMES = 8        # Otomatik modda en fazla paralel maç (API akış sayısı da büyür)
+MEMORY_FRACTION = 0.5     # Boş belleğin motorlara ayrılan payı
+ENGINE_OVERHEAD_MB = 24   # Hash dışı motor belleği (ikili, arama yığını)...
+THREAD_OVERHEAD_MB = 8    # ...ve thread başına geçmiş tabloları
+MIN_HASH_MB, MAX_HASH_MB = 16, 512   # Büyük Hash her ucinewgame'de temizlenir, ilk hamleden süre yer
+MOVES_LEFT = 30           # Zaman kontrolünden hamle başı süre tahmini
+MIN_CORE_SECONDS = 0.5    # Hamle başı bundan az çekirdek*saniye kalan tempo yük altında alınmaz
+
+
+def available_memory_mb():
+    """Linux'ta MemAvailable, yoksa toplam fiziksel bellek (MB)."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    try: return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") >> 20
+    except (ValueError, OSError, AttributeError): return 1024
+
+
+def _is_auto(value):
+    return value is None or str(value).strip().lower() == "auto"
+
+
+def plan_host(cores=None, memory_mb=None, games=None, pool_size=None, threads=None, hash_mb=None, backends=1):
+    """
+    Çekirdek ve belleğe göre plan. Verilen (None/"auto" olmayan) değerler
+    aynen korunur, sadece eksikler hesaplanır:
+      maç    = çekirdek sayısı (en fazla MAX_AUTO_GAMES), her maça en az 1 çekirdek
+      Threads = çekirdek // maç
+      havuz  = maç + 1 yedek (karma havuzda HCE ve NNUE için ayrı ayrı)
+      Hash   = boş belleğin MEMORY_FRACTION'ı / toplam motor, 2'nin kuvvetine yuvarlanır
+    """
+    cores = cores or available_cores()
+    memory_mb = memory_mb or available_memory_mb()
+    games = int(games) if not _is_auto(games) else max(1, min(MAX_AUTO_GAMES, cores))
+    threads = int(threads) if not _is_auto(threads) else max(1, cores // games)
+    pool_size = int(pool_size) if not _is_auto(pool_size) else games + 1
+    if _is_auto(hash_mb):
+        per_engine = memory_mb * MEMORY_FRACTION / (pool_size * backends) - ENGINE_OVERHEAD_MB - THREAD_OVERHEAD_MB * threads
+        hash_mb = MIN_HASH_MB
+        while hash_mb * 2 <= min(per_engine, MAX_HASH_MB):
+            hash_mb *= 2
+    return HostPlan(cores, memory_mb, games, pool_size, threads, int(hash_mb), backends)
+
+
+def parse_tc(tc):
+    """'3+2' -> (180.0, 2.0) saniye."""
+    minutes, inc = tc.split("+")
+    return float(minutes) * 60, float(inc)
+
+
+class ResourceScheduler:
+    """
+    Host kaynaklarını maçlara paylaştırır.
+
+    Açılışta plan_host ile paralel maç sınırı ve motor başı Threads/Hash
+    belirlenir. Çalışırken her aramadan önce maça Threads verilir: çekirdekler
+    aktif maçlar arasında kalan saatle ters orantılı paylaştırılır (saati az
+    olan maç aynı sürede daha derine insin), o an arayan diğer maçların
+    aldığı çekirdekler düşülür. Değer motorun mevcut ayarından farklıysa
+    hamleler arasında `setoption Threads` gönderilir; Ethereal bunda thread
+    havuzunu (geçmiş tablolarını) yeniden kurduğu için sadece gerçekten
+    değişince gönderilir. Hash açılıştan sonra değiştirilmez (TT silinir).
+
+    Matchmaker'a mevcut yükte hangi tempoların kaldırılabileceğini söyler.
+    """
+
+    def __init__(self, plan, shift=True):
+        self.plan = plan
+        self.shift = shift
+        self._clocks = {}     # game_id -> son bilinen kalan süre (sn)
+        self._granted = {}    # game_id -> şu an aramada kullanılan thread
+        self.stats = {"shifts": 0, "max_threads": plan.threads}
+
+    @classmethod
+    def detect(cls, games=None, pool_size=None, uci_options=None, shift=True, backends=1):
+        """uci_options içindeki Threads/Hash "auto" ya da eksikse hesaplanır; (zamanlayıcı, ayarlar)."""
+        options = dict(uci_options or {})
+        plan = plan_host(games=games, pool_size=pool_size, threads=options.get("Threads"), hash_mb=options.get("Hash"),
+                         backends=backends)
+        options.update(Threads=plan.threads, Hash=plan.hash_mb)
+        return cls(plan, shift=shift), options
+
+    @property
+    def games(self):
+        return self.plan.games
+
+    def describe(self):
+        p = self.plan
+        engines = f"{p.backends} x {p.pool_size}" if p.backends > 1 else p.pool_size
+        return (f"{p.cores} çekirdek, {p.memory_mb}MB boş bellek -> {p.games} maç, "
+                f"{engines} motor x (Threads {p.threads}, Hash {p.hash_mb}MB)")
+
+    # --- Arama başı thread paylaşımı ---
+    def threads_for(self, game_id, clock):
+        """Bu aramanın Threads değeri; end_search çağrılana kadar bütçeden düşülür."""
+        if game_id is not None: self._clocks[game_id] = clock
+        if not self.shift or game_id is None:
+            return self.plan.threads
+        weights = {g: 1.0 / max(1.0, c) for g, c in self._clocks.items()}
+        target = round(self.plan.cores * weights[game_id] / sum(weights.values()))
+        free = self.plan.cores - sum(t for g, t in self._granted.items() if g != game_id)
+        threads = max(1, min(target, free))
+        self._granted[game_id] = threads
+        self.stats["max_threads"] = max(self.stats["max_threads"], threads)
+        return threads
+
+    def end_search(self, game_id):
+        self._granted.pop(game_id, None)
+
+    def forget(self, game_id):
+        self._clocks.pop(game_id, None)
+        self._granted.pop(game_id, None)
+
+    async def apply(self, engine, threads):
+        """Motorun Threads ayarı farklıysa setoption gönderir; gönderildiyse True."""
+        if "Threads" not in engine.options or engine.config.get("Threads") == threads:
+            return False
+        await engine.configure({"Threads": threads})
+        self.stats["shifts"] += 1
+        return True
+
+    # --- Matchmaker ---
+    def affordable(self, time_controls, active_games):
+        """
+        Yeni bir maçın bu yükte oynanabileceği tempolar. Yeni maç çekirdeklerin
+        adil payını alır (yük ortalaması daha yüksekse ona göre azalır);
+        hamle başı tahmini süre x pay MIN_CORE_SECONDS'un altındaysa o tempo
+        elenir. Slot yoksa boş liste.
+        """
+        if active_games >= self.plan.games: return []
+        try: load = os.getloadavg()[0]
+        except (OSError, AttributeError): load = 0.0
+        busy = max(load, active_games * self.plan.threads)
+        share = min(self.plan.threads, self.plan.cores / (busy + self.plan.threads) * self.plan.threads)
+        result = []
+        for tc in time_controls:
+            base, inc = parse_tc(tc)
+            if (base / MOVES_LEFT + inc) * share >= MIN_CORE_SECONDS:
+                result.append(tc)
+        return result
@@ -153,6 +153,8 @@ void handleCommandLine(int argc, char **argv) {
         printf("\n          Evaluate all positions in a FEN file using various options\n");
         printf("\nnndata    [input-file] [output-file]");
         printf("\n          Build an nndata from a stripped pgn file\n");
+        printf("\ntunerdata [input-file] [output-file]");
+        printf("\n          Export evaluation traces for tools/tuner.py (TUNE builds)\n");
         exit(EXIT_SUCCESS);
     }
 
@@ -176,6 +178,10 @@ void handleCommandLine(int argc, char **argv) {
 
     // Tuner is being run from the command line
     #ifdef TUNE
+        if (argc > 3 && strEquals(argv[1], "tunerdata")) {
+            exportTunerData(argv[2], argv[3]);
+            exit(EXIT_SUCCESS);
+        }
         runTuner();
         exit(EXIT_SUCCESS);
     #endif
@@ -18,57 +18,168 @@
 #                                                                             #
 # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
 
-import argparse, subprocess, sys, time
-
-parser = argparse.ArgumentParser()
-parser.add_argument('engine',  help='Path to Engine')
-parser.add_argument('dataset', help='PERFT data file')
-parser.add_argument('--depth', help='Depth of PERFT [ blank = unlimited ]', default=128)
-arguments = parser.parse_args()
-
-process = subprocess.Popen(
-    arguments.engine,
-    stderr=subprocess.STDOUT,
-    stdout=subprocess.PIPE,
-    stdin=subprocess.PIPE,
-    universal_newlines=True
-)
-
-with open(arguments.dataset) as fin:
-    data = fin.readlines()
-
-SEPERATOR = '-' * 111 + '\n'
-HEADER    = '| {0:^5} | {1:^11} | {2:^76} | {3:^6} |\n'
-
-sys.stdout.write(SEPERATOR)
-sys.stdout.write(HEADER.format('Depth', 'Nodes', 'FEN', 'Status'))
-sys.stdout.write(SEPERATOR)
-
-start = time.time()
-
-for line in data:
+# Parallel PERFT runner. Every (fen, depth) pair is an independent job. Jobs are
+# ordered by their expected node count, most expensive first, and handed to a
+# pool of engine processes. Results are printed as they complete. Positions
+# already verified by an engine binary with the same SHA-256 are skipped,
+# using a small JSON cache. A JSON report with nodes/sec can be written with --report.
+
+import argparse, hashlib, json, os, queue, subprocess, sys, threading, time
+
+SEPERATOR = '-' * 126 + '\n'
+HEADER    = '| {0:^5} | {1:^11} | {2:^76} | {3:^6} | {4:^12} |\n'
+ROW       = '| {0:>5} | {1:>11} | {2:<76} | {3:^6} | {4:>12} |{5}\n'
+
+def binary_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fin:
+        for chunk in iter(lambda: fin.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_jobs(datasets, max_depth):
+    jobs = []
+    for dataset in datasets:
+        with open(dataset) as fin:
+            for line in fin:
+                if ';' not in line: continue
+                fen = line.split(';')[0].strip()
+                for token in line.split(';')[1:]:
+                    depth = int(token.split()[0][1:])
+                    nodes = int(token.split()[1])
+                    if depth > max_depth: break
+                    jobs.append((fen, depth, nodes))
+    # Most expensive first, so the long jobs do not all land at the end
+    return sorted(jobs, key=lambda job: -job[2])
+
+def load_cache(path):
+    try:
+        with open(path) as fin: return json.load(fin)
+    except (OSError, ValueError): return {}
+
+def save_cache(path, cache):
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as fout: json.dump(cache, fout)
+    os.replace(tmp, path)
+
+def drain(jobs, results, error):
+    # Every queued job still gets a result, so main never waits on a dead worker
+    while True:
+        try: fen, depth, nodes = jobs.get_nowait()
+        except queue.Empty: return
+        results.put((fen, depth, nodes, None, 0.0, error))
+
+def worker(engine, jobs, results):
+    try:
+        process = subprocess.Popen(
+            engine,
+            stderr=subprocess.STDOUT,
+            stdout=subprocess.PIPE,
+            stdin=subprocess.PIPE,
+            universal_newlines=True
+        )
+    except OSError as error:
+        return drain(jobs, results, 'engine failed to start: %s' % error)
+
+    while True:
+        try: fen, depth, nodes = jobs.get_nowait()
+        except queue.Empty: break
+
+        start, line = time.perf_counter(), ''
+        try:
+            process.stdin.write('position fen %s\n' % (fen))
+            process.stdin.write('perft %d\n' % (depth))
+            process.stdin.flush()
+            line = process.stdout.readline().strip()
+            found = int(line)
+        except (OSError, ValueError):
+            # Crashed or printed something unexpected: report it, stop this engine
+            error = 'engine exited (%s)' % process.poll() if process.poll() is not None else 'unexpected output %r' % line
+            results.put((fen, depth, nodes, None, time.perf_counter() - start, error))
+            process.kill()
+            return drain(jobs, results, 'not run, ' + error)
+        results.put((fen, depth, nodes, found, time.perf_counter() - start, None))
+
+    process.stdin.write('quit\n')
+    process.stdin.flush()
+    process.wait()
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('engine',    help='Path to Engine')
+    parser.add_argument('datasets',  help='PERFT data file(s)', nargs='+')
+    parser.add_argument('--depth',   help='Depth of PERFT [ blank = unlimited ]', type=int, default=128)
+    parser.add_argument('--workers', help='Engine processes [ blank = all cores ]', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--cache',   help='Verified results cache', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '.perft_cache.json'))
+    parser.add_argument('--no-cache',help='Run every job, ignoring the cache', action='store_true')
+    parser.add_argument('--report',  help='Write a JSON report to this path', default=None)
+    arguments = parser.parse_args()
+
+    sha256 = binary_hash(arguments.engine)
+    cache  = {} if arguments.no_cache else load_cache(arguments.cache)
+    known  = cache.setdefault(sha256, {})
+
+    todo, report = queue.Queue(), []
+    for fen, depth, nodes in load_jobs(arguments.datasets, arguments.depth):
+        if known.get('%s;%d' % (fen, depth)) == nodes:
+            report.append({'fen': fen, 'depth': depth, 'expected': nodes, 'found': nodes,
+                           'status': 'PASS', 'cached': True, 'seconds': 0.0, 'nps': None})
+        else: todo.put((fen, depth, nodes))
+
+    total   = todo.qsize()
+    workers = max(1, min(arguments.workers, total))
+    results = queue.Queue()
+
+    sys.stdout.write(SEPERATOR)
+    sys.stdout.write(HEADER.format('Depth', 'Nodes', 'FEN', 'Status', 'NPS'))
+    sys.stdout.write(SEPERATOR)
+
+    start   = time.time()
+    threads = [threading.Thread(target=worker, args=(arguments.engine, todo, results), daemon=True)
+               for _ in range(workers if total else 0)]
+    for thread in threads: thread.start()
+
+    failures = 0
+    for _ in range(total):
+
+        fen, depth, nodes, found, seconds, error = results.get()
+        nps    = int(found / seconds) if found and seconds > 0 else 0
+        status = 'PASS' if found == nodes else 'ERROR' if error else 'FAIL'
+        extra  = '' if found == nodes else ' (%s)' % (error) if error else ' (%10d)' % (found)
+
+        sys.stdout.write(ROW.format(depth, nodes, fen, status, nps, extra))
+        sys.stdout.flush()
 
-    for token in line.split(';')[1:]:
+        report.append({'fen': fen, 'depth': depth, 'expected': nodes, 'found': found,
+                       'status': status, 'cached': False, 'seconds': round(seconds, 4), 'nps': nps,
+                       'error': error})
 
-        fen   = line.split(';')[0]
-        depth = int(token.split(' ')[0][1:])
-        nodes = int(token.split(' ')[1])
-        if depth > arguments.depth: break
+        if found == nodes: known['%s;%d' % (fen, depth)] = nodes
+        else: failures += 1
 
-        sys.stdout.write('| {0:>5} | {1:>11} | {2:<76} | '.format(depth, nodes, fen))
-        sys.stdout.flush()
+    for thread in threads: thread.join()
+    elapsed = time.time() - start
 
-        process.stdin.write('position fen %s\n' % (fen))
-        process.stdin.write('perft %d\n' % (depth))
-        process.stdin.flush()
+    sys.stdout.write(SEPERATOR)
+    sys.stdout.write('Total Time: %dms | Jobs: %d run, %d cached, %d failed | Workers: %d\n' % (
+        1000 * elapsed, total, len(report) - total, failures, len(threads)))
 
-        found = int(process.stdout.readline().strip())
+    if not arguments.no_cache: save_cache(arguments.cache, cache)
 
-        if found == nodes: sys.stdout.write (' PASS  |\n')
-        if found != nodes: sys.stdout.write (' FAIL  | (%10d)\n' % (found))
+    if arguments.report:
+        ran = [r for r in report if not r['cached'] and r['found'] is not None]
+        with open(arguments.report, 'w') as fout:
+            json.dump({
+                'engine': arguments.engine, 'sha256': sha256, 'datasets': arguments.datasets,
+                'depth': arguments.depth, 'workers': len(threads), 'seconds': round(elapsed, 3),
+                'passed': sum(r['status'] == 'PASS' for r in report), 'failed': failures,
+                'cached': len(report) - total,
+                'nps': int(sum(r['found'] for r in ran) / max(1e-9, sum(r['seconds'] for r in ran))) if ran else None,
+                'results': report,
+            }, fout, indent=2)
 
-process.stdin.write('quit')
-process.stdin.flush()
+    sys.exit(1 if failures else 0)
 
-sys.stdout.write(SEPERATOR)
-sys.stdout.write('Total Time: %dms' % (1000 * (time.time() - start)))
+if __name__ == '__main__':
+    main()
@@ -177,6 +177,10 @@ void *start_search_threads(void *arguments) {
     // UCI spec does not want reports until out of pondering
     while (IS_PONDERING);
 
+    // Report Transposition Table usage for the whole search
+    printf("info string tthits %"PRIu64" nodes %"PRIu64"\n",
+        tthitsThreadPool(threads), nodesSearchedThreadPool(threads));
+
     // Report best move ( we should always have one )
     moveToString(best, str, board->chess960);
     printf("bestmove %s", str);
@@ -387,6 +391,8 @@ int search(Thread *thread, PVariation *pv, int alpha, int beta, int depth, bool
     // Step 4. Probe the Transposition Table, adjust the value, and consider cutoffs
     if ((ttHit = tt_probe(board->hash, thread->height, &ttMove, &ttValue, &ttEval, &ttDepth, &ttBound))) {
 
+        thread->tthits++; // Increment tthits counter for this thread
+
         // Only cut with a greater depth search, and do not return
         // when in a PvNode, unless we would otherwise hit a qsearch
         if (    ttDepth >= depth
@@ -844,6 +850,8 @@ int qsearch(Thread *thread, PVariation *pv, int alpha, int beta) {
     // Step 4. Probe the Transposition Table, adjust the value, and consider cutoffs
     if ((ttHit = tt_probe(board->hash, thread->height, &ttMove, &ttValue, &ttEval, &ttDepth, &ttBound))) {
 
+        thread->tthits++; // Increment tthits counter for this thread
+
         // Table is exact or produces a cutoff
         if (    ttBound == BOUND_EXACT
             || (ttBound == BOUND_LOWER && ttValue >= beta)
@@ -96,6 +96,7 @@ void newSearchThreadPool(Thread *threads, Board *board, Limits *limits, TimeMana
         threads[i].height = 0;
         threads[i].nodes  = 0ull;
         threads[i].tbhits = 0ull;
+        threads[i].tthits = 0ull;
 
         memcpy(&threads[i].board, board, sizeof(Board));
         threads[i].board.thread = &threads[i];
@@ -130,3 +131,16 @@ uint64_t tbhitsThreadPool(Thread *threads) {
 
     return tbhits;
 }
+
+uint64_t tthitsThreadPool(Thread *threads) {
+
+    // Sum up the Transposition Table hits across each Thread. Reported
+    // once per search so that callers can measure how warm the table was
+
+    uint64_t tthits = 0ull;
+
+    for (int i = 0; i < threads->nthreads; i++)
+        tthits += threads->threads[i].tthits;
+
+    return tthits;
+}
@@ -61,7 +61,7 @@ struct Thread {
     int multiPV;
     uint16_t bestMoves[MAX_MOVES];
 
-    uint64_t nodes, tbhits;
+    uint64_t nodes, tbhits, tthits;
     int depth, seldepth, height, completed;
 
     NNUEEvaluator *nnue;
@@ -90,3 +90,4 @@ void newSearchThreadPool(Thread *threads, Board *board, Limits *limits, TimeMana
 
 uint64_t nodesSearchedThreadPool(Thread *threads);
 uint64_t tbhitsThreadPool(Thread *threads);
+uint64_t tthitsThreadPool(Thread *threads);
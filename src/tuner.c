@@ -297,6 +297,120 @@ void initTunerTuples(TEntry *entry, TVector coeffs, TArray methods) {
 }
 
 
+void exportTunerData(char *fname, char *output) {
+
+    // Writes every position of a FENS style file with the coefficients of all
+    // NTERMS_ALL terms, so tools/tuner.py can tune any subset without a rebuild.
+    // Layout: TDataHeader | int32 methods[nterms] | int32 cparams[nterms][2]
+    //       | TDataEntry[npositions] | TTuple[ntuples]. Term names go to output.terms
+
+    char line[256], tname[512];
+    int methods[NTERMS_ALL], values[NTERMS_ALL][PHASE_NB];
+    double cparams[NTERMS_ALL][PHASE_NB], coeffs[NTERMS_ALL][COLOUR_NB];
+    TDataHeader header = { "ETTUNER1", NTERMS_ALL, Tempo, 0, 0 };
+    Thread *thread = createThreadPool(1);
+    Board *board = &thread->board;
+
+    FILE *fin    = fopen(fname, "r");
+    FILE *fout   = fopen(output, "wb");
+    FILE *tuples = tmpfile();
+
+    snprintf(tname, sizeof(tname), "%s.terms", output);
+    FILE *fterms = fopen(tname, "w");
+
+    if (fin == NULL || fout == NULL || tuples == NULL || fterms == NULL) {
+        printf("Unable to open %s / %s\n", fname, output);
+        exit(EXIT_FAILURE);
+    }
+
+    int i = 0; // EXECUTE_ON_TERMS will update i accordingly
+
+    EXECUTE_ON_TERMS(EXPORT_METHOD); i = 0;
+    EXECUTE_ON_TERMS(EXPORT_PARAM);  i = 0;
+    EXECUTE_ON_TERMS(EXPORT_TERM);
+    fclose(fterms);
+
+    if (i != NTERMS_ALL) {
+        printf("Error in exportTunerData(): i = %d ; NTERMS_ALL = %d\n", i, NTERMS_ALL);
+        exit(EXIT_FAILURE);
+    }
+
+    for (int j = 0; j < NTERMS_ALL; j++) {
+        values[j][MG] = (int) cparams[j][MG];
+        values[j][EG] = (int) cparams[j][EG];
+    }
+
+    fwrite(&header, sizeof(TDataHeader), 1, fout);
+    fwrite(methods, sizeof(int), NTERMS_ALL, fout);
+    fwrite(values, sizeof(int), NTERMS_ALL * PHASE_NB, fout);
+
+    while (fgets(line, 256, fin) != NULL) {
+
+        TDataEntry entry = {0};
+
+        // Find the result { W, L, D } => { 1.0, 0.0, 0.5 }
+        if      (strstr(line, "[1.0]")) entry.result = 1.0;
+        else if (strstr(line, "[0.0]")) entry.result = 0.0;
+        else if (strstr(line, "[0.5]")) entry.result = 0.5;
+        else    {printf("Cannot Parse %s\n", line); exit(EXIT_FAILURE);}
+
+        boardFromFEN(board, line, 0);
+
+        // Same phase and white POV static evaluation as initTunerEntry()
+        entry.phase = 4 * popcount(board->pieces[QUEEN ])
+                    + 2 * popcount(board->pieces[ROOK  ])
+                    + 1 * popcount(board->pieces[BISHOP])
+                    + 1 * popcount(board->pieces[KNIGHT]);
+
+        T = EmptyTrace;
+        entry.seval = evaluateBoard(thread, board);
+        if (board->turn == BLACK) entry.seval = -entry.seval;
+
+        i = 0; EXECUTE_ON_TERMS(EXPORT_COEFF);
+
+        // Same selection of active terms as initTunerTuples()
+        for (int j = 0; j < NTERMS_ALL; j++) {
+            if (   (methods[j] == NORMAL &&  coeffs[j][WHITE] - coeffs[j][BLACK] != 0.0)
+                || (methods[j] != NORMAL && (coeffs[j][WHITE] != 0.0 || coeffs[j][BLACK] != 0.0))) {
+                TTuple tuple = { j, coeffs[j][WHITE], coeffs[j][BLACK] };
+                fwrite(&tuple, sizeof(TTuple), 1, tuples);
+                entry.ntuples++;
+            }
+        }
+
+        entry.eval[MG]           = ScoreMG(T.eval);
+        entry.eval[EG]           = ScoreEG(T.eval);
+        entry.safety[WHITE][MG]  = ScoreMG(T.safety[WHITE]);
+        entry.safety[WHITE][EG]  = ScoreEG(T.safety[WHITE]);
+        entry.safety[BLACK][MG]  = ScoreMG(T.safety[BLACK]);
+        entry.safety[BLACK][EG]  = ScoreEG(T.safety[BLACK]);
+        entry.complexity         = ScoreEG(T.complexity);
+        entry.sfactor            = T.factor / (double) SCALE_NORMAL;
+        entry.turn               = board->turn;
+
+        fwrite(&entry, sizeof(TDataEntry), 1, fout);
+        header.ntuples += entry.ntuples;
+
+        if (++header.npositions % 10000 == 0)
+            printf("\rExporting Entries from FENs [%8d]", (int) header.npositions);
+    }
+
+    // Append the tuples behind the entries, then patch the final counts in
+    rewind(tuples);
+    for (size_t n; (n = fread(line, 1, sizeof(line), tuples)) > 0; )
+        fwrite(line, 1, n, fout);
+
+    rewind(fout);
+    fwrite(&header, sizeof(TDataHeader), 1, fout);
+
+    printf("\rExported %d Entries and %d Tuples for %d Terms to %s\n",
+        (int) header.npositions, (int) header.ntuples, NTERMS_ALL, output);
+
+    fclose(fin); fclose(fout); fclose(tuples);
+    deleteThreadPool(thread);
+}
+
+
 double computeOptimalK(TEntry *entries) {
 
     double start = -10, end = 10, step = 1;
@@ -36,6 +36,7 @@
 #define TuneComplexity (       0) // Flag to enable all Complexities (  4)
 
 #define NTERMS         (       0) // Total terms in the Tuner (904)
+#define NTERMS_ALL     (     904) // Total terms written by tunerdata
 #define MAXEPOCHS      (  100000) // Max number of epochs allowed
 #define BATCHSIZE      (   16384) // Training samples per mini-batch
 #define NPOSITIONS     (42487498) // Total Training samples in the book
@@ -136,12 +137,26 @@ typedef struct TGradientData {
     double wsafetyeg, bsafetyeg;
 } TGradientData;
 
+typedef struct TDataHeader {
+    char magic[8];
+    int32_t nterms, tempo;
+    int64_t npositions, ntuples;
+} TDataHeader;
+
+typedef struct TDataEntry {
+    int32_t ntuples, seval, phase, turn;
+    int32_t eval[PHASE_NB], safety[COLOUR_NB][PHASE_NB];
+    int32_t complexity, padding;
+    double result, sfactor;
+} TDataEntry;
+
 typedef int TArray[NTERMS];
 
 typedef double TVector[NTERMS][PHASE_NB];
 
 
 void runTuner();
+void exportTunerData(char *fname, char *output);
 void initCurrentParameters(TVector cparams);
 void initMethodManager(TArray methods);
 void initCoefficients(TVector coeffs);
@@ -241,22 +256,57 @@ void print_3(char *name, TVector params, int i, int A, int B, int C, char *S);
 
 #define PRINT_3(term, A, B, C, M, S) (print_3(#term, tparams, i, A, B, C, S), i+=A*B*C)
 
+// Export every term regardless of the Tune flags (tunerdata), describing
+// each one for tools/tuner.py as name|method|dimensions|suffix
+
+#define EXPORT_METHOD_0 INIT_METHOD_0
+#define EXPORT_METHOD_1 INIT_METHOD_1
+#define EXPORT_METHOD_2 INIT_METHOD_2
+#define EXPORT_METHOD_3 INIT_METHOD_3
+
+#define EXPORT_PARAM_0  INIT_PARAM_0
+#define EXPORT_PARAM_1  INIT_PARAM_1
+#define EXPORT_PARAM_2  INIT_PARAM_2
+#define EXPORT_PARAM_3  INIT_PARAM_3
+
+#define EXPORT_COEFF_0  INIT_COEFF_0
+#define EXPORT_COEFF_1  INIT_COEFF_1
+#define EXPORT_COEFF_2  INIT_COEFF_2
+#define EXPORT_COEFF_3  INIT_COEFF_3
+
+#define EXPORT_TERM_0(term, M, S) (fprintf(fterms, "%s|%d||%s\n", #term, M, S), i+=1)
+
+#define EXPORT_TERM_1(term, A, M, S) (fprintf(fterms, "%s|%d|%d|%s\n", #term, M, A, S), i+=A)
+
+#define EXPORT_TERM_2(term, A, B, M, S) (fprintf(fterms, "%s|%d|%d,%d|%s\n", #term, M, A, B, S), i+=A*B)
+
+#define EXPORT_TERM_3(term, A, B, C, M, S) (fprintf(fterms, "%s|%d|%d,%d,%d|%s\n", #term, M, A, B, C, S), i+=A*B*C)
+
+#define INIT_METHOD_ALL   (0)
+#define INIT_PARAM_ALL    (0)
+#define INIT_COEFF_ALL    (0)
+#define PRINT_ALL         (0)
+#define EXPORT_METHOD_ALL (1)
+#define EXPORT_PARAM_ALL  (1)
+#define EXPORT_COEFF_ALL  (1)
+#define EXPORT_TERM_ALL   (1)
+
 // Generic wrapper for all of the above functions
 
 #define ENABLE_0(F, term, M, S) do {                            \
-    if (Tune##term) F##_0(term, M, S);                          \
+    if (Tune##term || F##_ALL) F##_0(term, M, S);               \
 } while (0)
 
 #define ENABLE_1(F, term, A, M, S) do {                         \
-    if (Tune##term) F##_1(term, A, M, S);                       \
+    if (Tune##term || F##_ALL) F##_1(term, A, M, S);            \
 } while (0)
 
 #define ENABLE_2(F, term, A, B, M, S) do {                      \
-    if (Tune##term) F##_2(term, A, B, M, S);                    \
+    if (Tune##term || F##_ALL) F##_2(term, A, B, M, S);         \
 } while (0)
 
 #define ENABLE_3(F, term, A, B, C, M, S) do {                   \
-    if (Tune##term) F##_3(term, A, B, C, M, S);                 \
+    if (Tune##term || F##_ALL) F##_3(term, A, B, C, M, S);      \
 } while (0)
 
 // Final wrapper just to do some better output formatting for copy pasting
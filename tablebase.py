@@ -0,0 +1,175 @@
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import chess
+import chess.syzygy
+import requests
+from requests.adapters import HTTPAdapter
+
+ONLINE_URL = "https://tablebase.lichess.ovh/standard"
+_MISSING = object()
+
+
+class TablebaseProber:
+    """
+    Oyun sonu hamle kaynağı:
+      1. Yerel Syzygy dosyaları (chess.syzygy) -> ağ yok, milisaniyeler; dosya
+         okuması olay döngüsünü bloklamasın diye arka plan thread havuzunda
+      2. Yerel tablo yoksa lichess tablebase API'si: tek, keep-alive bağlantı
+         havuzlu requests.Session üzerinden, arka plan thread'inde
+      3. Sonuçlar FEN anahtarlı, sınırlı boyutlu bir LRU önbellekte tutulur
+
+    API üst üste hata verirse bir süre hiç sorulmaz (her hamlede 0.3-0.5 sn
+    beklememek için).
+    """
+
+    def __init__(self, syzygy_path=None, online_url=ONLINE_URL, cache_size=2048,
+                 pool_size=4, failure_limit=3, cooldown=60.0):
+        self.online_url = online_url
+        self.cache_size = cache_size
+        self.failure_limit = failure_limit
+        self.cooldown = cooldown
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._local_lock = threading.Lock()
+        self._failures = 0
+        self._disabled_until = 0.0
+        self.stats = {"local": 0, "online": 0, "cache": 0, "timeout": 0, "error": 0}
+
+        self.local = self._open_local(syzygy_path)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="tablebase")
+
+    @staticmethod
+    def _open_local(path):
+        if not path or not os.path.isdir(path):
+            return None
+        try:
+            tb = chess.syzygy.open_tablebase(path)
+        except Exception as e:
+            print(f"⚠️ Yerel Syzygy açılamadı ({path}): {e}", flush=True)
+            return None
+        if not tb.wdl:
+            tb.close()
+            return None
+        print(f"🧩 Yerel Syzygy yüklendi: {len(tb.wdl)} WDL tablosu ({path})", flush=True)
+        return tb
+
+    # --- Önbellek ---
+    def _cache_get(self, fen):
+        with self._lock:
+            if fen in self._cache:
+                self._cache.move_to_end(fen)
+                self.stats["cache"] += 1
+                return self._cache[fen]
+        return _MISSING
+
+    def _cache_put(self, fen, move):
+        with self._lock:
+            self._cache[fen] = move
+            self._cache.move_to_end(fen)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    # --- Yerel sorgu ---
+    def probe_local(self, board):
+        """Yerel tablolardan en iyi hamleyi seçer; tablo eksikse None döndürür."""
+        if self.local is None:
+            return None
+        best_key, best_move = None, None
+        try:
+            with self._local_lock:
+                for move in board.legal_moves:
+                    zeroing = board.is_zeroing(move)
+                    board.push(move)
+                    try:
+                        if board.is_checkmate():
+                            key = (3, 1, 0)
+                        else:
+                            wdl = -self.local.probe_wdl(board)
+                            dtz = abs(self.local.probe_dtz(board))
+                            # Kazançta en kısa yol, kayıpta en uzun direniş
+                            key = (wdl, zeroing, -dtz) if wdl > 0 else (wdl, 0, dtz)
+                    finally:
+                        board.pop()
+                    if best_key is None or key > best_key:
+                        best_key, best_move = key, move
+        except (KeyError, chess.syzygy.MissingTableError):
+            return None
+        return best_move
+
+    # --- Çevrimiçi sorgu ---
+    def _fetch_online(self, fen, timeout):
+        r = self.session.get(self.online_url, params={"fen": fen}, timeout=timeout)
+        r.raise_for_status()
+        data = r.json()
+        moves = data.get("moves") or []
+        return chess.Move.from_uci(moves[0]["uci"]) if moves else None
+
+    def _online_done(self, fen, future):
+        # Zaman aşımına uğrasa bile gelen cevap önbelleğe yazılır
+        try:
+            move = future.result()
+        except Exception:
+            with self._lock:
+                self._failures += 1
+                self.stats["error"] += 1
+                if self._failures >= self.failure_limit:
+                    self._disabled_until = time.monotonic() + self.cooldown
+            return
+        with self._lock:
+            self._failures = 0
+        self._cache_put(fen, move)
+
+    def online_available(self):
+        return self.online_url and time.monotonic() >= self._disabled_until
+
+    async def probe_online(self, board, timeout):
+        """API'yi arka plan thread'inde sorgular, olay döngüsünü bloklamadan en fazla `timeout` saniye bekler."""
+        if not self.online_available():
+            return None
+        fen = board.fen()
+        future = self._executor.submit(self._fetch_online, fen, max(timeout, 1.0))
+        future.add_done_callback(lambda f: self._online_done(fen, f))
+        try:
+            # shield: zaman aşımında istek iptal edilmez, cevabı önbelleğe düşer
+            move = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+        except asyncio.TimeoutError:
+            self.stats["timeout"] += 1
+            return None
+        except Exception:
+            return None
+        if move is not None:
+            self.stats["online"] += 1
+        return move
+
+    async def probe(self, board, timeout=0.5):
+        """Önbellek -> yerel Syzygy -> çevrimiçi API sırasıyla hamle arar."""
+        fen = board.fen()
+        cached = self._cache_get(fen)
+        if cached is not _MISSING:
+            return cached
+
+        # Syzygy dosya okuması (soğuk sayfa önbelleğinde disk I/O) döngüyü, yani tüm maçları bloklamasın
+        move = None
+        if self.local is not None:
+            move = await asyncio.get_running_loop().run_in_executor(self._executor, self.probe_local, board.copy())
+        if move is not None:
+            self.stats["local"] += 1
+            self._cache_put(fen, move)
+            return move
+
+        return await self.probe_online(board, timeout)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.session.close()
+        if self.local: self.local.close()
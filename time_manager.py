@@ -0,0 +1,107 @@
+import chess
+import chess.engine
+
+# smart  : Kendi bütçemiz (calculate_smart_time) -> "go movetime"
+# native : Saatleri olduğu gibi ver, Ethereal'in timeman.c'si karar versin
+# hybrid : Native + gecikme payı düşülmüş saat + tek hamle için sert üst sınır
+TIME_MODES = ("smart", "native", "hybrid")
+
+MAX_MOVE_FRACTION = 0.15   # Tek hamlede kalan sürenin en fazla %15'i
+PANIC_CLOCK = 3.0          # Bu sürenin altında motor turu bile pahalı (smart_think_time panik modu)
+MAX_POOL_WAIT = 3.0        # Boş motor için en fazla bekleme (sn)
+
+
+def smart_think_time(t, inc, board, latency_buffer=0.15, min_think_time=0.05):
+    """Bizim bütçemiz: saniye cinsinden kalan süre ve artıştan düşünme süresi."""
+    move_num = board.fullmove_number if board else 1
+
+    # 1. ACİL DURUM (3 saniye altı panik modu)
+    if t < PANIC_CLOCK:
+        return 0.05 if t > 1.0 else 0.02
+
+    # 2. TEMPO ANALİZİ (MTG - Moves To Go)
+    if t > 600: mtg = 45   # Classical
+    elif t > 180: mtg = 35 # Rapid
+    else: mtg = 25         # Blitz
+
+    if move_num > 60: mtg = max(15, mtg - 10)
+
+    # 3. BÜTÇE VE KARMAŞIKLIK
+    base_budget = (t / mtg) + (inc * 0.85)
+    legal_moves = board.legal_moves.count() if board else None   # Tahtasız (ör. tools/time_harness.py): nötr
+    complexity = 1.0 if legal_moves is None else (1.3 if legal_moves > 40 else (0.7 if legal_moves < 15 else 1.0))
+    target_time = base_budget * complexity
+
+    # 4. GÜVENLİK SINIRLARI
+    if t < 10.0:
+        target_time = min(target_time, t / 45)
+        min_think = min_think_time
+    else:
+        min_think = 0.3 if t > 30 else 0.1
+
+    max_limit = t * MAX_MOVE_FRACTION # Tek hamlede bütçenin %15'inden fazlasını harcama
+    final_time = max(min_think, min(target_time, max_limit))
+
+    return max(0.01, final_time - latency_buffer)
+
+
+def pool_deadline(t, inc):
+    """Motor havuzundan motor beklemenin sınırı: saatin ~1/30'u + artışın yarısı."""
+    return max(0.05, min(MAX_POOL_WAIT, t / 30 + inc / 2))
+
+
+def search_deadline(t, inc, latency):
+    """
+    Takılan motora verilecek en uzun süre: saatin yarısı + artış, ama asla
+    saatin kendisinden (ağ payı düşülmüş) fazla değil; süre dolunca acil hamle.
+    """
+    return min(max(0.05, 0.5 * t + inc), t - latency)
+
+
+def emergency_budget(t, inc):
+    """Süreç içi sığ aramanın süresi: motorsuz bir hamle için küçük, sabit üst sınırlı pay."""
+    return max(0.01, min(0.2, t / 60 + inc / 4))
+
+
+def ethereal_budget(t, inc, move_overhead=0.3, mtg=-1):
+    """
+    src/timeman.c tm_init() ile aynı hesap (saniye cinsinden). move_overhead
+    varsayılanı config.yml'deki MoveOverhead (300 ms) ile aynıdır.
+    (ideal, max) döndürür; motor bu ikisi arasında PV kararlılığına göre durur.
+    """
+    if mtg >= 0:
+        ideal = 1.80 * (t - move_overhead) / (mtg + 5) + inc
+        hard = 10.00 * (t - move_overhead) / (mtg + 10) + inc
+    else:
+        ideal = 2.50 * ((t - move_overhead) + 25 * inc) / 50
+        hard = 10.00 * ((t - move_overhead) + 25 * inc) / 50
+    return min(ideal, t - move_overhead), min(hard, t - move_overhead)
+
+
+def hybrid_cap(t, latency_buffer=0.15):
+    """Hybrid modda motoru durdurduğumuz sert sınır."""
+    return max(0.01, t * MAX_MOVE_FRACTION - latency_buffer)
+
+
+def build_limit(mode, board, wtime, btime, winc, binc, latency_buffer=0.15, min_think_time=0.05):
+    """
+    Zaman moduna göre (Limit, cap) döndürür. Saatler saniye cinsindendir.
+    cap None değilse arama en geç cap saniye sonra durdurulmalıdır.
+    """
+    my_time = wtime if board.turn == chess.WHITE else btime
+    my_inc = winc if board.turn == chess.WHITE else binc
+
+    if mode == "native":
+        return chess.engine.Limit(white_clock=wtime, black_clock=btime,
+                                  white_inc=winc, black_inc=binc), None
+
+    if mode == "hybrid":
+        # Motor bütçesini ağ gecikmesi düşülmüş saatle hesaplasın
+        if board.turn == chess.WHITE: wtime = max(0.01, wtime - latency_buffer)
+        else: btime = max(0.01, btime - latency_buffer)
+        limit = chess.engine.Limit(white_clock=wtime, black_clock=btime,
+                                   white_inc=winc, black_inc=binc)
+        return limit, hybrid_cap(my_time, latency_buffer)
+
+    think = smart_think_time(my_time, my_inc, board, latency_buffer, min_think_time)
+    return chess.engine.Limit(time=think), None
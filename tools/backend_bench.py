@@ -0,0 +1,167 @@
+"""
+Değerlendirme arka ucu ölçümü: HCE (USE_NNUE=0) ve NNUE (gömülü ağ,
+`make EVALFILE=...`) derlemelerini bu CPU'da src/bench.csv üzerinde
+karşılaştırır ve botun tempo -> arka uç tablosunu (backend_routing.json,
+bkz. backends.RoutingTable) bu ölçümlerden üretir.
+
+Ölçümler:
+  hız     : motorun kendi `bench` komutu (1 thread, 16MB): nps ve pozisyon
+            başı sabit derinliğe ulaşma süresi (time-to-depth)
+  güç     : her --movetimes değerinde NNUE - HCE, `go movetime` ile; bench.csv
+            pozisyonlarının her biri renkler değişerek iki kez oynanır,
+            Elo ve %95 aralığı beşli (pentanomial) sonuçlardan (tools/gauntlet.py)
+
+Tablo: matchmaking TIME_CONTROLS'taki her tempo hamle başı tahmini süresine
+(taban / 30 + artış) göre ölçüm noktaları arasında ara değerle
+yönlendirilir; o sürede NNUE'nun Elo farkı --margin'i aşıyorsa NNUE. En uzun
+ölçülen süreden uzun tempolarda son nokta geçerlidir: 1+0 hamle başı ~2 sn.
+Tek çekirdekte 1600 ms ile 50 çift birkaç saat sürer (--pairs, --concurrency).
+
+Kullanım: python tools/backend_bench.py --hce ./src/Ethereal --nnue ./src/Ethereal-nnue
+          [--evalfile net.nnue] [--depth 12] [--movetimes 100,400,1600] [--pairs 50]
+          [--concurrency 2] [--margin 0] [--out backend_routing.json] [--speed-only]
+"""
+import argparse
+import asyncio
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+import chess
+import chess.engine
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from backends import RoutingTable, cpu_model, per_move_ms
+from gauntlet import adjudicate, elo_estimate
+from matchmaking import SETTINGS as MATCHMAKING
+from resources import parse_tc
+
+BENCH_LINE = re.compile(r"\[#\s*\d+\]\s+(-?\d+) cp\s+Best:\s*(\S+)\s+Ponder:\s*(\S*)\s+(\d+) nodes\s+(\d+) nps")
+BENCH_TOTAL = re.compile(r"OVERALL:\s+(\d+) nodes\s+(\d+) nps")
+
+
+def bench_positions(path):
+    """src/bench.csv: satır başı tırnaklı bir FEN (motor bunu #include ile derler)."""
+    with open(path) as f:
+        return [line.strip().strip(",").strip('"') for line in f if line.strip().startswith('"')]
+
+
+# --- Hız ---
+def run_bench(path, depth, evalfile=None):
+    """`<motor> bench depth 1 16 [ağ]`: nps ve pozisyon başı derinliğe ulaşma süresi (ms)."""
+    cmd = [path, "bench", str(depth), "1", "16"] + ([evalfile] if evalfile else [])
+    out = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+    rows = [(int(m.group(4)), int(m.group(5))) for m in BENCH_LINE.finditer(out)]
+    total = BENCH_TOTAL.search(out)
+    if not rows or not total:
+        raise RuntimeError(f"{path}: bench çıktısı okunamadı")
+    # Motor pozisyon nps'ini 1000 * düğüm / (ms + 1) olarak yazar
+    ttd = [max(0.0, 1000.0 * nodes / max(1, nps) - 1.0) for nodes, nps in rows]
+    return {"depth": depth, "nps": int(total.group(2)), "nodes": int(total.group(1)),
+            "ttd_ms_median": round(statistics.median(ttd), 1), "ttd_ms_total": round(sum(ttd), 1)}
+
+
+# --- Güç ---
+async def open_engine(path, options):
+    _, engine = await chess.engine.popen_uci(path)
+    await engine.configure({k: v for k, v in options.items() if k in engine.options})
+    return engine
+
+
+async def play_fixed(engines, fen, white, movetime, game_id, max_plies):
+    """engines: {"hce": motor, "nnue": motor}; white: beyazı oynayan arka uç. NNUE'nun puanını döndürür."""
+    board = chess.Board(fen)
+    sides = {chess.WHITE: white, chess.BLACK: "hce" if white == "nnue" else "nnue"}
+    limit = chess.engine.Limit(time=movetime / 1000.0)
+    while (verdict := adjudicate(board, None, max_plies)) is None:
+        result = await engines[sides[board.turn]].play(board, limit, game=game_id)
+        if result.move is None or not board.is_legal(result.move):
+            verdict = ("0-1" if board.turn == chess.WHITE else "1-0"), "illegal_move"
+            break
+        board.push(result.move)
+    white_points = {"1-0": 1.0, "0-1": 0.0}.get(verdict[0], 0.5)
+    return white_points if white == "nnue" else 1.0 - white_points
+
+
+async def measure_strength(args, fens, movetime):
+    """Bir hamle süresinde çiftler halinde NNUE - HCE: (beşli sayımlar, süre)."""
+    jobs = asyncio.Queue()
+    for i, fen in enumerate(fens): jobs.put_nowait((i, fen))
+    penta, started = [0] * 5, time.monotonic()
+
+    async def worker():
+        engines = {"hce": await open_engine(args.hce, args.options), "nnue": await open_engine(args.nnue, args.nnue_options)}
+        try:
+            while not jobs.empty():
+                i, fen = jobs.get_nowait()
+                points = [await play_fixed(engines, fen, white, movetime, f"m{movetime}p{i}{white}", args.max_plies)
+                          for white in ("nnue", "hce")]
+                penta[round(2 * sum(points))] += 1
+        finally:
+            await asyncio.gather(*(e.quit() for e in engines.values()), return_exceptions=True)
+
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    return penta, time.monotonic() - started
+
+
+async def main_async(args):
+    fens = bench_positions(args.positions)
+    print(f"CPU: {cpu_model()} | {len(fens)} bench pozisyonu")
+
+    bench = {}
+    for backend, path, evalfile in (("hce", args.hce, None), ("nnue", args.nnue, args.evalfile)):
+        bench[backend] = run_bench(path, args.depth, evalfile)
+        b = bench[backend]
+        print(f"{backend.upper():>4} | {b['nps']:>9} nps | derinlik {b['depth']} süresi: medyan {b['ttd_ms_median']:7.1f} ms, "
+              f"toplam {b['ttd_ms_total']:8.1f} ms")
+    print(f"NNUE/HCE | nps x{bench['nnue']['nps'] / bench['hce']['nps']:.2f} | "
+          f"derinliğe ulaşma x{bench['nnue']['ttd_ms_total'] / max(1.0, bench['hce']['ttd_ms_total']):.2f}")
+    if args.speed_only: return
+
+    strength = []
+    for movetime in args.movetimes:
+        penta, elapsed = await measure_strength(args, fens[:args.pairs or None], movetime)
+        elo, lo, hi = elo_estimate(penta)
+        strength.append({"movetime_ms": movetime, "pairs": sum(penta), "penta": penta,
+                         "elo": round(elo, 1), "elo_low": round(lo, 1), "elo_high": round(hi, 1)})
+        print(f"movetime {movetime:5d} ms | {sum(penta)} çift | beşli {penta} | NNUE - HCE Elo {elo:+6.1f} "
+              f"({lo:+.1f}, {hi:+.1f}) | {elapsed:.0f}s", flush=True)
+
+    time_controls = list(dict.fromkeys(MATCHMAKING["LOW_ELO_TIME_CONTROLS"] + MATCHMAKING["TIME_CONTROLS"]))
+    table = RoutingTable.from_measurements(strength, time_controls, margin=args.margin, bench=bench)
+    for tc, backend in table.routes.items():
+        move_ms = per_move_ms(*parse_tc(tc))
+        print(f"  {tc:>6} | hamle başı ~{move_ms:6.0f} ms | NNUE Elo {table.nnue_elo(move_ms):+6.1f} -> {backend.upper()}")
+    table.save(args.out)
+    print(f"Tablo yazıldı: {args.out}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--hce',         default=os.path.join(ROOT, 'src', 'Ethereal'))
+    parser.add_argument('--nnue',        default=os.path.join(ROOT, 'src', 'Ethereal-nnue'))
+    parser.add_argument('--evalfile',    default=None, help='ağ gömülü değilse NNUE ağ dosyası')
+    parser.add_argument('--positions',   default=os.path.join(ROOT, 'src', 'bench.csv'))
+    parser.add_argument('--depth',       type=int, default=12, help='bench derinliği (time-to-depth)')
+    parser.add_argument('--movetimes',   default='100,400,1600', help='güç ölçümü hamle süreleri (ms)')
+    parser.add_argument('--pairs',       type=int, default=0, help='süre başı çift sayısı (0: tüm pozisyonlar)')
+    parser.add_argument('--concurrency', type=int, default=os.cpu_count() or 1, help='eşzamanlı maç (maçta sadece sıradaki düşünür)')
+    parser.add_argument('--hash',        type=int, default=16)
+    parser.add_argument('--max-plies',   type=int, default=300)
+    parser.add_argument('--margin',      type=float, default=0.0, help='NNUE için gereken en az Elo farkı')
+    parser.add_argument('--out',         default=os.path.join(ROOT, 'backend_routing.json'))
+    parser.add_argument('--speed-only',  action='store_true', help='sadece nps / time-to-depth')
+    args = parser.parse_args()
+    args.movetimes = [int(x) for x in args.movetimes.split(",")]
+    args.options = {"Hash": args.hash, "Threads": 1}
+    args.nnue_options = dict(args.options, **({"EvalFile": args.evalfile} if args.evalfile else {}))
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
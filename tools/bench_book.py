@@ -0,0 +1,105 @@
+"""
+Kitap sorgu gecikmesi benchmark'ı.
+
+Eski yöntem (her hamlede chess.polyglot.open_reader) ile paylaşılan
+PolyglotBook servisini (mmap + seyrek indeks + LRU) karşılaştırır.
+Pozisyonlar src/bench.csv'den ve PGN'deki gerçek maçların ilk hamlelerinden gelir.
+
+Kullanım: python tools/bench_book.py --book book.bin [--pgn src/game1_oxydan.pgn] [--plies 30] [--rounds 3]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import chess
+import chess.pgn
+import chess.polyglot
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from book import PolyglotBook
+
+
+def bench_positions(path):
+    boards = []
+    with open(path) as fin:
+        for line in fin:
+            fen = line.strip().strip(',').strip('"')
+            if fen: boards.append(chess.Board(fen))
+    return boards
+
+
+def game_prefixes(path, plies):
+    boards = []
+    with open(path) as fin:
+        while (game := chess.pgn.read_game(fin)) is not None:
+            board = game.board()
+            for i, move in enumerate(game.mainline_moves()):
+                if i >= plies: break
+                boards.append(board.copy(stack=False))
+                board.push(move)
+    return boards
+
+
+def old_probe(path, board):
+    with chess.polyglot.open_reader(path) as reader:
+        best = None
+        for entry in reader.find_all(board):
+            if best is None or entry.weight > best.weight: best = entry
+        return best.move if best else None
+
+
+def measure(fn, boards):
+    samples, found = [], 0
+    for board in boards:
+        start = time.perf_counter()
+        move = fn(board)
+        samples.append((time.perf_counter() - start) * 1e6)
+        found += move is not None
+    return samples, found
+
+
+def report(name, samples, found, total):
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(f"{name:>18}: ort {statistics.mean(samples):8.1f} us | p50 {statistics.median(samples):8.1f} us "
+          f"| p99 {p99:8.1f} us | isabet {found}/{total}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--book',   default=os.path.join(ROOT, 'book.bin'))
+    parser.add_argument('--bench',  default=os.path.join(ROOT, 'src', 'bench.csv'))
+    parser.add_argument('--pgn',    default=os.path.join(ROOT, 'src', 'game1_oxydan.pgn'))
+    parser.add_argument('--plies',  type=int, default=30)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    boards = bench_positions(args.bench) + game_prefixes(args.pgn, args.plies)
+    print(f"Kitap: {args.book} | {len(boards)} pozisyon x {args.rounds} tur")
+
+    start = time.perf_counter()
+    book = PolyglotBook(args.book)
+    print(f"PolyglotBook açılışı: {(time.perf_counter() - start) * 1000:.1f} ms ({len(book)} girdi)")
+
+    def service_probe(board):
+        found = book.best_move(board)
+        return found[0] if found else None
+
+    old_samples, new_cold, new_warm = [], [], []
+    for r in range(args.rounds):
+        s, old_found = measure(lambda b: old_probe(args.book, b), boards)
+        old_samples += s
+        s, new_found = measure(service_probe, boards)
+        (new_cold if r == 0 else new_warm).extend(s)
+
+    report("open_reader", old_samples, old_found, len(boards))
+    report("servis (soğuk)", new_cold, new_found, len(boards))
+    if new_warm: report("servis (LRU)", new_warm, new_found, len(boards))
+    book.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+"""
+Ethereal arama hızı benchmark'ı (istatistiksel).
+
+Motorun tek seferlik `bench` çıktısı (tek OVERALL nps satırı) Hash/Threads/
+derleyici bayrağı değişikliklerinde gerçek hızlanmayı gürültüden ayırmaya
+yetmez. Bu araç:
+
+  - `Ethereal bench <depth> <threads> <hash>` (mod: bench) veya UCI üzerinden
+    src/bench.csv pozisyonlarında `go depth N` / `go nodes N` (mod: uci) çalıştırır
+  - ölçümü --runs kez tekrarlar; --parallel ile aynı anda birden çok süreç,
+    --pin ile her süreç ayrı çekirdeğe sabitlenir (Linux sched_setaffinity)
+  - pozisyon başına düğüm/nps'i ayrıştırır; ortalama ve %95 güven aralığı verir
+  - --compare ile ikinci bir binary'yi sırayla (A,B,A,B...) ölçer ve Welch
+    t-testiyle farkın anlamlı olup olmadığını söyler
+  - düğüm imzasının (toplam düğüm) koşular arasında değişmediğini denetler
+    (Threads=1'de deterministik olmalı)
+  - sonucu JSONL geçmişine ekler ve aynı ayarlı son kayıtla karşılaştırır
+
+Kullanım: python tools/bench_engine.py ./src/Ethereal [--compare ./Ethereal-old] [--runs 10]
+          [--depth 13] [--threads 1] [--hash 16] [--mode bench|uci] [--nodes N]
+          [--parallel 2 --pin] [--history bench_history.jsonl] [--positions]
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import chess
+import chess.engine
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_CSV = os.path.join(ROOT, 'src', 'bench.csv')
+
+ROW_RE = re.compile(r"\[#\s*(\d+)\]\s+(-?\d+) cp\s+Best:\s*(\S+)\s+Ponder:\s*(\S+)\s+(\d+) nodes\s+(\d+) nps")
+OVERALL_RE = re.compile(r"OVERALL:\s+(\d+) nodes\s+(\d+) nps")
+
+
+# --- İstatistik (scipy'siz) ---
+def _betacf(a, b, x):
+    """Düzenlenmiş eksik beta fonksiyonu için sürekli kesir (Numerical Recipes)."""
+    qab, qap, qam = a + b, a + 1.0, a - 1.0
+    c, d = 1.0, 1.0 - qab * x / qap
+    d = 1.0 / (d if abs(d) > 1e-30 else 1e-30)
+    h = d
+    for m in range(1, 201):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1.0 + aa * d; d = 1.0 / (d if abs(d) > 1e-30 else 1e-30)
+        c = 1.0 + aa / c if abs(1.0 + aa / c) > 1e-30 else 1e-30
+        h *= d * c
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1.0 + aa * d; d = 1.0 / (d if abs(d) > 1e-30 else 1e-30)
+        c = 1.0 + aa / c if abs(1.0 + aa / c) > 1e-30 else 1e-30
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < 1e-12: break
+    return h
+
+
+def _betai(a, b, x):
+    if x <= 0.0: return 0.0
+    if x >= 1.0: return 1.0
+    lbeta = math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log(1.0 - x)
+    if x < (a + 1.0) / (a + b + 2.0):
+        return math.exp(lbeta) * _betacf(a, b, x) / a
+    return 1.0 - math.exp(lbeta) * _betacf(b, a, 1.0 - x) / b
+
+
+def t_two_sided_p(t, df):
+    return _betai(df / 2.0, 0.5, df / (df + t * t))
+
+
+def t_critical(df, alpha=0.05):
+    """İki yönlü Student-t kritik değeri (ikiye bölme ile)."""
+    if df <= 0: return float('inf')
+    lo, hi = 0.0, 1000.0
+    for _ in range(100):
+        mid = (lo + hi) / 2
+        if t_two_sided_p(mid, df) > alpha: lo = mid
+        else: hi = mid
+    return hi
+
+
+def mean_ci(samples, alpha=0.05):
+    n = len(samples)
+    mean = statistics.fmean(samples)
+    if n < 2: return mean, float('nan')
+    return mean, t_critical(n - 1, alpha) * statistics.stdev(samples) / math.sqrt(n)
+
+
+def welch(a, b):
+    """Welch t-testi: (t, serbestlik derecesi, iki yönlü p)."""
+    va, vb = statistics.variance(a) / len(a), statistics.variance(b) / len(b)
+    if va + vb == 0: return float('inf'), float('inf'), 0.0 if statistics.fmean(a) != statistics.fmean(b) else 1.0
+    t = (statistics.fmean(a) - statistics.fmean(b)) / math.sqrt(va + vb)
+    df = (va + vb) ** 2 / (va ** 2 / (len(a) - 1) + vb ** 2 / (len(b) - 1))
+    return t, df, t_two_sided_p(t, df)
+
+
+# --- Ölçüm ---
+def bench_positions(path=BENCH_CSV):
+    with open(path) as fin:
+        return [fen for line in fin if (fen := line.strip().strip(',').strip('"'))]
+
+
+def _pin(core):
+    if core is None or not hasattr(os, 'sched_setaffinity'): return None
+    return lambda: os.sched_setaffinity(0, {core})
+
+
+def run_bench(binary, args, core=None):
+    """`bench` komutunu bir kez çalıştırır: {signature, nps, positions:[(nodes, nps)]}."""
+    cmd = [binary, 'bench', str(args.depth), str(args.threads), str(args.hash)]
+    out = subprocess.run(cmd, capture_output=True, text=True, check=True, preexec_fn=_pin(core)).stdout
+    rows = [(int(m.group(5)), int(m.group(6)), m.group(3)) for m in ROW_RE.finditer(out)]
+    overall = OVERALL_RE.search(out)
+    if not overall: raise RuntimeError(f"{binary}: bench çıktısında OVERALL satırı yok")
+    return {"signature": int(overall.group(1)), "nps": int(overall.group(2)),
+            "positions": [(n, s) for n, s, _ in rows], "best": [b for _, _, b in rows]}
+
+
+def run_uci(binary, args, core=None):
+    """UCI üzerinden bench.csv pozisyonlarında go depth/nodes (her pozisyon öncesi ucinewgame)."""
+    limit = chess.engine.Limit(nodes=args.nodes) if args.nodes else chess.engine.Limit(depth=args.depth)
+    engine = chess.engine.SimpleEngine.popen_uci(binary, preexec_fn=_pin(core))
+    try:
+        engine.configure({"Threads": args.threads, "Hash": args.hash})
+        positions, best, nodes_total, time_total = [], [], 0, 0.0
+        for i, fen in enumerate(bench_positions()):
+            start = time.perf_counter()
+            result = engine.play(chess.Board(fen), limit, game=i, info=chess.engine.INFO_BASIC)
+            elapsed = time.perf_counter() - start
+            nodes = result.info.get("nodes", 0)
+            positions.append((nodes, int(nodes / elapsed) if elapsed > 0 else 0))
+            best.append(result.move.uci() if result.move else "-")
+            nodes_total += nodes
+            time_total += elapsed
+    finally:
+        engine.quit()
+    return {"signature": nodes_total, "nps": int(nodes_total / time_total) if time_total else 0,
+            "positions": positions, "best": best}
+
+
+def label(side, binary):
+    return f"{side}:{os.path.basename(binary)}"
+
+
+def measure(sides, args):
+    """
+    Her taraf için --runs ölçüm; taraflar sırayla karıştırılır (A,B,A,B...).
+    sides: {"A": binary, "B": binary}; sonuçlar tarafa göre tutulur, aynı
+    binary iki tarafta da verilebilir (A/A gürültü ölçümü).
+    """
+    runner = run_uci if args.mode == 'uci' else run_bench
+    schedule = [side for _ in range(args.runs) for side in sides]
+    cores = (sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else list(range(os.cpu_count() or 1)))
+    results = {side: [] for side in sides}
+
+    with ThreadPoolExecutor(max_workers=args.parallel) as pool:
+        for start in range(0, len(schedule), args.parallel):
+            batch = schedule[start:start + args.parallel]
+            futures = [pool.submit(runner, sides[side], args, cores[i % len(cores)] if args.pin else None)
+                       for i, side in enumerate(batch)]
+            for side, f in zip(batch, futures):
+                r = f.result()
+                results[side].append(r)
+                print(f"  {label(side, sides[side]):<22} nps {r['nps']:>10} | imza {r['signature']}", flush=True)
+    return results
+
+
+def summarize(side, binary, runs, alpha):
+    nps = [r["nps"] for r in runs]
+    mean, ci = mean_ci(nps, alpha)
+    signatures = sorted({r["signature"] for r in runs})
+    per_pos = []
+    for i in range(len(runs[0]["positions"])):
+        col = [r["positions"][i][1] for r in runs if i < len(r["positions"])]
+        m, c = mean_ci(col, alpha)
+        per_pos.append({"nodes": runs[0]["positions"][i][0], "nps": round(m), "ci": None if math.isnan(c) else round(c)})
+    return {"side": side, "binary": binary, "sha256": sha256(binary), "runs": len(runs), "nps_samples": nps,
+            "nps_mean": round(mean), "nps_ci": None if math.isnan(ci) else round(ci),
+            "signatures": signatures, "deterministic": len(signatures) == 1, "positions": per_pos}
+
+
+def sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fin:
+        for chunk in iter(lambda: fin.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# --- Geçmiş ---
+def params_key(args):
+    return {"mode": args.mode, "depth": args.depth, "nodes": args.nodes, "threads": args.threads,
+            "hash": args.hash, "parallel": args.parallel, "pin": args.pin}
+
+
+def last_entry(path, params):
+    last = None
+    try:
+        with open(path) as fin:
+            for line in fin:
+                if not line.strip(): continue
+                row = json.loads(line)
+                if row.get("params") == params: last = row
+    except OSError:
+        pass
+    return last
+
+
+def append_history(path, row):
+    with open(path, 'a') as fout:
+        fout.write(json.dumps(row) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('engine',       help='ölçülecek binary')
+    parser.add_argument('--compare',    default=None, help='karşılaştırılacak ikinci binary (taban)')
+    parser.add_argument('--mode',       default='bench', choices=['bench', 'uci'])
+    parser.add_argument('--runs',       type=int, default=10)
+    parser.add_argument('--depth',      type=int, default=13)
+    parser.add_argument('--nodes',      type=int, default=0, help='uci modunda go nodes N (0: go depth)')
+    parser.add_argument('--threads',    type=int, default=1)
+    parser.add_argument('--hash',       type=int, default=16)
+    parser.add_argument('--parallel',   type=int, default=1, help='aynı anda çalışan süreç sayısı')
+    parser.add_argument('--pin',        action='store_true', help='her süreci ayrı çekirdeğe sabitle')
+    parser.add_argument('--alpha',      type=float, default=0.05)
+    parser.add_argument('--history',    default=os.path.join(ROOT, 'bench_history.jsonl'))
+    parser.add_argument('--no-history', action='store_true')
+    parser.add_argument('--positions',  action='store_true', help='pozisyon başına tabloyu yazdır')
+    args = parser.parse_args()
+    if args.runs < 2: parser.error('--runs en az 2 olmalı (güven aralığı için)')
+
+    sides = {"A": args.engine, **({"B": args.compare} if args.compare else {})}
+    print(f"Ölçüm: {args.mode} | depth {args.depth}{f' nodes {args.nodes}' if args.nodes else ''} | "
+          f"threads {args.threads} | hash {args.hash} | {args.runs} koşu x {len(sides)} binary "
+          f"| paralel {args.parallel}{' (sabit çekirdek)' if args.pin else ''}")
+    results = measure(sides, args)
+    summaries = [summarize(side, binary, results[side], args.alpha) for side, binary in sides.items()]
+
+    print()
+    for s in summaries:
+        det = "deterministik" if s["deterministic"] else f"DEĞİŞKEN imza {s['signatures']}"
+        print(f"{label(s['side'], s['binary']):<22} nps {s['nps_mean']:>10} ± {s['nps_ci']:<8} "
+              f"(%{100 * (1 - args.alpha):.0f} GA, n={s['runs']}) | imza {s['signatures'][0]} ({det})")
+        if args.threads > 1 and not s["deterministic"]:
+            print("  (Threads>1'de düğüm imzası doğal olarak değişir)")
+
+    if args.positions:
+        print(f"\n{'#':>3} | {'düğüm':>10} | " + " | ".join(f"{label(s['side'], s['binary'])[:14]:>14}" for s in summaries))
+        for i in range(len(summaries[0]["positions"])):
+            cells = " | ".join(f"{s['positions'][i]['nps']:>14}" for s in summaries if i < len(s["positions"]))
+            print(f"{i + 1:>3} | {summaries[0]['positions'][i]['nodes']:>10} | {cells}")
+
+    comparison = None
+    if args.compare:
+        a, b = summaries[0], summaries[1]
+        t, df, p = welch(a["nps_samples"], b["nps_samples"])
+        diff = a["nps_mean"] - b["nps_mean"]
+        se = math.sqrt(statistics.variance(a["nps_samples"]) / a["runs"] + statistics.variance(b["nps_samples"]) / b["runs"])
+        ci = t_critical(df, args.alpha) * se if math.isfinite(df) else 0.0
+        same_sig = a["signatures"] == b["signatures"]
+        comparison = {"speedup_pct": round(100 * diff / b["nps_mean"], 3), "ci_pct": round(100 * ci / b["nps_mean"], 3),
+                      "t": round(t, 3), "df": round(df, 1), "p": p, "significant": p < args.alpha,
+                      "same_signature": same_sig}
+        verdict = "ANLAMLI" if p < args.alpha else "anlamlı değil (gürültü)"
+        print(f"\nFark: {comparison['speedup_pct']:+.2f}% ± {comparison['ci_pct']:.2f}% | Welch t={t:.2f}, "
+              f"df={df:.1f}, p={p:.4f} -> {verdict}")
+        print("Düğüm imzaları " + ("aynı (yalnız hız değişikliği)" if same_sig else "FARKLI (arama davranışı değişmiş)"))
+
+    row = {"ts": int(time.time()), "commit": git_commit(), "host": os.uname().nodename if hasattr(os, 'uname') else None,
+           "params": params_key(args), "results": [{k: v for k, v in s.items() if k != "positions"} for s in summaries],
+           "comparison": comparison}
+    if not args.no_history:
+        prev = last_entry(args.history, row["params"])
+        if prev:
+            old = prev["results"][0]
+            change = 100 * (summaries[0]["nps_mean"] - old["nps_mean"]) / max(1, old["nps_mean"])
+            sig = "aynı" if old["signatures"] == summaries[0]["signatures"] else "FARKLI"
+            print(f"\nGeçmiş ({prev.get('commit')}): nps {old['nps_mean']} -> {summaries[0]['nps_mean']} ({change:+.2f}%), imza {sig}")
+        append_history(args.history, row)
+
+    # Deterministik olması gereken imza değiştiyse hata kodu
+    if args.threads == 1 and not all(s["deterministic"] for s in summaries):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
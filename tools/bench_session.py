@@ -0,0 +1,78 @@
+"""
+GameSession mikro-benchmark'ı.
+
+Her gameState olayında tüm hamle listesini baştan oynayan eski yöntem ile
+GameSession'ın artımlı (incremental) senkronizasyonunu 200 yarım hamlelik
+rastgele maçlar üzerinde karşılaştırır.
+
+Kullanım: python tools/bench_session.py [--games 20] [--plies 200] [--seed 1]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import chess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from game_session import GameSession
+
+
+def random_game(plies, rng):
+    """Oyun bitmeden en az `plies` yarım hamle süren rastgele bir maç üretir."""
+    while True:
+        board = chess.Board()
+        moves = []
+        while len(moves) < plies and not board.is_game_over(claim_draw=False):
+            move = rng.choice(list(board.legal_moves))
+            board.push(move)
+            moves.append(move.uci())
+        if len(moves) == plies:
+            return moves
+
+
+def event_stream(moves):
+    """Lichess'in her hamleden sonra gönderdiği 'moves' alanlarını üretir."""
+    return [" ".join(moves[:i]) for i in range(1, len(moves) + 1)]
+
+
+def replay(events):
+    for moves_str in events:
+        board = chess.Board()
+        for m in moves_str.split(): board.push_uci(m)
+    return board
+
+
+def incremental(events):
+    session = GameSession("bench")
+    for moves_str in events:
+        board = session.sync(moves_str)
+    return board
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--games', type=int, default=20)
+    parser.add_argument('--plies', type=int, default=200)
+    parser.add_argument('--seed',  type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    games = [event_stream(random_game(args.plies, rng)) for _ in range(args.games)]
+
+    results = {}
+    for name, fn in (("replay", replay), ("incremental", incremental)):
+        start = time.perf_counter()
+        for events in games:
+            final = fn(events)
+        elapsed = time.perf_counter() - start
+        results[name] = elapsed
+        per_event_us = 1e6 * elapsed / (args.games * args.plies)
+        print(f"{name:>12}: {elapsed * 1000:9.1f} ms toplam | {per_event_us:8.1f} us/olay | son FEN {final.fen()}")
+
+    print(f"{'hızlanma':>12}: {results['replay'] / results['incremental']:.1f}x ({args.games} maç x {args.plies} yarım hamle)")
+
+
+if __name__ == "__main__":
+    main()
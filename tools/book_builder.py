@@ -0,0 +1,295 @@
+"""
+Kendi maçlarımızdan açılış kitabı (Polyglot overlay) derleyici.
+
+Lichess'ten indirilen PGN'ler (.gz/.bz2/.xz, kuruluysa .zst) akış halinde
+okunur; her maçın ilk --max-ply yarım hamlesinde (pozisyon, oynanan hamle)
+için hamleyi yapanın bakışından galibiyet/beraberlik/yenilgi toplanır.
+
+Rakip farkındalığı: her hamle, hamleyi yapanın rakibine göre ağırlıklanır,
+w = 2 ^ ((rakip Elo - hamleyi yapan Elo) / 400), [1/4, 4] aralığında. Güçlü
+rakibe karşı alınan sonuç daha çok, zayıfa karşı alınan daha az sayılır.
+--player ile sadece bizim hamlelerimiz (ya da hepsi) örneklenir.
+
+Bellek sınırı (dış sıralama):
+  1. İşçi süreçler maç parçalarını ayrıştırır, (anahtar, hamle) ile sıralanmış
+     ve birleştirilmiş ara dosyalar (run) yazar.
+  2. Run'lar k yollu birleştirilir (--fan-in'den fazlaysa birkaç geçişte).
+  3. Son geçişte her anahtar ana kitaptaki (--base) girdilerle birleştirilir.
+Bellekte her an en fazla bir parça ve birleştirme tamponları bulunur. Aynı
+maçlar da bellekte küme tutmadan ayıklanır (nndata.unique_games): girdi iki
+kez okunur, maç anahtarları --tmp'de dış sıralamayla karşılaştırılır.
+
+Ağırlık (anahtar başına): ana kitabın payı --prior sahte maç olarak %50
+skorla eklenir; hamle ağırlığı = 2 * galibiyet + beraberlik (Polyglot
+make-book ile aynı ölçü), en iyi hamle 65535 olacak şekilde ölçeklenir.
+En az --min-games maçta skoru --min-score'un altında kalan hamle 0 ağırlık
+alır: bot onu oynamaz ve ana kitaba da düşmez. Çıktıda sadece bizim
+maçlarımızda geçen anahtarlar bulunur; bot önce overlay'e, sonra ana
+kitaba bakar (book.BookStack).
+
+Run kaydı, 34 bayt, little-endian: u64 zobrist | u16 polyglot hamle | f64 G | f64 B | f64 M
+
+Kullanım: python tools/book_builder.py oxydan_games.pgn.gz book_overlay.bin --base book.bin --player Oxydan
+          [--max-ply 30] [--min-games 3] [--workers 4] [--run-games 5000] [--tmp /tmp]
+"""
+import argparse
+import heapq
+import os
+import re
+import shutil
+import struct
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import chess
+import chess.polyglot
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from book import ENTRY, PolyglotBook
+from nndata import COMMENT_RE, PGN_DRAW, PGN_LOSS, PGN_WIN, RESULTS, elo, unique_games
+
+RUN = struct.Struct("<QHddd")
+BLOCK = 1 << 12   # Run okuma tamponu (kayıt)
+MAX_WEIGHT = 65535
+VARIATION_RE = re.compile(r"\([^()]*\)")
+
+
+def encode_move(board, move):
+    """Polyglot hamle kodu: rok 'şah kaleyi alır' olarak yazılır (book.decode'un tersi)."""
+    to_sq = move.to_square
+    if board.is_castling(move) and not board.chess960:
+        to_sq = chess.square(7 if chess.square_file(move.to_square) > 4 else 0, chess.square_rank(move.from_square))
+    promo = move.promotion - 1 if move.promotion else 0
+    return to_sq | (move.from_square << 6) | (promo << 12)
+
+
+def opening_moves(movetext, limit):
+    """Hamle metninden ilk `limit` SAN'ı çıkarır (yorum, varyant, NAG ve numaralar atlanır)."""
+    text = COMMENT_RE.sub(" ", movetext)
+    while True:
+        stripped = VARIATION_RE.sub(" ", text)
+        if stripped == text: break
+        text = stripped
+    sans = []
+    for token in text.split():
+        if token[0].isdigit() or token[0] == "$" or token == "*": continue
+        sans.append(token.rstrip("!?"))
+        if len(sans) >= limit: break
+    return sans
+
+
+def side_weight(mover_elo, opponent_elo):
+    if not mover_elo or not opponent_elo: return 1.0
+    return min(4.0, max(0.25, 2.0 ** ((opponent_elo - mover_elo) / 400.0)))
+
+
+def game_records(headers, movetext, args):
+    """(anahtar, hamle) -> [G, B, M] katkıları; hamleyi yapanın bakışından."""
+    if headers.get("FEN") or headers.get("Variant", "Standard") not in ("Standard", ""):
+        return []
+    result = RESULTS[headers["Result"]]
+    ratings = {chess.WHITE: elo(headers, "WhiteElo"), chess.BLACK: elo(headers, "BlackElo")}
+    ours = {chess.WHITE: headers.get("White", "").startswith(args.player),
+            chess.BLACK: headers.get("Black", "").startswith(args.player)}
+    if not args.all_moves and args.player and not any(ours.values()): return []
+
+    board = chess.Board()
+    out = []
+    for san in opening_moves(movetext, args.max_ply):
+        move = board.parse_san(san)
+        mover = board.turn
+        if args.all_moves or not args.player or ours[mover]:
+            won = result == (PGN_WIN if mover == chess.WHITE else PGN_LOSS)
+            w = side_weight(ratings[mover], ratings[not mover])
+            out.append((chess.polyglot.zobrist_hash(board), encode_move(board, move),
+                        w if won else 0.0, w if result == PGN_DRAW else 0.0,
+                        w if not won and result != PGN_DRAW else 0.0))
+        board.push(move)
+    return out
+
+
+def aggregate(records):
+    """Sıralı (anahtar, hamle, g, b, m) akışında aynı anahtar-hamle çiftlerini toplar."""
+    current, wins, draws, losses = None, 0.0, 0.0, 0.0
+    for key, move, w, d, l in records:
+        if (key, move) != current:
+            if current is not None: yield current[0], current[1], wins, draws, losses
+            current, wins, draws, losses = (key, move), 0.0, 0.0, 0.0
+        wins += w; draws += d; losses += l
+    if current is not None: yield current[0], current[1], wins, draws, losses
+
+
+def write_run(path, records):
+    with open(path, "wb") as fout:
+        buf = []
+        for rec in records:
+            buf.append(RUN.pack(*rec))
+            if len(buf) >= BLOCK:
+                fout.write(b"".join(buf))
+                buf = []
+        fout.write(b"".join(buf))
+
+
+def read_run(path):
+    with open(path, "rb") as fin:
+        while chunk := fin.read(RUN.size * BLOCK):
+            yield from RUN.iter_unpack(chunk)
+
+
+def build_run(job):
+    """İşçi süreç: bir parça maçı sıralı, birleştirilmiş tek run dosyasına çevirir."""
+    path, games, args = job
+    records, used, bad = [], 0, 0
+    for headers, movetext in games:
+        try:
+            found = game_records(headers, movetext, args)
+        except (ValueError, AssertionError):
+            bad += 1
+            continue
+        records += found
+        used += found != []
+    records.sort(key=lambda r: (r[0], r[1]))
+    write_run(path, aggregate(records))
+    return {"path": path, "games": used, "bad_games": bad, "records": len(records)}
+
+
+def merge_runs(paths, tmp, fan_in):
+    """Run sayısı fan_in'i aşmayana kadar ara birleştirme geçişleri yapar."""
+    generation = 0
+    while len(paths) > fan_in:
+        merged = []
+        for i in range(0, len(paths), fan_in):
+            group = paths[i:i + fan_in]
+            out = os.path.join(tmp, f"merge-{generation}-{i // fan_in:05d}.run")
+            write_run(out, aggregate(heapq.merge(*(read_run(p) for p in group))))
+            for p in group: os.remove(p)
+            merged.append(out)
+        paths, generation = merged, generation + 1
+    return aggregate(heapq.merge(*(read_run(p) for p in paths)))
+
+
+def by_key(records):
+    """(anahtar, [(hamle, g, b, m), ...]) üreticisi."""
+    current, moves = None, []
+    for key, move, w, d, l in records:
+        if key != current and moves:
+            yield current, moves
+            moves = []
+        current = key
+        moves.append((move, w, d, l))
+    if moves: yield current, moves
+
+
+def key_entries(key, moves, base, args):
+    """Bir anahtarın overlay girdileri: [(hamle, ağırlık)] ağırlık sırasıyla, ya da []."""
+    stats = {move: (w, d, l) for move, w, d, l in moves}
+    games = sum(w + d + l for w, d, l in stats.values())
+    prior = {}
+    if base is not None:
+        base_entries = base.entries(key)
+        total = sum(weight for _, weight in base_entries)
+        prior = {move: args.prior * weight / total for move, weight in base_entries if total}
+    if not prior and games < args.min_games:
+        return []   # Ana kitapta yok ve kanıt az: overlay'e girmez
+
+    points = {}
+    for move in set(stats) | set(prior):
+        w, d, l = stats.get(move, (0.0, 0.0, 0.0))
+        n = w + d + l
+        if n >= args.min_games and (w + 0.5 * d) / n < args.min_score:
+            points[move] = 0.0   # Bizde kaybettiren hamle: oynanmaz
+        else:
+            points[move] = 2 * w + d + prior.get(move, 0.0)   # Ana kitap payı %50 skorla
+    best = max(points.values())
+    if best <= 0: return [(move, 0) for move in points]
+    return sorted(((move, round(MAX_WEIGHT * p / best)) for move, p in points.items()), key=lambda e: (-e[1], e[0]))
+
+
+def write_overlay(path, grouped, base, args):
+    tmp = path + ".tmp"
+    keys = entries = 0
+    with open(tmp, "wb") as fout:
+        buf = []
+        for key, moves in grouped:
+            found = key_entries(key, moves, base, args)
+            if not found: continue
+            keys += 1
+            entries += len(found)
+            buf += [ENTRY.pack(key, move, weight, 0) for move, weight in found]
+            if len(buf) >= BLOCK:
+                fout.write(b"".join(buf))
+                buf = []
+        fout.write(b"".join(buf))
+    os.replace(tmp, path)   # Bot açıkken de yarım dosya görülmez
+    return keys, entries
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('inputs',      nargs='+', help='PGN dosyaları (.gz/.bz2/.xz/.zst olabilir)')
+    parser.add_argument('output',      help='Polyglot overlay (.bin)')
+    parser.add_argument('--base',      default=None, help='birleştirilecek ana kitap (ör. book.bin)')
+    parser.add_argument('--player',    default='Oxydan', help='bizim oyuncu adımızın öneki')
+    parser.add_argument('--all-moves', action='store_true', help='rakibin hamlelerini de örnekle')
+    parser.add_argument('--max-ply',   type=int, default=30)
+    parser.add_argument('--min-games', type=float, default=3, help='ağırlıklı maç sayısı eşiği')
+    parser.add_argument('--min-score', type=float, default=0.35, help='bu skorun altındaki hamleler 0 ağırlık')
+    parser.add_argument('--prior',     type=float, default=8, help='ana kitabın sahte maç sayısı')
+    parser.add_argument('--workers',   type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--run-games', type=int, default=5000, help='run dosyası başına maç')
+    parser.add_argument('--fan-in',    type=int, default=64, help='birleştirme geçişi başına run')
+    parser.add_argument('--tmp',       default=None, help='ara dosya klasörü')
+    parser.add_argument('--no-dedup',  action='store_true', help='aynı maçları ayıklama')
+    args = parser.parse_args()
+
+    start = time.monotonic()
+    tmp = tempfile.mkdtemp(prefix="book-", dir=args.tmp)
+    base = PolyglotBook.open(args.base) if args.base else None
+    skipped = {"result": 0, "duplicate": 0}
+    runs, pending, chunk = [], set(), []
+    totals = {"games": 0, "bad_games": 0, "records": 0}
+
+    def collect(done):
+        for future in done:
+            info = future.result()
+            runs.append(info["path"])
+            for k in totals: totals[k] += info[k]
+
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            def submit(games):
+                nonlocal pending
+                # Bellek sınırı: en fazla 2 * workers parça bekler
+                while len(pending) >= 2 * args.workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                path = os.path.join(tmp, f"run-{len(runs) + len(pending):05d}.run")
+                pending.add(pool.submit(build_run, (path, games, args)))
+
+            accept = lambda headers: None if headers.get("Result") in RESULTS else "result"
+            for game in unique_games(args.inputs, accept, skipped, None if args.no_dedup else tmp):
+                chunk.append(game)
+                if len(chunk) >= args.run_games:
+                    submit(chunk)
+                    chunk = []
+            if chunk: submit(chunk)
+            collect(wait(pending).done)
+
+        runs.sort()
+        print(f"  {totals['games']} maç -> {totals['records']} kayıt, {len(runs)} run "
+              f"| atlanan {skipped} | bozuk {totals['bad_games']}", flush=True)
+        keys, entries = write_overlay(args.output, by_key(merge_runs(runs, tmp, args.fan_in)), base, args)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+        if base: base.close()
+
+    elapsed = time.monotonic() - start
+    print(f"Bitti: {keys} pozisyon, {entries} girdi -> {args.output} ({elapsed:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+Toplu pozisyon analizi (evalbook'un çok süreçli karşılığı).
+
+`Ethereal evalbook` pozisyonları tek thread havuzunda sırayla arar ve sadece
+FEN'i yazar. Bu araç girdiyi akış halinde okur, pozisyonları N motor sürecine
+(UCI, go depth/nodes) dağıtır ve sonucu (FEN, skor, en iyi hamle, PV, düğüm)
+JSONL ya da sabit boyutlu ikili kayıt olarak yazar.
+
+Girdi: FEN/EPD satırları (.gz olabilir) veya PGN (--every ile her k. yarım hamle).
+Bellek: girdi sınırlı bir kuyruktan okunur; milyonlarca satırda da bellek sabittir.
+Devam: çıktı dosyası varsa baştan taranır; bitmiş pozisyonlar atlanır, yarım
+kalmış son kayıt kesilir. Aynı girdi ve aynı ayarlarla tekrar çalıştırmak yeterli.
+
+Skor her zaman beyazın bakış açısındandır (cp); mat ±(32000 - N) olarak
+kodlanır; N mata kalan hamle sayısıdır (python-chess `mate()`, yarım hamle değil).
+
+İkili format (--format bin), kayıt başına 21 bayt, little-endian:
+  u32 girdi sırası | u64 polyglot zobrist | i16 skor | u16 en iyi hamle
+  (from | to << 6 | terfi << 12, terfi: 0 yok, 1 N, 2 B, 3 R, 4 Q) | u8 derinlik | u32 düğüm
+
+Kullanım: python tools/evalbook.py positions.epd out.jsonl --engine ./src/Ethereal --workers 4 --depth 12
+          python tools/evalbook.py games.pgn out.bin --format bin --nodes 20000 --every 2
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import struct
+import time
+
+import chess
+import chess.engine
+import chess.pgn
+import chess.polyglot
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RECORD = struct.Struct("<IQhHBI")
+MATE_SCORE = 32000
+PROMOS = {None: 0, chess.KNIGHT: 1, chess.BISHOP: 2, chess.ROOK: 3, chess.QUEEN: 4}
+
+
+def open_text(path):
+    return gzip.open(path, "rt") if path.endswith(".gz") else open(path)
+
+
+def read_positions(path, every=1, min_ply=0):
+    """(sıra, fen) üreticisi. EPD opkodları atılır; PGN'de her `every` yarım hamlede bir pozisyon."""
+    index = 0
+    with open_text(path) as fin:
+        if ".pgn" in path:
+            while (game := chess.pgn.read_game(fin)) is not None:
+                board = game.board()
+                for ply, move in enumerate(game.mainline_moves()):
+                    if ply >= min_ply and (ply - min_ply) % every == 0:
+                        yield index, board.fen()
+                        index += 1
+                    board.push(move)
+            return
+        for line in fin:
+            fields = line.split(";")[0].split()
+            if len(fields) < 4: continue
+            # EPD: 4 alan + opkodlar, FEN: 6 alan
+            fen = " ".join(fields[:6]) if len(fields) >= 6 and fields[4].isdigit() else " ".join(fields[:4]) + " 0 1"
+            yield index, fen
+            index += 1
+
+
+def encode_move(move):
+    if move is None: return 0
+    return move.from_square | (move.to_square << 6) | (PROMOS.get(move.promotion, 0) << 12)
+
+
+def white_score(info, board):
+    score = info.get("score")
+    if score is None: return 0
+    pov = score.white()
+    if pov.is_mate():
+        mate = pov.mate()
+        return MATE_SCORE - abs(mate) if mate > 0 else -(MATE_SCORE - abs(mate))
+    return max(-MATE_SCORE + 1000, min(MATE_SCORE - 1000, pov.score()))
+
+
+class Output:
+    """Sonuç yazıcı + devam durumu (kesintisiz tamamlanmış önek ve ötesindeki az sayıda sıra)."""
+
+    def __init__(self, path, fmt):
+        self.path = path
+        self.fmt = fmt
+        self.watermark = 0     # Bu sıranın altındaki tüm pozisyonlar yazıldı
+        self.ahead = set()     # watermark'ın üstünde bitmiş sıralar (en fazla kuyruk boyu kadar)
+        self.written = 0
+        self._recover()
+        self.fout = open(path, "ab")
+
+    def _mark(self, index):
+        if index < self.watermark: return
+        self.ahead.add(index)
+        while self.watermark in self.ahead:
+            self.ahead.discard(self.watermark)
+            self.watermark += 1
+
+    def _recover(self):
+        if not os.path.exists(self.path): return
+        valid = 0
+        with open(self.path, "rb") as fin:
+            if self.fmt == "bin":
+                while len(chunk := fin.read(RECORD.size)) == RECORD.size:
+                    self._mark(RECORD.unpack(chunk)[0])
+                    valid += RECORD.size
+            else:
+                for line in fin:
+                    if not line.endswith(b"\n"): break   # Yarım kalmış son satır
+                    try: self._mark(json.loads(line)["i"])
+                    except (ValueError, KeyError): break
+                    valid += len(line)
+        # Kesintide yarım yazılmış kaydı at
+        with open(self.path, "r+b") as f:
+            f.truncate(valid)
+
+    def done(self, index):
+        return index < self.watermark or index in self.ahead
+
+    def write(self, index, fen, board, result):
+        info = result.get("info", {})
+        best = result.get("move")
+        if self.fmt == "bin":
+            key = chess.polyglot.zobrist_hash(board)
+            self.fout.write(RECORD.pack(index, key, white_score(info, board), encode_move(best),
+                                        min(255, info.get("depth", 0)), min(0xFFFFFFFF, info.get("nodes", 0))))
+        else:
+            row = {"i": index, "fen": fen, "score": white_score(info, board),
+                   "best": best.uci() if best else None, "pv": [m.uci() for m in info.get("pv", [])],
+                   "depth": info.get("depth", 0), "nodes": info.get("nodes", 0)}
+            self.fout.write((json.dumps(row) + "\n").encode())
+        self._mark(index)
+        self.written += 1
+        if self.written % 256 == 0: self.fout.flush()
+
+    def close(self):
+        self.fout.flush()
+        os.fsync(self.fout.fileno())
+        self.fout.close()
+
+
+async def engine_worker(args, jobs, output, counters):
+    _, engine = await chess.engine.popen_uci(args.engine)
+    await engine.configure({"Threads": args.threads, "Hash": args.hash})
+    limit = chess.engine.Limit(nodes=args.nodes) if args.nodes else chess.engine.Limit(depth=args.depth)
+    try:
+        while (job := await jobs.get()) is not None:
+            index, fen = job
+            board = chess.Board(fen)
+            if board.is_game_over():
+                output.write(index, fen, board, {})
+                continue
+            # Her pozisyon yeni oyun: evalbook'taki tt_clear ile aynı (--keep-hash ile kapatılır)
+            game = None if args.keep_hash else index
+            result = await engine.play(board, limit, game=game, info=chess.engine.INFO_SCORE | chess.engine.INFO_PV | chess.engine.INFO_BASIC)
+            output.write(index, fen, board, {"move": result.move, "info": result.info})
+            counters["nodes"] += result.info.get("nodes", 0)
+    finally:
+        await engine.quit()
+
+
+async def feed(jobs, item, workers):
+    """
+    jobs.put, motor görevleriyle yarışarak: bir motor hatayla düşerse ya da
+    çalışan motor kalmazsa beklemeyi bırakır (False); dolu kuyrukta sonsuza
+    dek beklenmez.
+    """
+    put = asyncio.ensure_future(jobs.put(item))
+    pending = {w for w in workers if not w.done()}
+    try:
+        while not put.done():
+            if not pending or any(not w.cancelled() and w.exception() for w in workers if w.done()):
+                return False
+            _, pending = await asyncio.wait(pending | {put}, return_when=asyncio.FIRST_COMPLETED)
+            pending.discard(put)
+        return True
+    finally:
+        put.cancel()
+
+
+async def run(args):
+    output = Output(args.output, args.format)
+    skipped = 0
+    jobs = asyncio.Queue(maxsize=args.workers * 4)
+    counters = {"nodes": 0}
+    workers = [asyncio.create_task(engine_worker(args, jobs, output, counters)) for _ in range(args.workers)]
+    start = time.monotonic()
+    last_report = start
+
+    try:
+        for index, fen in read_positions(args.input, args.every, args.min_ply):
+            if output.done(index):
+                skipped += 1
+                continue
+            if args.limit and index >= args.limit: break
+            if not await feed(jobs, (index, fen), workers) or any(w.done() for w in workers):
+                break   # Bir motor düştü; hatayı aşağıda göster
+            now = time.monotonic()
+            if now - last_report > args.progress:
+                rate = output.written / (now - start)
+                print(f"  {output.written} yazıldı | {rate:.1f} poz/sn | {counters['nodes'] / (now - start):.0f} nps "
+                      f"| atlanan {skipped}", flush=True)
+                last_report = now
+        # Bitiş işareti sadece çalışan motorlara; biri düşerse gather hatayı gösterir
+        for _ in [w for w in workers if not w.done()]:
+            if not await feed(jobs, None, workers): break
+        await asyncio.gather(*workers)
+    finally:
+        for w in workers: w.cancel()
+        output.close()
+
+    elapsed = time.monotonic() - start
+    print(f"Bitti: {output.written} pozisyon {elapsed:.1f}s ({output.written / max(elapsed, 1e-9):.1f} poz/sn) "
+          f"| devamdan atlanan {skipped} | çıktı {args.output}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('input',       help='FEN/EPD (.gz olabilir) veya PGN')
+    parser.add_argument('output',      help='JSONL veya ikili çıktı (varsa kaldığı yerden devam eder)')
+    parser.add_argument('--engine',    default=os.path.join(ROOT, 'src', 'Ethereal'))
+    parser.add_argument('--workers',   type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--depth',     type=int, default=12)
+    parser.add_argument('--nodes',     type=int, default=0, help='go nodes N (0: go depth)')
+    parser.add_argument('--threads',   type=int, default=1)
+    parser.add_argument('--hash',      type=int, default=2)
+    parser.add_argument('--keep-hash', action='store_true', help='pozisyonlar arasında TT temizlenmesin')
+    parser.add_argument('--format',    default=None, choices=['jsonl', 'bin'], help='varsayılan: uzantıdan')
+    parser.add_argument('--every',     type=int, default=1, help='PGN: her k. yarım hamle')
+    parser.add_argument('--min-ply',   type=int, default=0, help='PGN: ilk k yarım hamleyi atla')
+    parser.add_argument('--limit',     type=int, default=0, help='ilk N pozisyon (0: hepsi)')
+    parser.add_argument('--progress',  type=float, default=10.0, help='ilerleme satırı aralığı (sn)')
+    args = parser.parse_args()
+    args.format = args.format or ('bin' if args.output.endswith('.bin') else 'jsonl')
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,405 @@
+"""
+Yerel maç yöneticisi: iki yapılandırmayı (A, B) paralel maçlarda karşılaştırır
+ve SPRT ile erken durur. Motor, uci_options veya calculate_smart_time
+değişikliğini Lichess'te puan kaybetmeden önce tek makinede doğrulamak için.
+
+Oyuncular:
+  engine : UCI motoru doğrudan, saatler motora verilir (Ethereal timeman)
+  bot    : OxydanAegisV4.get_best_move'un tamamı (kitap, tablebase, önbellek,
+           zaman yönetimi, acil durum yolu); her taraf lichess-bot.py'nin ayrı
+           bir kopyasını yükler, SETTINGS'leri birbirine karışmaz
+
+Açılışlar: EPD/FEN dosyasından ya da Polyglot kitaptan ağırlıklı rastgele
+yürüyüşle (--book-plies yarım hamle). Her açılış renkler değişerek iki kez
+oynanır (çift); SPRT çift sonuçlarının beşli (pentanomial) dağılımıyla
+hesaplanır (GSPRT, lojistik Elo, fishtest ile aynı en çok olabilirlik LLR'si):
+  LLR = N * sum(q * log(p1 / p0)),  s = 1 / (1 + 10^(-elo / 400))
+  q: gözlenen beşli dağılım, p0 / p1: ortalaması s0 / s1 olan en yakın dağılım
+Sınırlar: [ln(beta / (1 - alpha)), ln((1 - beta) / alpha)]. --min-pairs çiftten
+önce karar verilmez. Sınama: python -m doctest tools/gauntlet.py
+
+Maçlar gerçek saatle (duvar saati, artışlı) oynanır. Süre aşımı ve yasadışı
+hamle kayıptır. Oyuncu çökerse çift sayılmaz (PGN'e yazılır) ve o işçinin
+oyuncuları yeniden başlatılır. Hakemlik: yerel Syzygy (--syzygy) tablosu olan
+pozisyonda WDL sonucu, --max-plies'ta beraberlik.
+
+İşçi süreç sayısı varsayılan olarak çekirdek sayısıdır (maçta sadece sıradaki
+taraf düşünür). Maçlar bitikçe PGN dosyasına yazılır, her çiftten sonra canlı
+LLR satırı basılır.
+
+Kullanım: python tools/gauntlet.py --engine-a ./src/Ethereal --engine-b ./Ethereal-old --tc 10+0.1
+          [--options-a Hash=16,Threads=1] [--player-a bot --time-mode-a smart --book-a book.bin]
+          [--openings pos.epd | --book book.bin --book-plies 8] [--elo0 0 --elo1 5]
+          [--workers 4] [--max-pairs 5000] [--pgn gauntlet.pgn] [--syzygy ./syzygy]
+"""
+import argparse
+import asyncio
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import timedelta
+from multiprocessing import util
+
+import chess
+import chess.engine
+import chess.pgn
+import chess.polyglot
+import chess.syzygy
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+PAIR_SCORES = (0.0, 0.25, 0.5, 0.75, 1.0)   # Çiftte A'nın puanı / 2
+
+
+# --- İstatistik ---
+def expected_score(elo):
+    return 1.0 / (1.0 + 10.0 ** (-elo / 400.0))
+
+
+def pentanomial_stats(penta):
+    """(çift sayısı, ortalama, varyans); boş kovalar çok küçük bir önselle doldurulur."""
+    counts = [c + 1e-3 for c in penta]
+    n = sum(counts)
+    mean = sum(c * s for c, s in zip(counts, PAIR_SCORES)) / n
+    var = sum(c * (s - mean) ** 2 for c, s in zip(counts, PAIR_SCORES)) / n
+    return n, mean, var
+
+
+def mle_pdf(probs, s):
+    """
+    Ortalaması s olan ve ampirik beşli dağılıma en yakın (en çok olabilirlik)
+    dağılım: p_i = q_i / (1 + lam * (a_i - s)), lam ortalama kısıtından ikiye
+    bölmeyle bulunur (fonksiyon lam'da azalan, kovaların hepsi dolu).
+    """
+    lo, hi = -1.0 / (1.0 - s), 1.0 / s
+    for _ in range(100):
+        lam = (lo + hi) / 2
+        if sum(q * (a - s) / (1 + lam * (a - s)) for q, a in zip(probs, PAIR_SCORES)) > 0: lo = lam
+        else: hi = lam
+    pdf = [q / (1 + lam * (a - s)) for q, a in zip(probs, PAIR_SCORES)]
+    total = sum(pdf)
+    return [p / total for p in pdf]
+
+
+def sprt_llr(penta, elo0, elo1):
+    """
+    Beşli GSPRT (fishtest): LLR = N * sum(q * log(p1 / p0)); p0 / p1 ortalaması
+    s0 / s1 olan en çok olabilirlik dağılımları. Tüm çiftler aynı kovaya
+    düştüğünde varyans sıfıra çökmez, LLR çift başı küçük kalır:
+
+    >>> round(sprt_llr([0, 0, 0, 0, 2], 0, 5), 2), round(sprt_llr([0, 0, 0, 3, 0], 0, 5), 2)
+    (0.03, 0.04)
+    >>> abs(sprt_llr([0, 0, 30, 0, 0], 0, 5)) < 1.0
+    True
+    """
+    n = sum(penta)
+    if not n: return 0.0
+    counts = [c + 1e-3 for c in penta]
+    probs = [c / sum(counts) for c in counts]
+    p0, p1 = mle_pdf(probs, expected_score(elo0)), mle_pdf(probs, expected_score(elo1))
+    return n * sum(q * math.log(b / a) for q, a, b in zip(probs, p0, p1))
+
+
+def sprt_bounds(alpha, beta):
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+
+def elo_estimate(penta):
+    """A'nın B'ye karşı Elo farkı ve %95 aralığı."""
+    n, mean, var = pentanomial_stats(penta)
+    margin = 1.96 * math.sqrt(var / n)
+    to_elo = lambda s: -400.0 * math.log10(1.0 / min(max(s, 1e-6), 1 - 1e-6) - 1.0)
+    return to_elo(mean), to_elo(mean - margin), to_elo(mean + margin)
+
+
+# --- Açılışlar ---
+def epd_openings(path):
+    fens = []
+    with open(path) as fin:
+        for line in fin:
+            fields = line.split(";")[0].split()
+            if len(fields) < 4: continue
+            fens.append(" ".join(fields[:6]) if len(fields) >= 6 and fields[4].isdigit() else " ".join(fields[:4]) + " 0 1")
+    return fens
+
+
+def book_openings(path, count, plies, rng):
+    """Kitapta ağırlıklı rastgele yürüyüşle en fazla `count` farklı açılış pozisyonu."""
+    fens, seen = [], set()
+    with chess.polyglot.open_reader(path) as reader:
+        for _ in range(count * 20):
+            board = chess.Board()
+            for _ in range(plies):
+                try: board.push(reader.weighted_choice(board, random=rng).move)
+                except IndexError: break
+            fen = board.fen()
+            if fen not in seen and not board.is_game_over():
+                seen.add(fen)
+                fens.append(fen)
+                if len(fens) >= count: break
+    return fens
+
+
+# --- Oyuncular ---
+def parse_options(text):
+    return dict(item.split("=", 1) for item in text.split(",") if "=" in item) if text else {}
+
+
+class EnginePlayer:
+    def __init__(self, name, path, options):
+        self.name = name
+        self.path = path
+        self.options = options
+        self.engine = None
+
+    async def start(self):
+        _, self.engine = await chess.engine.popen_uci(self.path)
+        await self.engine.configure(self.options)
+
+    async def move(self, board, game_id, clocks, inc):
+        limit = chess.engine.Limit(white_clock=clocks[chess.WHITE], black_clock=clocks[chess.BLACK],
+                                   white_inc=inc, black_inc=inc)
+        return (await self.engine.play(board, limit, game=game_id)).move
+
+    async def end_game(self, game_id):
+        pass
+
+    async def close(self):
+        try: await asyncio.wait_for(self.engine.quit(), 5)
+        except Exception: pass
+
+
+class BotPlayer:
+    """lichess-bot.py'nin hamle hattı; modül her oyuncu için ayrı yüklenir."""
+
+    def __init__(self, name, path, options, time_mode, book, overlay):
+        from mock_lichess import load_bot_module
+        from game_session import GameSession
+        self.name = name
+        self.module = load_bot_module()
+        self.session_cls = GameSession
+        settings = self.module.SETTINGS
+        settings.update(ENGINE_POOL_SIZE=1, MAX_PARALLEL_GAMES=1, THREAD_SHIFT=False, ENGINE_STATS_PATH=None, METRICS_PATH=None, CLOCK_TRACE_PATH=None,
+                        ANALYSIS_CACHE_PATH=None, TABLEBASE_URL=None,   # Çevrim içi tablebase maçı dışarı taşımasın
+                        BOOK_PATH=book or "", BOOK_OVERLAY_PATH=overlay or "")
+        self.bot = self.module.OxydanAegisV4(path, uci_options=options, time_mode=time_mode)
+        self.sessions = {}
+
+    async def start(self):
+        await self.bot.start()
+
+    async def move(self, board, game_id, clocks, inc):
+        session = self.sessions.get(game_id)
+        if session is None:
+            root = board.root()
+            session = self.sessions[game_id] = self.session_cls(game_id, board.turn, initial_fen=root.fen())
+        session.sync(" ".join(m.uci() for m in board.move_stack))
+        ms = lambda s: timedelta(seconds=max(0.0, s))
+        return await self.bot.get_best_move(session.board, ms(clocks[chess.WHITE]), ms(clocks[chess.BLACK]),
+                                            ms(inc), ms(inc), session=session)
+
+    async def end_game(self, game_id):
+        self.sessions.pop(game_id, None)
+        await self.bot.end_game(game_id)
+
+    async def close(self):
+        await self.bot.close()
+
+
+def make_player(args, side):
+    get = lambda key: getattr(args, f"{key}_{side}")
+    name = get("name") or f"{side.upper()}:{os.path.basename(get('engine'))}"
+    options = parse_options(get("options"))
+    if get("player") == "bot":
+        return BotPlayer(name, get("engine"), options, get("time_mode"), get("book"), get("overlay"))
+    return EnginePlayer(name, get("engine"), options)
+
+
+# --- Maç ---
+def adjudicate(board, tablebase, max_plies):
+    """(sonuç, sebep) ya da None."""
+    outcome = board.outcome(claim_draw=True)
+    if outcome: return outcome.result(), outcome.termination.name.lower()
+    if len(board.move_stack) >= max_plies: return "1/2-1/2", "max_plies"
+    if tablebase and not board.castling_rights and chess.popcount(board.occupied) <= 7:
+        try: wdl = tablebase.probe_wdl(board)
+        except (KeyError, IndexError): return None
+        if wdl == 0 or abs(wdl) == 1: return "1/2-1/2", "tablebase"   # Cursed/blessed da beraberlik
+        return ("1-0" if (wdl > 0) == (board.turn == chess.WHITE) else "0-1"), "tablebase"
+    return None
+
+
+async def play_game(white, black, fen, game_id, tc, tablebase, max_plies):
+    base, inc = tc
+    board = chess.Board(fen)
+    clocks = {chess.WHITE: base, chess.BLACK: base}
+    players = {chess.WHITE: white, chess.BLACK: black}
+    loss = lambda color: "0-1" if color == chess.WHITE else "1-0"
+    while True:
+        verdict = adjudicate(board, tablebase, max_plies)
+        if verdict: break
+        color = board.turn
+        started = time.monotonic()
+        try:
+            move = await players[color].move(board.copy(), game_id, dict(clocks), inc)
+        except Exception as e:
+            verdict = loss(color), f"crash: {e!r}"
+            break
+        clocks[color] -= time.monotonic() - started
+        if clocks[color] < 0:
+            verdict = loss(color), "time_forfeit"
+            break
+        if move is None or not board.is_legal(move):
+            verdict = loss(color), f"illegal_move: {move}"
+            break
+        clocks[color] += inc
+        board.push(move)
+    for player in (white, black):
+        await player.end_game(game_id)
+    return board, verdict
+
+
+def to_pgn(board, fen, white, black, verdict, tc, round_no):
+    game = chess.pgn.Game.from_board(board)
+    game.headers.update(Event="Oxydan gauntlet", Site=os.uname().nodename, Round=str(round_no),
+                        White=white.name, Black=black.name, Result=verdict[0],
+                        TimeControl=f"{tc[0]:g}+{tc[1]:g}", Termination=verdict[1])
+    if fen != chess.STARTING_FEN:
+        game.headers.update(FEN=fen, SetUp="1")
+    return str(game)
+
+
+# --- İşçi süreç ---
+_worker = {}
+
+
+def init_worker(args):
+    if not args.verbose: sys.stdout = open(os.devnull, "w")   # Botun hamle logları canlı LLR'yi bozmasın
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    tablebase = chess.syzygy.open_tablebase(args.syzygy) if args.syzygy else None
+    _worker.update(loop=loop, args=args, players=None, tablebase=tablebase)
+    util.Finalize(None, close_worker, exitpriority=10)
+
+
+def close_worker():
+    players, loop = _worker.get("players"), _worker.get("loop")
+    if players:
+        loop.run_until_complete(asyncio.gather(*(p.close() for p in players.values())))
+
+
+async def _play_pair(index, fen):
+    args = _worker["args"]
+    if _worker["players"] is None:
+        players = {"a": make_player(args, "a"), "b": make_player(args, "b")}
+        await asyncio.gather(*(p.start() for p in players.values()))
+        _worker["players"] = players
+    a, b = _worker["players"]["a"], _worker["players"]["b"]
+    games, points_a = [], []
+    for swap in (False, True):
+        white, black = (b, a) if swap else (a, b)
+        game_id = f"p{index}{'b' if swap else 'a'}"
+        board, verdict = await play_game(white, black, fen, game_id, args.tc, _worker["tablebase"], args.max_plies)
+        games.append(to_pgn(board, fen, white, black, verdict, args.tc, 2 * index + swap + 1))
+        if verdict[1].startswith("crash"):
+            # Çökmüş oyuncu sonraki çiftleri de hükmen kaybettirmesin: yeniden başlatılır, çift sayılmaz
+            await asyncio.gather(*(p.close() for p in (a, b)), return_exceptions=True)
+            _worker["players"] = None
+            return {"index": index, "void": verdict[1], "pgn": games}
+        points = {"1-0": 1.0, "0-1": 0.0}.get(verdict[0], 0.5)
+        points_a.append(1.0 - points if swap else points)
+    return {"index": index, "void": None, "penta": round(2 * sum(points_a)), "points": points_a, "pgn": games}
+
+
+def play_pair(job):
+    return _worker["loop"].run_until_complete(_play_pair(*job))
+
+
+# --- Ana süreç ---
+def main():
+    parser = argparse.ArgumentParser()
+    for side in ("a", "b"):
+        parser.add_argument(f'--engine-{side}',    required=True)
+        parser.add_argument(f'--name-{side}',      default=None)
+        parser.add_argument(f'--options-{side}',   default='Hash=16,Threads=1', help='UCI ayarları: Ad=değer,...')
+        parser.add_argument(f'--player-{side}',    default='engine', choices=['engine', 'bot'])
+        parser.add_argument(f'--time-mode-{side}', default='smart', help='bot: smart/native/hybrid')
+        parser.add_argument(f'--book-{side}',      default=None, help='bot: Polyglot kitap')
+        parser.add_argument(f'--overlay-{side}',   default=None, help='bot: overlay kitap')
+    parser.add_argument('--tc',        default='10+0.1', help='taban+artış (sn)')
+    parser.add_argument('--openings',  default=None, help='EPD/FEN dosyası')
+    parser.add_argument('--book',      default=None, help='açılışlar için Polyglot kitap')
+    parser.add_argument('--book-plies', type=int, default=8)
+    parser.add_argument('--max-pairs', type=int, default=5000)
+    parser.add_argument('--min-pairs', type=int, default=30, help='bundan az çiftte SPRT kararı verilmez')
+    parser.add_argument('--elo0',      type=float, default=0.0)
+    parser.add_argument('--elo1',      type=float, default=5.0)
+    parser.add_argument('--alpha',     type=float, default=0.05)
+    parser.add_argument('--beta',      type=float, default=0.05)
+    parser.add_argument('--workers',   type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--syzygy',    default=None, help='hakemlik için Syzygy klasörü')
+    parser.add_argument('--max-plies', type=int, default=400)
+    parser.add_argument('--pgn',       default='gauntlet.pgn')
+    parser.add_argument('--seed',      type=int, default=1)
+    parser.add_argument('--verbose',   action='store_true', help='işçilerin (bot) loglarını göster')
+    args = parser.parse_args()
+    args.tc = tuple(float(x) for x in args.tc.split("+")) if "+" in args.tc else (float(args.tc), 0.0)
+
+    rng = random.Random(args.seed)
+    if args.openings: openings = epd_openings(args.openings)
+    elif args.book: openings = book_openings(args.book, args.max_pairs, args.book_plies, rng)
+    else: openings = [chess.STARTING_FEN]
+    rng.shuffle(openings)
+    lower, upper = sprt_bounds(args.alpha, args.beta)
+    print(f"SPRT elo0={args.elo0:g} elo1={args.elo1:g} alpha={args.alpha:g} beta={args.beta:g} "
+          f"sınırlar [{lower:.2f}, {upper:.2f}] | {len(openings)} açılış | {args.workers} işçi | tc {args.tc[0]:g}+{args.tc[1]:g}",
+          flush=True)
+
+    penta, wdl = [0] * 5, [0, 0, 0]
+    llr, verdict, pairs, voided = 0.0, None, 0, 0
+    start = time.monotonic()
+    jobs = ((i, openings[i % len(openings)]) for i in range(args.max_pairs))
+    with open(args.pgn, "a") as pgn_out, ProcessPoolExecutor(args.workers, initializer=init_worker, initargs=(args,)) as pool:
+        pending = set()
+        for _ in range(2 * args.workers):
+            job = next(jobs, None)
+            if job: pending.add(pool.submit(play_pair, job))
+        while pending and verdict is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                for text in result["pgn"]:
+                    pgn_out.write(text + "\n\n")
+                pgn_out.flush()
+                job = next(jobs, None)
+                if job: pending.add(pool.submit(play_pair, job))
+                if result["void"]:
+                    voided += 1
+                    print(f"  ⚠️ çift {result['index']} sayılmadı ({result['void']}); oyuncular yeniden başlatılıyor", flush=True)
+                    continue
+                pairs += 1
+                penta[result["penta"]] += 1
+                for points in result["points"]:
+                    wdl[{1.0: 0, 0.0: 2}.get(points, 1)] += 1
+                llr = sprt_llr(penta, args.elo0, args.elo1)
+                elo, lo, hi = elo_estimate(penta)
+                print(f"  çift {pairs:5d} | beşli {penta} | LLR {llr:6.2f} [{lower:.2f}, {upper:.2f}] "
+                      f"| Elo {elo:+6.1f} ({lo:+.1f}, {hi:+.1f}) | {(time.monotonic() - start) / pairs:.1f}s/çift", flush=True)
+                if pairs < args.min_pairs: pass
+                elif llr >= upper: verdict = "H1 kabul (A daha güçlü)"
+                elif llr <= lower: verdict = "H0 kabul (A elo1 kadar güçlü değil)"
+                if verdict: break
+        for future in pending: future.cancel()
+
+    elo, lo, hi = elo_estimate(penta)
+    print(f"Bitti: {verdict or 'karar yok (--max-pairs doldu)'} | {pairs} çift, {2 * pairs} maç | "
+          f"A G/B/M {wdl} | çökme nedeniyle sayılmayan {voided} | Elo {elo:+.1f} ({lo:+.1f}, {hi:+.1f}) | LLR {llr:.2f} | PGN {args.pgn}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Devir testi: iki bot örneği aynı sahte Lichess'e (tools/mock_lichess.py, HTTP)
+bağlanır. A maçları açar ve `--runtime` sn sonra kapanır; B, A kapanmadan
+`--overlap` sn önce ayrı bir süreç olarak başlar, A'nın devir dosyasını görüp
+beklemeye geçer ve kapanış anında süren maçları devralır (aynı makinede
+yeniden başlatma; Actions'ta devir bilgisi workflow_dispatch girdileriyle gelir).
+
+Rapor: maç sonuçları, süreden kayıplar, yasadışı hamleler ve devir anını
+kapsayan hamle gecikmeleri (sunucu tarafı: botun sırası -> hamle sunucuda).
+
+Kullanım: python tools/handoff_harness.py --engine ./src/Ethereal [--games 2] [--tc 2+0]
+          [--runtime 20] [--overlap 8]
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(ROOT))
+sys.path.insert(0, ROOT)
+from lichess_api import LichessClient
+from mock_lichess import MockLichess, load_bot_module
+from load_test import summarize
+
+
+async def child(args):
+    """Tek bot örneği (ayrı süreç: devir dosyasındaki pid/host kontrolü gerçek olsun)."""
+    module = load_bot_module()
+    module.SETTINGS["MAX_PARALLEL_GAMES"] = args.games
+    module.SETTINGS["MAX_TOTAL_RUNTIME"] = args.runtime
+    module.SETTINGS["STOP_ACCEPTING_MINS"] = 0
+    module.SETTINGS["ENGINE_PATH"] = args.engine
+    module.SETTINGS["ENGINE_STATS_PATH"] = None
+    module.SETTINGS["METRICS_PATH"] = None
+    module.SETTINGS["ANALYSIS_CACHE_PATH"] = None
+    module.SETTINGS["BOOK_OVERLAY_PATH"] = ""
+    module.SETTINGS["CLOCK_TRACE_PATH"] = None
+    module.SETTINGS["HANDOFF_PATH"] = args.state
+    module.SETTINGS["HANDOFF_INTERVAL"] = 2
+    module.SETTINGS["GREETING"] = "handoff"
+    config = {"engine": {"uci_options": {"Hash": 16, "Threads": 1}}}
+    await module.run_bot(LichessClient("mock-token", args.url, pool_size=args.games + 2), config)
+
+
+def spawn(args, url, state, runtime, name):
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", "--url", url, "--state", state,
+           "--runtime", str(runtime), "--games", str(args.games), "--engine", args.engine]
+    log = open(os.path.join(os.path.dirname(state), f"{name}.log"), "w")
+    return subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT, env=dict(os.environ, PYTHONUNBUFFERED="1")), log
+
+
+async def harness(args):
+    mock = MockLichess(args.games, args.tc, args.delay, args.seed, jitter=args.jitter)
+    await mock.start()
+    workdir = tempfile.mkdtemp(prefix="handoff-")
+    state = os.path.join(workdir, "handoff_state.json")
+
+    started = time.monotonic()
+    a, log_a = spawn(args, mock.url, state, args.runtime, "a")
+    await asyncio.sleep(args.runtime - args.overlap)
+    b, log_b = spawn(args, mock.url, state, args.timeout, "b")
+    await asyncio.sleep(args.overlap)
+    takeover = time.monotonic()
+    before = len(mock.latencies)
+    try:
+        await asyncio.wait_for(mock.finished.wait(), args.timeout)
+    except asyncio.TimeoutError:
+        print(f"⚠️ {args.timeout:.0f}s içinde tüm maçlar bitmedi.")
+    elapsed = time.monotonic() - started
+    for proc, log in ((a, log_a), (b, log_b)):
+        if proc.poll() is None: proc.terminate()
+        proc.wait()
+        log.close()
+    await mock.stop()
+
+    rows = mock.report()
+    print(f"\n{'maç':>8} | {'durum':>10} | {'sonuç':>9} | {'yarım hamle':>11} | {'yasadışı':>8}")
+    for row in rows:
+        print(f"{row[0]:>8} | {row[1]:>10} | {row[2]:>9} | {row[3]:>11} | {row[4]:>8}")
+    lat = summarize(mock.latencies[:before])
+    after = summarize(mock.latencies[before:before + args.games])
+    print(f"Süre: {elapsed:.1f}s | devir {takeover - started:.1f}s'de | süreden kayıp "
+          f"{sum(1 for r in rows if r[1] == 'outoftime' and r[2] == 'kayıp')} | yasadışı {sum(r[4] for r in rows)}")
+    print(f"Devirden önce hamle gecikmesi : p50 {lat['p50']:.2f}s | max {lat['max']:.2f}s (n={lat['n']})")
+    print(f"Devirden sonraki ilk hamleler : p50 {after['p50']:.2f}s | max {after['max']:.2f}s (n={after['n']})")
+    print(f"Günlükler: {workdir}/a.log, {workdir}/b.log")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--engine',  default=os.path.join(os.path.dirname(ROOT), 'src', 'Ethereal'))
+    parser.add_argument('--games',   type=int,   default=2)
+    parser.add_argument('--tc',      default='2+0')
+    parser.add_argument('--delay',   type=float, default=0.1, help='rakip düşünme süresi (sn)')
+    parser.add_argument('--jitter',  type=float, default=0.05)
+    parser.add_argument('--seed',    type=int,   default=1)
+    parser.add_argument('--runtime', type=float, default=20, help='A örneğinin çalışma süresi (sn)')
+    parser.add_argument('--overlap', type=float, default=8, help='B, A kapanmadan kaç sn önce başlasın')
+    parser.add_argument('--timeout', type=float, default=600)
+    parser.add_argument('--child',   action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--url',     help=argparse.SUPPRESS)
+    parser.add_argument('--state',   help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    asyncio.run(child(args) if args.child else harness(args))
+
+
+if __name__ == "__main__":
+    main()
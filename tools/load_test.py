@@ -0,0 +1,139 @@
+"""
+Yük testi: OxydanAegisV4'ü sahte Lichess'e (tools/mock_lichess.py) karşı N
+eşzamanlı maçla oynatır ve bu makinedeki eşzamanlılık tavanını ölçer.
+
+Rapor:
+  - hamle gecikmesi yüzdelikleri (sunucu tarafı: botun sırasının geldiği
+    an -> hamlenin sunucuya ulaştığı an; düşünme + ağ + olay döngüsü)
+  - saniyedeki bot hamlesi
+  - motor havuzu bekleme süresi (yeni maçın boş motor bulana kadar beklediği)
+  - süreden kaybedilen maçlar, yasadışı hamleler
+  - botun kendi aşama süreleri (metrics.py: book/tablebase/engine_wait/search/make_move)
+
+Taşıyıcılar:
+  memory : süreç içi MockTransport (ağ katmanı yok, --lag ile yapay gecikme)
+  http   : gerçek soketler üzerinden LichessClient
+
+Kullanım: python tools/load_test.py --engine ./src/Ethereal --games 8 [--engines 4] [--tc 1+0]
+          [--transport memory|http] [--lag 0.02] [--delay 0.1 --jitter 0.05] [--json rapor.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from lichess_api import LichessClient
+from mock_lichess import MockLichess, MockTransport, load_bot_module
+
+
+def percentile(values, q):
+    if not values: return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * (len(values) - 1) + 0.5))]
+
+
+def summarize(samples):
+    return {"n": len(samples), "p50": percentile(samples, 0.50), "p90": percentile(samples, 0.90),
+            "p99": percentile(samples, 0.99), "max": max(samples, default=0.0)}
+
+
+async def load_test(args):
+    mock = MockLichess(args.games, args.tc, args.delay, args.seed, jitter=args.jitter)
+    await mock.start()
+    if args.transport == "http":
+        client = LichessClient("mock-token", mock.url, pool_size=max(4, args.games))
+    else:
+        client = MockTransport(mock, lag=args.lag)
+
+    module = load_bot_module()
+    module.SETTINGS["MAX_PARALLEL_GAMES"] = args.games
+    module.SETTINGS["ENGINE_POOL_SIZE"] = args.engines or None
+    module.SETTINGS["ENGINE_PATH"] = args.engine
+    module.SETTINGS["ENGINE_STATS_PATH"] = None
+    module.SETTINGS["METRICS_PATH"] = None
+    module.SETTINGS["ANALYSIS_CACHE_PATH"] = args.analysis_cache
+    module.SETTINGS["BOOK_OVERLAY_PATH"] = args.overlay
+    module.SETTINGS["CLOCK_TRACE_PATH"] = args.traces
+    module.SETTINGS["BOOK_PATH"] = args.book
+    module.SETTINGS["GREETING"] = "load test"
+    module.SETTINGS["HANDOFF_PATH"] = None
+    options = {"Hash": args.hash, "Threads": args.threads}
+    bot = module.OxydanAegisV4(args.engine, uci_options=options, time_mode=args.time_mode)
+
+    started = time.monotonic()
+    task = asyncio.create_task(module.run_bot(client, {"engine": {"uci_options": options}}, bot=bot))
+    try:
+        await asyncio.wait_for(mock.finished.wait(), args.timeout)
+    except asyncio.TimeoutError:
+        print(f"⚠️ {args.timeout:.0f}s içinde tüm maçlar bitmedi.")
+    elapsed = time.monotonic() - started
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    await mock.stop()
+
+    games = list(mock.games.values())
+    statuses = {}
+    for g in games: statuses[g.status] = statuses.get(g.status, 0) + 1
+    flagged = sum(1 for g in games if g.status == "outoftime" and g.board.turn == g.bot_color)
+    return {
+        "games": args.games, "engines": bot.pool_size, "transport": args.transport, "tc": args.tc,
+        "time_mode": bot.time_mode, "elapsed": elapsed, "statuses": statuses,
+        "bot_moves": len(mock.latencies), "moves_per_sec": len(mock.latencies) / max(elapsed, 1e-9),
+        "move_latency": summarize(mock.latencies), "pool_wait": summarize(list(bot.engines.waits)),
+        "flag_losses": flagged, "illegal_moves": sum(g.illegal for g in games),
+        "transport_calls": getattr(client, "calls", None),
+        "stages": bot.metrics.snapshot()["histograms"],
+    }
+
+
+def print_report(r):
+    ms = lambda s: f"p50 {1000 * s['p50']:7.1f} | p90 {1000 * s['p90']:7.1f} | p99 {1000 * s['p99']:7.1f} | max {1000 * s['max']:7.1f} ms"
+    print(f"\n=== {r['games']} maç / {r['engines']} motor | {r['tc']} {r['time_mode']} | taşıyıcı {r['transport']} ===")
+    print(f"Süre          : {r['elapsed']:.1f}s | durumlar {r['statuses']}")
+    print(f"Bot hamlesi   : {r['bot_moves']} ({r['moves_per_sec']:.2f} hamle/sn)")
+    print(f"Hamle gecikmesi: {ms(r['move_latency'])}")
+    print(f"Havuz bekleme : {ms(r['pool_wait'])} (n={r['pool_wait']['n']})")
+    print(f"Süreden kayıp : {r['flag_losses']} | yasadışı hamle: {r['illegal_moves']}")
+    print("Aşamalar (kova üst sınırı):")
+    for name, h in sorted(r["stages"].items()):
+        if not name.startswith("stage_seconds:"): continue
+        print(f"  {name.split(':', 1)[1]:>12} | n {h['count']:5d} | ort {1000 * h['sum'] / max(1, h['count']):7.1f} ms "
+              f"| p50 ≤{1000 * h['p50']:g} ms | p99 ≤{1000 * h['p99']:g} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--engine',    default=os.path.join(ROOT, 'src', 'Ethereal'))
+    parser.add_argument('--games',     type=int,   default=4, help='eşzamanlı maç sayısı')
+    parser.add_argument('--engines',   type=int,   default=0, help='motor havuzu boyutu (0: maç + 1)')
+    parser.add_argument('--tc',        default='1+0')
+    parser.add_argument('--time-mode', default='smart')
+    parser.add_argument('--threads',   type=int,   default=1)
+    parser.add_argument('--hash',      type=int,   default=16)
+    parser.add_argument('--book',      default='', help='kitap yolu (varsayılan: kitapsız)')
+    parser.add_argument('--overlay',   default='', help='önce bakılan overlay kitabı (tools/book_builder.py)')
+    parser.add_argument('--transport', default='memory', choices=['memory', 'http'])
+    parser.add_argument('--lag',       type=float, default=0.0, help='memory taşıyıcısında çağrı başı gecikme (sn)')
+    parser.add_argument('--delay',     type=float, default=0.1, help='rakip düşünme süresi (sn)')
+    parser.add_argument('--jitter',    type=float, default=0.05)
+    parser.add_argument('--seed',      type=int,   default=1)
+    parser.add_argument('--timeout',   type=float, default=900)
+    parser.add_argument('--json',      default=None, help='raporu JSON olarak da yaz')
+    parser.add_argument('--traces',    default=None, help='maç saat izlerini bu JSONL dosyasına yaz')
+    parser.add_argument('--analysis-cache', default=None, help='kalıcı analiz önbelleği dosyası (varsayılan: kapalı)')
+    args = parser.parse_args()
+
+    report = asyncio.run(load_test(args))
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,507 @@
+"""
+Yerel sahte Lichess sunucusu (asyncio, bağımlılıksız).
+
+Bot API'sinin botun kullandığı kısmını taklit eder: olay akışı (challenge /
+gameStart), maç akışı (gameFull / gameState, chunked ndjson), hamle gönderme,
+sohbet, davet kabul/ret. Rakip her hamleden sonra `--delay` saniye bekleyip
+rastgele yasal bir hamle oynar; saatler sunucuda tutulur, süresi biten taraf
+`outoftime` ile kaybeder.
+
+Hamle gönderimine hata enjekte edilebilir: --move-latency (istek ve cevap
+ayrı ayrı 0..L sn gecikir) ve --move-faults oranında şu hatalardan biri: bağlantı
+hamle uygulanmadan kopar (drop), hamle uygulanır ama cevap gelmeden kopar
+(lost_reply) veya 503 döner (busy). Ölçüm için bkz. tools/submit_bench.py.
+
+İki taşıyıcıyla kullanılabilir: gerçek soketler üzerinden HTTP (LichessClient
+`url`i buraya yönlendirilir) veya ağ katmanını atlayan süreç içi MockTransport.
+Yük testi için bkz. tools/load_test.py.
+
+  Sunucu olarak: python tools/mock_lichess.py --port 8080 --games 4
+                 LICHESS_URL=http://127.0.0.1:8080/ python lichess-bot.py
+  Uçtan uca    : python tools/mock_lichess.py --e2e --engine ./src/Ethereal --games 2 --tc 1+0
+"""
+import argparse
+import asyncio
+import importlib.util
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import chess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from lichess_api import LichessClient, LichessError, Transport
+
+BOT_ID = "oxydan"
+
+
+class MockGame:
+    def __init__(self, game_id, bot_color, clock, inc):
+        self.id = game_id
+        self.bot_color = bot_color
+        self.board = chess.Board()
+        self.base = clock
+        self.clock = {chess.WHITE: clock, chess.BLACK: clock}
+        self.inc = inc
+        self.status = "started"
+        self.turn_started = time.monotonic()
+        self.listeners = []
+        self.illegal = 0
+        # Botun sırası geldiği an (sunucu tarafı hamle gecikmesi ölçümü için)
+        self.waiting_since = time.monotonic() if bot_color == chess.WHITE else None
+
+    def remaining(self, color):
+        if self.status == "started" and self.board.turn == color and self.board.move_stack:
+            return self.clock[color] - (time.monotonic() - self.turn_started)
+        return self.clock[color]
+
+    def state(self):
+        return {"type": "gameState", "moves": " ".join(m.uci() for m in self.board.move_stack),
+                "wtime": int(max(0, self.remaining(chess.WHITE)) * 1000),
+                "btime": int(max(0, self.remaining(chess.BLACK)) * 1000),
+                "winc": int(self.inc * 1000), "binc": int(self.inc * 1000), "status": self.status}
+
+    def full(self):
+        bot, opp = {"id": BOT_ID, "name": "Oxydan"}, {"id": "mockopponent", "name": "MockOpponent"}
+        return {"type": "gameFull", "id": self.id, "initialFen": "startpos",
+                "clock": {"initial": int(self.base * 1000), "increment": int(self.inc * 1000)},
+                "white": bot if self.bot_color == chess.WHITE else opp,
+                "black": opp if self.bot_color == chess.WHITE else bot,
+                "state": self.state()}
+
+    def publish(self):
+        state = self.state()
+        for queue in self.listeners:
+            queue.put_nowait(state)
+
+    def push(self, move):
+        # İlk hamleler saatten düşmez (Lichess'teki gibi)
+        color = self.board.turn
+        if len(self.board.move_stack) >= 2:
+            self.clock[color] -= time.monotonic() - self.turn_started
+            if self.clock[color] <= 0:
+                self.clock[color] = 0
+                self.status = "outoftime"
+                self.publish()
+                return
+            self.clock[color] += self.inc
+        self.board.push(move)
+        self.turn_started = time.monotonic()
+        if self.board.is_checkmate(): self.status = "mate"
+        elif self.board.is_game_over(claim_draw=True): self.status = "draw"
+        if self.status == "started" and self.board.turn == self.bot_color:
+            self.waiting_since = self.turn_started
+        self.publish()
+
+
+class MockLichess:
+    """
+    games: toplam açılacak maç sayısı, tc: "dakika+artış", delay/jitter: rakip
+    düşünme süresi (delay ± jitter sn). Olay akışı bağlandığında maç başına bir
+    davet gönderilir.
+    """
+
+    FAULTS = ("drop", "lost_reply", "busy")
+
+    def __init__(self, games=2, tc="1+0", delay=0.05, seed=1, jitter=0.0, move_latency=0.0, move_faults=0.0):
+        base, inc = (float(x) for x in tc.split("+"))
+        self.clock, self.inc = base * 60, inc
+        self.total = games
+        self.delay = delay
+        self.jitter = jitter
+        self.move_latency = move_latency
+        self.move_faults = move_faults
+        self.fault_counts = dict.fromkeys(self.FAULTS, 0)
+        self.rng = random.Random(seed)
+        self.latencies = []
+        self.games = {}
+        self.challenges = {}
+        self.event_queues = []
+        self.finished = asyncio.Event()
+        self.ids = itertools.count(1)
+        self.server = None
+        self.port = None
+        self.handlers = set()
+
+    # --- Sunucu ---
+    async def start(self, port=0):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self):
+        self.server.close()
+        for task in list(self.handlers): task.cancel()
+        await asyncio.gather(*self.handlers, return_exceptions=True)
+        await self.server.wait_closed()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}/"
+
+    async def handle(self, reader, writer):
+        task = asyncio.current_task()
+        self.handlers.add(task)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line: break
+                method, target, _ = line.decode().split(" ", 2)
+                headers = {}
+                while (h := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    k, _, v = h.decode().partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                url = urlsplit(target)
+                stream = await self.route(method, unquote(url.path), parse_qs(url.query), body.decode(), writer)
+                if stream: break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError, asyncio.CancelledError):
+            pass
+        finally:
+            self.handlers.discard(task)
+            writer.close()
+
+    @staticmethod
+    def reply(writer, code, payload):
+        body = json.dumps(payload).encode()
+        writer.write(f"HTTP/1.1 {code} OK\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                     f"Connection: keep-alive\r\n\r\n".encode() + body)
+
+    async def stream_to(self, writer, queue, done):
+        """Kuyruktaki olaylardan chunked ndjson akışı; done(event) True dönünce akış kapanır."""
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nTransfer-Encoding: chunked\r\n\r\n")
+        try:
+            await writer.drain()
+            while True:
+                event = await queue.get()
+                self.write_chunk(writer, event)
+                await writer.drain()
+                if done(event): break
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    @staticmethod
+    def write_chunk(writer, event):
+        data = json.dumps(event).encode() + b"\n"
+        writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+    # --- Yönlendirme ---
+    async def route(self, method, path, query, form_raw, writer):
+        parts = path.strip("/").split("/")
+
+        if path == "/api/account":
+            self.reply(writer, 200, {"id": BOT_ID, "username": "Oxydan"})
+        elif path == "/api/account/playing":
+            self.reply(writer, 200, {"nowPlaying": self.now_playing()})
+        elif path == "/api/stream/event":
+            queue = self.subscribe_events()
+            try: await self.stream_to(writer, queue, lambda e: False)
+            finally: self.event_queues.remove(queue)
+            return True
+        elif parts[:3] == ["api", "bot", "online"]:
+            self.reply(writer, 200, {})
+        elif path == "/api/users":
+            ids = [i for i in form_raw.split(",") if i]
+            self.reply(writer, 200, [self.user(i) for i in ids])
+        elif parts[:2] == ["api", "user"]:
+            self.reply(writer, 200, self.user(parts[2]))
+        elif parts[:2] == ["api", "challenge"] and len(parts) == 4:
+            ch_id, action = parts[2], parts[3]
+            if action == "accept": self.accept(ch_id)
+            self.reply(writer, 200, {"ok": True})
+        elif parts[:2] == ["api", "challenge"]:
+            self.reply(writer, 200, {"id": f"out{next(self.ids)}"})
+        elif parts[:4] == ["api", "bot", "game", "stream"]:
+            queue = self.subscribe_game(parts[4])
+            if queue is None:
+                self.reply(writer, 404, {"error": "Not found"})
+                await writer.drain()
+                return False
+            try: await self.stream_to(writer, queue, lambda e: e.get("status", "started") != "started")
+            finally: self.unsubscribe_game(parts[4], queue)
+            return True
+        elif parts[:3] == ["api", "bot", "game"] and len(parts) >= 5 and parts[4] == "move":
+            fault = self.rng.choice(self.FAULTS) if self.rng.random() < self.move_faults else None
+            if fault: self.fault_counts[fault] += 1
+            if self.move_latency: await asyncio.sleep(self.rng.uniform(0, self.move_latency))
+            if fault == "drop": raise ConnectionResetError
+            if fault == "busy":
+                self.reply(writer, 503, {"error": "Service unavailable"})
+            else:
+                ok = self.bot_move(parts[3], parts[5])
+                if fault == "lost_reply": raise ConnectionResetError
+                if self.move_latency: await asyncio.sleep(self.rng.uniform(0, self.move_latency))
+                self.reply(writer, 200 if ok else 400, {"ok": True} if ok else {"error": "Not your turn, or game already over"})
+        elif parts[:3] == ["api", "bot", "game"] and parts[-1] == "chat":
+            self.reply(writer, 200, {"ok": True})
+        else:
+            self.reply(writer, 404, {"error": "Not found"})
+        await writer.drain()
+        return False
+
+    # --- Taşıyıcıdan bağımsız API (HTTP ve MockTransport ortak) ---
+    def subscribe_events(self):
+        queue = asyncio.Queue()
+        self.event_queues.append(queue)
+        for _ in range(self.total - len(self.challenges)):
+            queue.put_nowait(self.new_challenge())
+        return queue
+
+    def subscribe_game(self, game_id):
+        game = self.games.get(game_id)
+        if game is None: return None
+        queue = asyncio.Queue()
+        game.listeners.append(queue)
+        queue.put_nowait(game.full())
+        return queue
+
+    def unsubscribe_game(self, game_id, queue):
+        game = self.games.get(game_id)
+        if game and queue in game.listeners: game.listeners.remove(queue)
+
+    def now_playing(self):
+        return [{"gameId": g.id, "color": "white" if g.bot_color == chess.WHITE else "black",
+                 "fen": g.board.fen(), "isMyTurn": g.board.turn == g.bot_color}
+                for g in self.games.values() if g.status == "started"]
+
+    def accept(self, ch_id):
+        if ch_id in self.challenges: self.start_game(self.challenges[ch_id])
+
+    @staticmethod
+    def user(user_id):
+        return {"id": user_id, "perfs": {"blitz": {"rating": 2000}}}
+
+    # --- Maç mantığı ---
+    def new_challenge(self):
+        ch_id = f"ch{next(self.ids)}"
+        self.challenges[ch_id] = ch_id
+        return {"type": "challenge", "challenge": {"id": ch_id, "challenger": {"id": "mockopponent"}}}
+
+    def start_game(self, ch_id):
+        if any(g.id == f"g{ch_id}" for g in self.games.values()): return
+        color = chess.WHITE if len(self.games) % 2 == 0 else chess.BLACK
+        game = MockGame(f"g{ch_id}", color, self.clock, self.inc)
+        self.games[game.id] = game
+        for queue in self.event_queues:
+            queue.put_nowait({"type": "gameStart", "game": {"id": game.id}})
+        if color == chess.BLACK:
+            asyncio.get_running_loop().create_task(self.opponent_move(game))
+        asyncio.get_running_loop().create_task(self.watch_flag(game))
+
+    def bot_move(self, game_id, uci):
+        game = self.games.get(game_id)
+        if game is None or game.status != "started" or game.board.turn != game.bot_color:
+            return False
+        try:
+            move = chess.Move.from_uci(uci)
+        except ValueError:
+            move = None
+        if move not in game.board.legal_moves:
+            game.illegal += 1
+            return False
+        if game.waiting_since is not None:
+            self.latencies.append(time.monotonic() - game.waiting_since)
+            game.waiting_since = None
+        game.push(move)
+        self.check_finished(game)
+        if game.status == "started":
+            asyncio.get_running_loop().create_task(self.opponent_move(game))
+        return True
+
+    async def opponent_move(self, game):
+        await asyncio.sleep(max(0.0, self.delay + self.rng.uniform(-self.jitter, self.jitter)))
+        if game.status != "started": return
+        game.push(self.rng.choice(list(game.board.legal_moves)))
+        self.check_finished(game)
+
+    async def watch_flag(self, game):
+        # Bot hiç hamle yapmazsa da saat düşsün
+        while game.status == "started":
+            await asyncio.sleep(0.1)
+            if len(game.board.move_stack) >= 2 and game.remaining(game.board.turn) <= 0:
+                game.clock[game.board.turn] = 0
+                game.status = "outoftime"
+                game.publish()
+        self.check_finished(game)
+
+    def check_finished(self, game):
+        done = [g for g in self.games.values() if g.status != "started"]
+        if len(done) >= self.total:
+            self.finished.set()
+
+    def report(self):
+        rows = []
+        for g in self.games.values():
+            loser = g.board.turn if g.status in ("mate", "outoftime") else None
+            result = "1/2" if loser is None else ("kayıp" if loser == g.bot_color else "galibiyet")
+            rows.append((g.id, g.status, result, len(g.board.move_stack), g.illegal))
+        return rows
+
+
+class MockTransport(Transport):
+    """
+    Süreç içi taşıyıcı: botun çağrılarını soket açmadan doğrudan MockLichess'e
+    iletir. lag: her çağrıya eklenen yapay ağ gecikmesi (sn).
+    """
+
+    def __init__(self, mock, lag=0.0):
+        self.mock = mock
+        self.lag = lag
+        self.calls = 0
+
+    async def _hop(self):
+        self.calls += 1
+        if self.lag: await asyncio.sleep(self.lag)
+
+    async def get_account(self):
+        await self._hop()
+        return {"id": BOT_ID, "username": "Oxydan"}
+
+    async def stream_incoming_events(self):
+        await self._hop()
+        queue = self.mock.subscribe_events()
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self.mock.event_queues.remove(queue)
+
+    async def stream_game_state(self, game_id):
+        await self._hop()
+        queue = self.mock.subscribe_game(game_id)
+        if queue is None:
+            raise LichessError(404, "Not found")
+        try:
+            while True:
+                event = await queue.get()
+                if self.lag: await asyncio.sleep(self.lag)
+                yield event
+                if event.get("status", "started") != "started": return
+        finally:
+            self.mock.unsubscribe_game(game_id, queue)
+
+    async def make_move(self, game_id, move):
+        await self._hop()
+        if not self.mock.bot_move(game_id, move):
+            raise LichessError(400, "Not your turn, or game already over")
+        return {"ok": True}
+
+    async def post_message(self, game_id, text, room="player"):
+        await self._hop()
+        return {"ok": True}
+
+    async def accept_challenge(self, challenge_id):
+        await self._hop()
+        self.mock.accept(challenge_id)
+        return {"ok": True}
+
+    async def decline_challenge(self, challenge_id, reason="generic"):
+        await self._hop()
+        return {"ok": True}
+
+    async def create_challenge(self, username, rated, clock_limit, clock_increment):
+        await self._hop()
+        return {"id": f"out{next(self.mock.ids)}"}
+
+    async def get_public_data(self, username):
+        await self._hop()
+        return self.mock.user(username)
+
+    async def get_users(self, user_ids):
+        await self._hop()
+        return [self.mock.user(i) for i in user_ids[:300]]
+
+    async def get_ongoing_games(self):
+        await self._hop()
+        return self.mock.now_playing()
+
+    async def get_online_bots(self, limit=50):
+        await self._hop()
+        return
+        yield
+
+    async def close(self):
+        pass
+
+
+def load_bot_module():
+    spec = importlib.util.spec_from_file_location("lichess_bot_module", os.path.join(ROOT, "lichess-bot.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+async def e2e(args):
+    """Botu aynı süreç içinde sahte sunucuya karşı çalıştırır ve maç sonuçlarını raporlar."""
+    mock = MockLichess(args.games, args.tc, args.delay, args.seed,
+                       move_latency=args.move_latency, move_faults=args.move_faults)
+    await mock.start()
+    module = load_bot_module()
+    module.SETTINGS["MAX_PARALLEL_GAMES"] = args.games
+    module.SETTINGS["ENGINE_PATH"] = args.engine
+    module.SETTINGS["ENGINE_STATS_PATH"] = None
+    module.SETTINGS["METRICS_PATH"] = None
+    module.SETTINGS["ANALYSIS_CACHE_PATH"] = None
+    module.SETTINGS["BOOK_OVERLAY_PATH"] = ""
+    module.SETTINGS["CLOCK_TRACE_PATH"] = None
+    module.SETTINGS["HANDOFF_PATH"] = None
+    module.SETTINGS["GREETING"] = "mock"
+    config = {"engine": {"uci_options": {"Hash": 16, "Threads": 1}, "time_mode": args.time_mode}}
+
+    started = time.monotonic()
+    bot = asyncio.create_task(module.run_bot(LichessClient("mock-token", mock.url), config))
+    try:
+        await asyncio.wait_for(mock.finished.wait(), args.timeout)
+    except asyncio.TimeoutError:
+        print(f"⚠️ {args.timeout:.0f}s içinde tüm maçlar bitmedi.")
+    bot.cancel()
+    await asyncio.gather(bot, return_exceptions=True)
+    await mock.stop()
+
+    print(f"\n{'maç':>8} | {'durum':>10} | {'sonuç':>9} | {'yarım hamle':>11} | {'yasadışı':>8}")
+    for row in mock.report():
+        print(f"{row[0]:>8} | {row[1]:>10} | {row[2]:>9} | {row[3]:>11} | {row[4]:>8}")
+    print(f"Toplam süre: {time.monotonic() - started:.1f}s")
+    if args.move_faults: print(f"Enjekte edilen hamle hataları: {mock.fault_counts}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--port',      type=int,   default=8080)
+    parser.add_argument('--games',     type=int,   default=2)
+    parser.add_argument('--tc',        default='1+0')
+    parser.add_argument('--delay',     type=float, default=0.05, help='rakip düşünme süresi (sn)')
+    parser.add_argument('--seed',      type=int,   default=1)
+    parser.add_argument('--e2e',       action='store_true', help='botu süreç içinde çalıştır')
+    parser.add_argument('--engine',    default=os.path.join(ROOT, 'src', 'Ethereal'))
+    parser.add_argument('--time-mode', default='smart')
+    parser.add_argument('--timeout',   type=float, default=600)
+    parser.add_argument('--move-latency', type=float, default=0.0, help='hamle isteği ve cevabına eklenen en fazla gecikme (sn)')
+    parser.add_argument('--move-faults',  type=float, default=0.0, help='hamle isteği hata oranı (drop/lost_reply/busy)')
+    args = parser.parse_args()
+
+    if args.e2e:
+        asyncio.run(e2e(args))
+        return
+
+    async def serve():
+        mock = MockLichess(args.games, args.tc, args.delay, args.seed,
+                           move_latency=args.move_latency, move_faults=args.move_faults)
+        await mock.start(args.port)
+        print(f"Sahte Lichess: {mock.url}")
+        await mock.finished.wait()
+        for row in mock.report(): print(row)
+        await mock.stop()
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+"""
+PGN -> nndata dönüştürücü (paralel, akış halinde, parçalı çıktı).
+
+`Ethereal nndata in out` (src/pgn.c process_pgn) tek bir sadeleştirilmiş PGN'i
+seri okur. Bu araç bir PGN arşivini (.gz/.bz2/.xz, kuruluysa .zst) akış halinde
+okur, maç sınırlarında parçalara böler ve parçaları işçi süreçlerinde aynı
+32 baytlık HalfKPSample kayıtlarına çevirir.
+
+Kayıt (src/pgn.c ile anlamlı alanları aynı, 29 bayt + 3 bayt hizalama; packed'in
+kullanılmayan kuyruğu burada sıfırdır, pgn.c'de önceki örnekten kalmış olabilir):
+  u64 occupied (şahlar hariç) | i16 eval | u8 result | u8 turn | u8 wking | u8 bking | u8 packed[15]
+  eval ve result hamle sırasındaki tarafın bakış açısındandır; packed: LSB
+  sırasıyla iki taş bir bayt (ilk taş üst nibble), taş kodu 8 * renk + tip.
+
+Örnek seçimi pgn.c ile aynı: şah çekilmemiş, oynanan hamle taktik değil
+(alma/terfi), |eval| <= 2000 ve sıra --player ile başlayan oyuncuda (iki
+oyuncu da eşleşmezse hepsi). Sonucu '*' olan maçlar atlanır.
+
+Desteklenen hamle metinleri:
+  - pgn.c'nin sadeleştirilmiş formatı: "e4 0.35 e5 -0.20 ..."
+  - standart PGN: Lichess [%eval x] (beyaz bakışı) veya cutechess "+0.15/28" (hamleyi yapanın bakışı)
+
+Ön eleme (paketlemeden önce): Elo aralığı, süre kontrolü (taban + 40 * artış sn),
+yarım hamle aralığı, aynı maçların (hamle dizisine göre) ve isteğe bağlı aynı
+pozisyonların (parça içi, zobrist) ayıklanması. Maç tekrarı bellekte küme
+tutmadan bulunur: girdi iki kez okunur, maç anahtarları --tmp'de dış sıralamayla
+karşılaştırılır (bellek sabit, disk maç başı 16 bayt).
+
+Çıktı: out_dir/shard-00000.nndata ... (başlıksız ham kayıtlar, doğrudan mmap'lenebilir)
+ve parça listesini, sayıları ve ayarları tutan out_dir/index.json.
+
+Kullanım: python tools/nndata.py games.pgn.gz data/ --workers 8 --player Oxydan
+          [--min-elo 2000] [--min-tc 180] [--min-ply 16] [--dedup-positions] [--tmp /tmp]
+"""
+import argparse
+import bz2
+import gzip
+import hashlib
+import heapq
+import io
+import json
+import lzma
+import os
+import re
+import shutil
+import struct
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import chess
+import chess.pgn
+import chess.polyglot
+
+RECORD = struct.Struct("<QhBBBB15s3x")
+RECORD_SIZE = RECORD.size   # 32, sizeof(HalfKPSample)
+PGN_LOSS, PGN_DRAW, PGN_WIN = 0, 1, 2
+RESULTS = {"0-1": PGN_LOSS, "1/2-1/2": PGN_DRAW, "1-0": PGN_WIN}
+MAX_EVAL = 2000
+
+HEADER_RE = re.compile(r'^\[(\w+)\s+"(.*)"\]\s*$')
+COMMENT_RE = re.compile(r"\{[^}]*\}")
+EVAL_RE = re.compile(r"\[%eval\s+([#+-]?[\d.]+)")
+CUTECHESS_RE = re.compile(r"([+-]?\d+\.\d+)/\d+")
+RESULT_TOKENS = {"1-0", "0-1", "1/2-1/2", "*"}
+MOVE_NUMBER_RE = re.compile(r"(?:^|\s)\d+\.(?![\d])")   # "1." / "1..." ama "0.35" değil
+
+
+# --- Girdi ---
+def open_compressed(path):
+    if path.endswith(".gz"): return gzip.open(path, "rt", errors="replace")
+    if path.endswith(".bz2"): return bz2.open(path, "rt", errors="replace")
+    if path.endswith(".xz"): return lzma.open(path, "rt", errors="replace")
+    if path.endswith(".zst"):
+        import zstandard   # İsteğe bağlı bağımlılık
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, "rb")), errors="replace")
+    return open(path, errors="replace")
+
+
+def iter_games(paths):
+    """Maç sınırlarında bölünmüş (başlık sözlüğü, hamle metni) üreticisi."""
+    for path in paths:
+        with open_compressed(path) as fin:
+            headers, moves = {}, []
+            for line in fin:
+                header = HEADER_RE.match(line) if line.startswith("[") and not line.startswith("[%") else None
+                if header and moves:
+                    yield headers, "".join(moves)
+                    headers, moves = {}, []
+                if header: headers[header.group(1)] = header.group(2)
+                elif line.strip(): moves.append(line)
+            if moves: yield headers, "".join(moves)
+
+
+def elo(headers, key):
+    try: return int(headers.get(key, 0))
+    except ValueError: return 0
+
+
+def tc_seconds(headers):
+    """Tahmini maç süresi: taban + 40 * artış (Lichess kategorileriyle aynı)."""
+    tc = headers.get("TimeControl", "-")
+    if "+" not in tc: return None
+    base, inc = tc.split("+", 1)
+    try: return float(base) + 40 * float(inc)
+    except ValueError: return None
+
+
+def game_filter(headers, args):
+    if headers.get("Result") not in RESULTS: return "result"
+    if args.min_elo or args.max_elo:
+        ratings = (elo(headers, "WhiteElo"), elo(headers, "BlackElo"))
+        if args.min_elo and min(ratings) < args.min_elo: return "elo"
+        if args.max_elo and max(ratings) > args.max_elo: return "elo"
+    if args.min_tc or args.max_tc:
+        tc = tc_seconds(headers)
+        if tc is None: return "tc"
+        if args.min_tc and tc < args.min_tc: return "tc"
+        if args.max_tc and tc > args.max_tc: return "tc"
+    return None
+
+
+def game_key(headers, movetext):
+    """Aynı maçı tanımak için: başlangıç pozisyonu + yorumsuz hamle dizisi."""
+    moves = [t for t in COMMENT_RE.sub(" ", movetext).split() if not t[0].isdigit() or t in RESULT_TOKENS]
+    return hashlib.blake2b((headers.get("FEN", "") + " ".join(moves)).encode(), digest_size=8).digest()
+
+
+# --- Maç tekrarı (dış sıralama) ---
+KEY_RUN = struct.Struct("<8sQ")   # maç anahtarı | maç sırası
+ORDINAL = struct.Struct("<Q")
+DEDUP_RUN = 1 << 18               # Run başına kayıt: bellekteki en fazla anahtar sayısı
+
+
+def read_sorted(path, fmt):
+    with open(path, "rb") as fin:
+        while chunk := fin.read(fmt.size * 4096):
+            yield from fmt.iter_unpack(chunk)
+
+
+def external_sort(items, fmt, tmp, prefix):
+    """items'ı DEDUP_RUN kayıtlık sıralı run dosyalarına yazar; birleştirilmiş sıralı akışı döndürür."""
+    paths, buf = [], []
+    def flush():
+        paths.append(os.path.join(tmp, f"{prefix}-{len(paths):05d}.run"))
+        with open(paths[-1], "wb") as fout:
+            fout.write(b"".join(fmt.pack(*item) for item in sorted(buf)))
+        buf.clear()
+    for item in items:
+        buf.append(item)
+        if len(buf) >= DEDUP_RUN: flush()
+    if buf: flush()
+    return heapq.merge(*(read_sorted(path, fmt) for path in paths))
+
+
+def duplicate_ordinals(paths, accept, tmp):
+    """Tekrar eden maçların iter_games sırası (ilk görülen hariç), artan sırayla."""
+    keys = ((game_key(h, m), i) for i, (h, m) in enumerate(iter_games(paths)) if accept(h) is None)
+    def repeats():
+        previous = None
+        for key, ordinal in external_sort(keys, KEY_RUN, tmp, "keys"):
+            if key == previous: yield (ordinal,)
+            previous = key
+    return (ordinal for (ordinal,) in external_sort(repeats(), ORDINAL, tmp, "repeats"))
+
+
+def unique_games(paths, accept, skipped, tmp=None):
+    """
+    iter_games + ön eleme (accept: başlıktan atlama sebebi ya da None) + maç
+    tekrarı ayıklama (tmp verilirse). Tekrarlar iki geçişte bulunur: önce tüm
+    maç anahtarları tmp'de dış sıralamayla karşılaştırılır (bellekte en fazla
+    DEDUP_RUN anahtar), sonra girdi yeniden okunurken tekrarlar atlanır.
+    """
+    repeats = duplicate_ordinals(paths, accept, tmp) if tmp else iter(())
+    upcoming = next(repeats, None)
+    for ordinal, (headers, movetext) in enumerate(iter_games(paths)):
+        reason = accept(headers)
+        if reason is None and ordinal == upcoming:
+            reason, upcoming = "duplicate", next(repeats, None)
+        if reason:
+            skipped[reason] += 1
+            continue
+        yield headers, movetext
+
+
+# --- Kayıt üretimi ---
+def pack_sample(board, result, eval_cp):
+    """build_halfkp_sample'ın birebir karşılığı. result: beyaz bakışı, eval_cp: sıradaki tarafın bakışı."""
+    white, black = board.occupied_co[chess.WHITE], board.occupied_co[chess.BLACK]
+    kings = board.kings
+    occupied = (white | black) & ~kings
+
+    codes, bb = [], occupied
+    while bb:
+        sq = (bb & -bb).bit_length() - 1
+        piece = board.piece_type_at(sq)
+        colour = 0 if (white >> sq) & 1 else 1
+        codes.append(8 * colour + piece - 1)
+        bb &= bb - 1
+    if len(codes) & 1: codes.append(0)
+    packed = bytes((codes[i] << 4) | codes[i + 1] for i in range(0, len(codes), 2))
+
+    turn = 0 if board.turn == chess.WHITE else 1
+    return RECORD.pack(occupied, eval_cp, result if turn == 0 else 2 - result, turn,
+                       (white & kings).bit_length() - 1, (black & kings).bit_length() - 1, packed)
+
+
+def stripped_moves(movetext):
+    """pgn.c formatı: SAN ve değerlendirme sırayla. (san, skor veya None) üretir."""
+    tokens = movetext.split()
+    for i in range(0, len(tokens), 2):
+        if tokens[i] in RESULT_TOKENS: return
+        score = tokens[i + 1] if i + 1 < len(tokens) else ""
+        try: yield tokens[i], round(100.0 * float(score))
+        except ValueError: yield tokens[i], None
+
+
+def standard_moves(game):
+    """Standart PGN: (hamle, hamleyi yapanın bakışından skor veya None) üretir."""
+    board = game.board()
+    for node in game.mainline():
+        comment = node.comment or ""
+        score = None
+        if (m := EVAL_RE.search(comment)) and not m.group(1).startswith("#"):
+            white_cp = round(100.0 * float(m.group(1)))
+            score = white_cp if board.turn == chess.WHITE else -white_cp
+        elif m := CUTECHESS_RE.search(comment):
+            score = round(100.0 * float(m.group(1)))
+        yield node.move, score
+        board.push(node.move)
+
+
+def convert_game(headers, movetext, args, seen):
+    result = RESULTS[headers["Result"]]
+    fen = headers.get("FEN")
+    chess960 = "960" in headers.get("Variant", "")
+    board = chess.Board(fen, chess960=chess960) if fen else chess.Board(chess960=chess960)
+
+    sides = {chess.WHITE: headers.get("White", "").startswith(args.player),
+             chess.BLACK: headers.get("Black", "").startswith(args.player)}
+    if not any(sides.values()): sides = {chess.WHITE: True, chess.BLACK: True}
+
+    if "{" in movetext or MOVE_NUMBER_RE.search(movetext):
+        setup = "".join(f'[{k} "{headers[k]}"]\n' for k in ("Variant", "FEN", "SetUp") if k in headers)
+        game = chess.pgn.read_game(io.StringIO(setup + "\n" + movetext))
+        moves = standard_moves(game) if game else ()
+    else:
+        moves = ((board.parse_san(san), score) for san, score in stripped_moves(movetext))
+
+    samples = []
+    for ply, (move, score) in enumerate(moves):
+        if (score is not None and abs(score) <= args.max_eval
+                and args.min_ply <= ply <= args.max_ply
+                and sides[board.turn]
+                and not board.is_check()
+                and not board.is_capture(move) and not move.promotion):
+            key = chess.polyglot.zobrist_hash(board) if seen is not None else None
+            if key is None or key not in seen:
+                if seen is not None: seen.add(key)
+                samples.append(pack_sample(board, result, score))
+        board.push(move)
+    return samples
+
+
+def convert_chunk(job):
+    """İşçi süreç: bir parça maçı tek shard dosyasına yazar."""
+    index, games, out_dir, args = job
+    seen = set() if args.dedup_positions else None
+    records, used, bad = [], 0, 0
+    for headers, movetext in games:
+        try:
+            samples = convert_game(headers, movetext, args, seen)
+        except (ValueError, AssertionError):
+            bad += 1
+            continue
+        records += samples
+        used += 1
+    name = f"shard-{index:05d}.nndata"
+    with open(os.path.join(out_dir, name), "wb") as fout:
+        fout.write(b"".join(records))
+    return {"file": name, "samples": len(records), "games": used, "bad_games": bad}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('inputs',      nargs='+', help='PGN dosyaları (.gz/.bz2/.xz/.zst olabilir)')
+    parser.add_argument('output',      help='çıktı klasörü')
+    parser.add_argument('--workers',   type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk-games', type=int, default=2000, help='parça (shard) başına maç')
+    parser.add_argument('--player',    default='Ethereal', help='örneklenen oyuncu adı öneki (pgn.c ile aynı)')
+    parser.add_argument('--min-elo',   type=int, default=0)
+    parser.add_argument('--max-elo',   type=int, default=0)
+    parser.add_argument('--min-tc',    type=float, default=0, help='taban + 40 * artış (sn)')
+    parser.add_argument('--max-tc',    type=float, default=0)
+    parser.add_argument('--min-ply',   type=int, default=0)
+    parser.add_argument('--max-ply',   type=int, default=10 ** 6)
+    parser.add_argument('--max-eval',  type=int, default=MAX_EVAL)
+    parser.add_argument('--no-dedup',  action='store_true', help='aynı maçları ayıklama')
+    parser.add_argument('--dedup-positions', action='store_true', help='parça içinde aynı pozisyonları ayıkla')
+    parser.add_argument('--tmp',       default=None, help='maç tekrarı için ara dosya klasörü')
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+    start = time.monotonic()
+    tmp = None if args.no_dedup else tempfile.mkdtemp(prefix="nndata-", dir=args.tmp)
+    skipped = {"result": 0, "elo": 0, "tc": 0, "duplicate": 0}
+    shards, pending, chunk, next_index = {}, set(), [], 0
+
+    def collect(done):
+        for future in done:
+            info = future.result()
+            shards[info["file"]] = info
+            print(f"  {info['file']}: {info['games']} maç, {info['samples']} örnek", flush=True)
+
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            def submit(games):
+                nonlocal next_index, pending
+                # Bellek sınırı: en fazla 2 * workers parça bekler
+                while len(pending) >= 2 * args.workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                pending.add(pool.submit(convert_chunk, (next_index, games, args.output, args)))
+                next_index += 1
+
+            for game in unique_games(args.inputs, lambda headers: game_filter(headers, args), skipped, tmp):
+                chunk.append(game)
+                if len(chunk) >= args.chunk_games:
+                    submit(chunk)
+                    chunk = []
+            if chunk: submit(chunk)
+            collect(wait(pending).done)
+    finally:
+        if tmp: shutil.rmtree(tmp, ignore_errors=True)
+
+    ordered = [shards[k] for k in sorted(shards)]
+    index = {
+        "format": "HalfKPSample", "record_size": RECORD_SIZE, "struct": RECORD.format,
+        "shards": ordered,
+        "samples": sum(s["samples"] for s in ordered), "games": sum(s["games"] for s in ordered),
+        "skipped": skipped, "bad_games": sum(s["bad_games"] for s in ordered),
+        "options": {k: v for k, v in vars(args).items() if k not in ("inputs", "output", "workers", "tmp")},
+        "inputs": args.inputs, "created": int(time.time()),
+    }
+    with open(os.path.join(args.output, "index.json"), "w") as fout:
+        json.dump(index, fout, indent=2)
+
+    elapsed = time.monotonic() - start
+    print(f"Bitti: {index['games']} maç -> {index['samples']} örnek, {len(ordered)} parça, {elapsed:.1f}s "
+          f"| atlanan {skipped} | bozuk {index['bad_games']}")
+
+
+if __name__ == "__main__":
+    main()
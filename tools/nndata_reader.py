@@ -0,0 +1,320 @@
+"""
+nndata okuyucu ve örnekleyici (NumPy, kopyasız).
+
+tools/nndata.py (veya `Ethereal nndata`) çıktısı olan HalfKPSample dosyalarını
+np.memmap ile yapılandırılmış dizi olarak açar; dosya RAM'e okunmaz, sadece
+dokunulan sayfalar diskten gelir. Çok GB'lık eğitim setlerini CPU'da
+pozisyon başına Python döngüsü olmadan incelemek, süzmek ve dengelemek için.
+
+  - NNData: bir klasör (index.json) ya da .nndata dosyaları üzerinde tek
+    global indeksli görünüm; take() kayıtları parçalardan toplar.
+  - decode(): paketli nibble'ları (kare, taş) dizilerine açar, vektörel.
+  - halfkp_indices(): src/nnue/accumulator.c nnue_index ile aynı HalfKP
+    özellik indeksleri (INSIZE = 20480), iki bakış için.
+  - batches(): parçalar arası karıştırılmış mini-batch'ler. Karıştırma blok
+    bazlıdır (blok sırası karışık, tampon içi tam karışık), bellek
+    tampon boyutuyla sınırlıdır ve okumalar blok içinde ardışık kalır.
+
+Bağımlılık: pip install -r tools/requirements.txt (NumPy)
+
+Kullanım: python tools/nndata_reader.py data/ --stats
+          python tools/nndata_reader.py data/ --show 5
+          python tools/nndata_reader.py data/ --bench --batch-size 16384
+          python tools/nndata_reader.py data/ --write balanced.nndata --max-eval 1500 --balance
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from nndata import PGN_DRAW, PGN_LOSS, PGN_WIN, RECORD_SIZE
+
+# struct "<QhBBBB15s3x" ile aynı yerleşim
+DTYPE = np.dtype([
+    ("occupied", "<u8"), ("eval", "<i2"), ("result", "u1"), ("turn", "u1"),
+    ("wking", "u1"), ("bking", "u1"), ("packed", "u1", (15,)), ("pad", "V3"),
+])
+assert DTYPE.itemsize == RECORD_SIZE
+
+MAX_PIECES = 30            # Şahlar hariç
+INSIZE = 20480             # src/nnue/types.h
+WHITE, BLACK = 0, 1
+SQ32_MIRROR = np.array([3, 2, 1, 0, 0, 1, 2, 3], dtype=np.int32)
+
+Batch = namedtuple("Batch", "stm nstm eval result")
+
+
+def open_shard(path):
+    """Tek dosyanın salt okunur memmap'i (boş dosya için boş dizi)."""
+    size = os.path.getsize(path)
+    if size % RECORD_SIZE:
+        raise ValueError(f"{path}: boyut {size} kayıt boyunun ({RECORD_SIZE}) katı değil")
+    if size == 0:
+        return np.empty(0, dtype=DTYPE)
+    return np.memmap(path, dtype=DTYPE, mode="r")
+
+
+class NNData:
+    """Birden çok parça üzerinde tek global indeks (0 .. len-1)."""
+
+    def __init__(self, paths):
+        self.paths = list(paths)
+        self.shards = [open_shard(p) for p in self.paths]
+        sizes = np.array([len(s) for s in self.shards], dtype=np.int64)
+        self.offsets = np.concatenate(([0], np.cumsum(sizes)))
+
+    @classmethod
+    def open(cls, target):
+        """Klasör (index.json varsa ondaki sıra, yoksa *.nndata) ya da tek dosya."""
+        if not os.path.isdir(target):
+            return cls([target])
+        index = os.path.join(target, "index.json")
+        if os.path.exists(index):
+            with open(index) as f:
+                meta = json.load(f)
+            if meta.get("record_size", RECORD_SIZE) != RECORD_SIZE:
+                raise ValueError(f"{index}: beklenmeyen kayıt boyu {meta['record_size']}")
+            names = [s["file"] for s in meta["shards"]]
+        else:
+            names = sorted(n for n in os.listdir(target) if n.endswith(".nndata"))
+        return cls(os.path.join(target, n) for n in names)
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def take(self, indices):
+        """Global indekslerdeki kayıtların kopyası (girdi sırasıyla)."""
+        indices = np.asarray(indices, dtype=np.int64)
+        out = np.empty(len(indices), dtype=DTYPE)
+        shard_of = np.searchsorted(self.offsets, indices, side="right") - 1
+        for shard in np.unique(shard_of):
+            mask = shard_of == shard
+            out[mask] = self.shards[shard][indices[mask] - self.offsets[shard]]
+        return out
+
+    def chunks(self, size=1 << 20):
+        """(global başlangıç, kayıt görünümü) parçaları; tüm veri üzerinde sabit bellekli tarama."""
+        for shard, mm in enumerate(self.shards):
+            for start in range(0, len(mm), size):
+                yield int(self.offsets[shard]) + start, mm[start:start + size]
+
+    def select(self, predicate, size=1 << 20):
+        """predicate(kayıtlar) -> bool maske; eşleşen global indeksler (int64)."""
+        parts = [base + np.flatnonzero(predicate(view)) for base, view in self.chunks(size)]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+
+# --- Çözme ---
+def decode(records):
+    """
+    (squares, codes): [N, 30] int8, LSB kare sırasıyla; boş yuvalar -1.
+    code = 8 * renk + tip (tip: 0 piyon .. 4 vezir), src/pgn.c pack_bitboard ile aynı.
+    """
+    n = len(records)
+    occupied = np.ascontiguousarray(records["occupied"]).view(np.uint8).reshape(n, 8)
+    bits = np.unpackbits(occupied, axis=1, bitorder="little")   # [N, 64], sütun = kare
+    rows, cols = np.nonzero(bits)                      # Satır içinde artan kare = LSB sırası
+    slots = np.cumsum(bits, axis=1, dtype=np.int8)[rows, cols] - 1
+    squares = np.full((n, MAX_PIECES), -1, dtype=np.int8)
+    squares[rows, slots] = cols
+
+    packed = records["packed"]
+    nibbles = np.empty((n, MAX_PIECES), dtype=np.int8)
+    nibbles[:, 0::2] = packed >> 4
+    nibbles[:, 1::2] = packed & 0xF
+    codes = np.where(squares >= 0, nibbles, np.int8(-1))  # pgn.c kuyruk baytlarını temizlemez
+    return squares, codes
+
+
+def piece_counts(records):
+    """Şahlar hariç taş sayısı (popcount(occupied))."""
+    occupied = np.ascontiguousarray(records["occupied"])
+    return np.unpackbits(occupied.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+def relative_square(colour, sq):
+    return np.where(colour == BLACK, sq ^ 56, sq)
+
+
+def halfkp_indices(records, perspective, decoded=None):
+    """
+    perspective: WHITE/BLACK ya da [N] renk dizisi. [N, 30] int32 özellik indeksi, boş yuvalar -1.
+    nnue_index(piece, relksq, colour, sq) ile aynı: 640 * sq32(mksq) + 64 * (5 * (colour == pcolour) + ptype) + mpsq
+    decoded: iki bakış için tekrar çözmemek adına decode(records) çıktısı.
+    """
+    squares, codes = decoded if decoded is not None else decode(records)
+    colour = np.broadcast_to(np.asarray(perspective, dtype=np.int32), (len(records),))[:, None]
+    king = np.where(colour == WHITE, records["wking"][:, None], records["bking"][:, None]).astype(np.int32)
+
+    relksq = relative_square(colour, king)
+    relpsq = relative_square(colour, squares.astype(np.int32))
+    flip = (relksq & 7) < 4                            # LEFT_FLANK: A-D sütunları
+    mksq = np.where(flip, relksq ^ 7, relksq)
+    mpsq = np.where(flip, relpsq ^ 7, relpsq)
+
+    sq32 = ((mksq >> 1) & ~0x3) + SQ32_MIRROR[mksq & 7]
+    ptype, pcolour = codes & 7, codes >> 3
+    index = 640 * sq32 + 64 * (5 * (colour == pcolour) + ptype) + mpsq
+    return np.where(codes >= 0, index, -1).astype(np.int32)
+
+
+def make_batch(records):
+    """Sıradaki taraf / karşı taraf özellikleri; eval (cp) ve sonuç (0, 0.5, 1) sıradakinin bakışından."""
+    turn = records["turn"].astype(np.int32)
+    decoded = decode(records)
+    return Batch(halfkp_indices(records, turn, decoded), halfkp_indices(records, 1 - turn, decoded),
+                 records["eval"].astype(np.float32), records["result"].astype(np.float32) / 2)
+
+
+def to_board(record):
+    """Tek kaydı chess.Board'a çevirir (rok/geçerken bilgisi formatta yok). İnceleme içindir."""
+    import chess
+    squares, codes = decode(record[None] if record.ndim == 0 else record[:1])
+    board = chess.Board(None)
+    for sq, code in zip(squares[0], codes[0]):
+        if sq < 0: break
+        board.set_piece_at(int(sq), chess.Piece((code & 7) + 1, chess.WHITE if code < 8 else chess.BLACK))
+    board.set_piece_at(int(record["wking"]), chess.Piece(chess.KING, chess.WHITE))
+    board.set_piece_at(int(record["bking"]), chess.Piece(chess.KING, chess.BLACK))
+    board.turn = chess.WHITE if record["turn"] == WHITE else chess.BLACK
+    return board
+
+
+# --- Örnekleme ---
+def batches(data, batch_size, selection=None, shuffle=True, seed=None, block=1 << 16,
+            buffer_blocks=32, drop_last=False, decode_batch=True):
+    """
+    Bir dönemlik mini-batch üreticisi. selection: global indeks alt kümesi (select()/balance() çıktısı).
+    Bellek: en fazla buffer_blocks * block kayıt. decode_batch=False ise ham kayıtlar döner.
+    """
+    rng = np.random.default_rng(seed)
+    total = len(selection) if selection is not None else len(data)
+    starts = np.arange(0, total, block, dtype=np.int64)
+    if shuffle: rng.shuffle(starts)
+
+    carry = np.empty(0, dtype=DTYPE)
+    for i in range(0, len(starts), buffer_blocks):
+        spans = [np.arange(s, min(s + block, total), dtype=np.int64) for s in starts[i:i + buffer_blocks]]
+        indices = np.concatenate(spans)
+        if selection is not None: indices = selection[indices]
+        if shuffle: rng.shuffle(indices)
+        records = data.take(indices)
+        if len(carry): records = np.concatenate((carry, records))
+        full = len(records) - len(records) % batch_size
+        for b in range(0, full, batch_size):
+            chunk = records[b:b + batch_size]
+            yield make_batch(chunk) if decode_batch else chunk
+        carry = records[full:]
+    if len(carry) and not drop_last:
+        yield make_batch(carry) if decode_batch else carry
+
+
+def balance(data, selection=None, seed=None):
+    """Kazanç/beraberlik/kayıp (sıradakinin bakışı) sayılarını en küçük sınıfa indiren alt küme."""
+    rng = np.random.default_rng(seed)
+    if selection is None: selection = np.arange(len(data), dtype=np.int64)
+    results = np.concatenate([data.take(selection[i:i + (1 << 20)])["result"]
+                              for i in range(0, len(selection), 1 << 20)] or [np.empty(0, np.uint8)])
+    groups = [selection[results == r] for r in (PGN_LOSS, PGN_DRAW, PGN_WIN)]
+    keep = min(len(g) for g in groups)
+    return np.sort(np.concatenate([rng.choice(g, keep, replace=False) for g in groups]))
+
+
+def write_subset(data, selection, path, size=1 << 20):
+    """Seçilen kayıtları tek .nndata dosyasına yazar (parça parça, sabit bellek)."""
+    with open(path, "wb") as fout:
+        for i in range(0, len(selection), size):
+            data.take(selection[i:i + size]).tofile(fout)
+
+
+# --- Komut satırı ---
+def print_stats(data, selection):
+    n = len(selection) if selection is not None else len(data)
+    results = np.zeros(3, dtype=np.int64)
+    evals = np.zeros(2 * 2000 // 100 + 1, dtype=np.int64)
+    pieces = np.zeros(MAX_PIECES + 1, dtype=np.int64)
+    turns = np.zeros(2, dtype=np.int64)
+    if selection is None:
+        views = (view for _, view in data.chunks())
+    else:
+        views = (data.take(selection[i:i + (1 << 20)]) for i in range(0, n, 1 << 20))
+    for view in views:
+        results += np.bincount(view["result"], minlength=3)[:3]
+        evals += np.bincount(np.clip(view["eval"].astype(np.int32) // 100 + 20, 0, len(evals) - 1), minlength=len(evals))
+        counts = piece_counts(view)
+        pieces += np.bincount(counts, minlength=MAX_PIECES + 1)[:MAX_PIECES + 1]
+        turns += np.bincount(view["turn"], minlength=2)[:2]
+
+    pct = lambda x: f"{100 * x / max(1, n):5.1f}%"
+    print(f"{n} örnek, {len(data.shards)} parça")
+    print(f"Sonuç (sıradakinin bakışı): kayıp {pct(results[0])} | beraberlik {pct(results[1])} | kazanç {pct(results[2])}")
+    print(f"Sıra: beyaz {pct(turns[0])} | siyah {pct(turns[1])}")
+    print("Eval (100 cp kovaları):")
+    for i, c in enumerate(evals):
+        if c: print(f"  {100 * (i - 20):+6d} | {c:9d} {pct(c)}")
+    print("Taş sayısı (şahlar hariç):")
+    for i, c in enumerate(pieces):
+        if c: print(f"  {i:2d} | {c:9d} {pct(c)}")
+
+
+def bench(data, args, selection):
+    start, seen, count = time.perf_counter(), 0, 0
+    for batch in batches(data, args.batch_size, selection, seed=args.seed):
+        seen += len(batch.eval)
+        count += 1
+        if args.limit and seen >= args.limit: break
+    elapsed = time.perf_counter() - start
+    print(f"{count} batch, {seen} örnek {elapsed:.2f}s: {seen / max(elapsed, 1e-9):,.0f} örnek/sn "
+          f"({1000 * elapsed / max(1, count):.1f} ms/batch, batch {args.batch_size})")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('data',         help='tools/nndata.py çıktı klasörü ya da .nndata dosyası')
+    parser.add_argument('--stats',      action='store_true', help='sonuç/eval/taş sayısı dağılımları')
+    parser.add_argument('--show',       type=int, default=0, help='rastgele N pozisyonu göster')
+    parser.add_argument('--bench',      action='store_true', help='karıştırılmış batch okuma hızı')
+    parser.add_argument('--batch-size', type=int, default=16384)
+    parser.add_argument('--limit',      type=int, default=0, help='--bench: en fazla N örnek')
+    parser.add_argument('--seed',       type=int, default=None)
+    parser.add_argument('--max-eval',   type=int, default=0, help='süz: |eval| <= N')
+    parser.add_argument('--min-pieces', type=int, default=0, help='süz: şahlar hariç en az N taş')
+    parser.add_argument('--balance',    action='store_true', help='kazanç/beraberlik/kayıp sayılarını eşitle')
+    parser.add_argument('--write',      default=None, help='süzülmüş/dengelenmiş alt kümeyi bu dosyaya yaz')
+    args = parser.parse_args()
+
+    data = NNData.open(args.data)
+    selection = None
+    if args.max_eval or args.min_pieces:
+        def keep(view):
+            mask = np.ones(len(view), dtype=bool)
+            if args.max_eval: mask &= np.abs(view["eval"].astype(np.int32)) <= args.max_eval
+            if args.min_pieces:
+                counts = piece_counts(view)
+                mask &= counts >= args.min_pieces
+            return mask
+        selection = data.select(keep)
+    if args.balance:
+        selection = balance(data, selection, args.seed)
+    if selection is not None:
+        print(f"Seçim: {len(selection)} / {len(data)} örnek")
+
+    if args.stats: print_stats(data, selection)
+    if args.show:
+        rng = np.random.default_rng(args.seed)
+        pool = selection if selection is not None else np.arange(len(data))
+        for record in data.take(rng.choice(pool, min(args.show, len(pool)), replace=False)):
+            print(f"{to_board(record).fen()} | eval {record['eval']:+d} | sonuç {record['result'] / 2:g}")
+    if args.bench: bench(data, args, selection)
+    if args.write:
+        write_subset(data, selection if selection is not None else np.arange(len(data)), args.write)
+        print(f"{args.write}: {len(selection) if selection is not None else len(data)} örnek yazıldı")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Ponder test düzeneği.
+
+Sahte bir Lichess olay akışı (FakeClient) üzerinden handle_game'i senaryolu
+rakiplere karşı oynatır ve ponder kapalı/açık durumda kaç ponderhit
+alındığını ve bizim saatimizden ne kadar süre kazanıldığını raporlar.
+
+Rakipler:
+  random : Anında rastgele yasal hamle (ponder nadiren tutar)
+  engine : Anında, kendi motoruyla sabit derinlikte hamle (motor gibi oynayan botlar)
+
+Kullanım: python tools/ponder_harness.py --engine ./src/Ethereal [--games 2] [--plies 40] [--tc 1+0]
+          [--lag 0.05] [--delay 0.3] [--cores 2]
+"""
+import argparse
+import asyncio
+import importlib.util
+import os
+import random
+import sys
+import time
+
+import chess
+import chess.engine
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def load_bot_module():
+    spec = importlib.util.spec_from_file_location("lichess_bot_module", os.path.join(ROOT, "lichess-bot.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class RandomOpponent:
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+
+    async def reply(self, board):
+        return self.rng.choice(list(board.legal_moves))
+
+    async def close(self):
+        pass
+
+
+class EngineOpponent:
+    def __init__(self, path, depth):
+        self.path = path
+        self.depth = depth
+        self.engine = None
+
+    async def reply(self, board):
+        if self.engine is None:
+            _, self.engine = await chess.engine.popen_uci(self.path)
+            await self.engine.configure({"Hash": 16})
+        return (await self.engine.play(board, chess.engine.Limit(depth=self.depth))).move
+
+    async def close(self):
+        if self.engine: await self.engine.quit()
+
+
+class FakeGame:
+    """
+    Tek maçın saatli, senaryolu olay akışı. Bot her zaman beyazdır.
+    lag: her yöndeki ağ gecikmesi, delay: rakibin düşünme süresi (sn).
+    """
+
+    def __init__(self, game_id, opponent, clock, inc, plies, lag=0.0, delay=0.0):
+        self.game_id = game_id
+        self.opponent = opponent
+        self.board = chess.Board()
+        self.clock = {chess.WHITE: clock, chess.BLACK: clock}
+        self.inc = inc
+        self.plies = plies
+        self.lag = lag
+        self.delay = delay
+        self.events = asyncio.Queue()
+        self.turn_started = time.monotonic()
+        self.our_time = 0.0
+
+    def state(self, status="started"):
+        return {"type": "gameState", "moves": " ".join(m.uci() for m in self.board.move_stack),
+                "wtime": int(self.clock[chess.WHITE] * 1000), "btime": int(self.clock[chess.BLACK] * 1000),
+                "winc": int(self.inc * 1000), "binc": int(self.inc * 1000), "status": status}
+
+    def full(self):
+        return {"type": "gameFull", "white": {"id": "oxydan"}, "black": {"id": "opponent"},
+                "initialFen": "startpos", "state": self.state()}
+
+    def play_ours(self, uci):
+        spent = time.monotonic() - self.turn_started
+        self.our_time += spent
+        self.clock[chess.WHITE] += self.inc - spent
+        self.board.push_uci(uci)
+        if self.board.is_game_over() or len(self.board.move_stack) >= self.plies:
+            self.events.put_nowait(self.state("draw"))
+            return
+        self.reply_task = asyncio.create_task(self._reply())
+
+    async def _reply(self):
+        await asyncio.sleep(self.lag)
+        start = time.monotonic()
+        move = await self.opponent.reply(self.board.copy())
+        await asyncio.sleep(max(0.0, self.delay - (time.monotonic() - start)))
+        self.clock[chess.BLACK] += self.inc - (time.monotonic() - start)
+        self.board.push(move)
+        status = "draw" if self.board.is_game_over() or len(self.board.move_stack) >= self.plies else "started"
+        self.turn_started = time.monotonic()
+        await asyncio.sleep(self.lag)
+        self.events.put_nowait(self.state(status))
+
+
+class FakeClient:
+    """LichessClient'ın handle_game'in kullandığı kısmı."""
+
+    def __init__(self, games):
+        self.games = games
+
+    async def post_message(self, game_id, text, room="player"):
+        pass
+
+    async def stream_game_state(self, game_id):
+        game = self.games[game_id]
+        game.turn_started = time.monotonic()
+        yield game.full()
+        while True:
+            event = await game.events.get()
+            yield event
+            if event["status"] != "started": return
+
+    async def make_move(self, game_id, uci):
+        self.games[game_id].play_ours(uci)
+
+
+async def run(module, args, ponder, kind):
+    module.SETTINGS["MAX_PARALLEL_GAMES"] = args.games
+    module.SETTINGS["ENGINE_STATS_PATH"] = None
+    module.SETTINGS["METRICS_PATH"] = None
+    module.SETTINGS["ANALYSIS_CACHE_PATH"] = None
+    module.SETTINGS["BOOK_OVERLAY_PATH"] = ""
+    module.SETTINGS["CLOCK_TRACE_PATH"] = None
+    module.SETTINGS["BOOK_PATH"] = ""
+    bot = module.OxydanAegisV4(args.engine, {"Hash": 16, "Threads": 1}, time_mode=args.time_mode, ponder=ponder)
+    await bot.start()
+    if bot.ponder and args.cores: bot.ponder.budget.cores = args.cores
+    base, inc = (float(x) for x in args.tc.split("+"))
+
+    games, opponents = {}, []
+    for i in range(args.games):
+        opp = RandomOpponent(i) if kind == "random" else EngineOpponent(args.engine, args.depth)
+        opponents.append(opp)
+        games[f"{kind}{i}"] = FakeGame(f"{kind}{i}", opp, base * 60, inc, args.plies, args.lag, args.delay)
+
+    client = FakeClient(games)
+    active = set(games)
+    await asyncio.gather(*(module.handle_game_wrapper(client, gid, bot, "oxydan", active) for gid in games))
+
+    used = sum(g.our_time for g in games.values())
+    moves = sum((len(g.board.move_stack) + 1) // 2 for g in games.values())
+    summary = bot.ponder.summary() if bot.ponder else {}
+    await bot.engines.close()
+    for opp in opponents: await opp.close()
+    return used, moves, summary
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--engine',    default=os.path.join(ROOT, 'src', 'Ethereal'))
+    parser.add_argument('--games',     type=int, default=2)
+    parser.add_argument('--plies',     type=int, default=40)
+    parser.add_argument('--tc',        default='1+0')
+    parser.add_argument('--depth',     type=int, default=6, help='engine rakibin derinliği')
+    parser.add_argument('--time-mode', default='native')
+    parser.add_argument('--opponents', default='random,engine')
+    parser.add_argument('--lag',       type=float, default=0.05, help='tek yön ağ gecikmesi (sn)')
+    parser.add_argument('--delay',     type=float, default=0.0, help='rakip düşünme süresi (sn)')
+    parser.add_argument('--cores',     type=int, default=0, help='çekirdek bütçesi (0: otomatik)')
+    args = parser.parse_args()
+
+    module = load_bot_module()
+    for kind in args.opponents.split(','):
+        base_used, base_moves, _ = asyncio.run(run(module, args, False, kind))
+        used, moves, s = asyncio.run(run(module, args, True, kind))
+        print(f"\n=== Rakip: {kind} ({args.games} maç, {args.tc}, {args.time_mode}) ===")
+        print(f"Ponder kapalı: {base_used:7.2f}s / {base_moves} hamle ({base_used / max(1, base_moves):.3f}s/hamle)")
+        print(f"Ponder açık  : {used:7.2f}s / {moves} hamle ({used / max(1, moves):.3f}s/hamle)")
+        print(f"Ponderhit {s['hits']} / kaçan {s['misses']} (%{100 * s['hit_rate']:.0f}) | bütçe reddi {s['denied']} "
+              f"| kesilen {s['preempted']} | isabette ponder süresi {s['ponder_time_on_hits']:.2f}s")
+        saved = base_used / max(1, base_moves) - used / max(1, moves)
+        print(f"Hamle başı kazanç: {saved:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
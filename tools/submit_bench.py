@@ -0,0 +1,155 @@
+"""
+Hamle gönderim yolu ölçümü: handle_game'i gecikme ve hata enjekte eden sahte
+Lichess'e (tools/mock_lichess.py, gerçek HTTP) karşı oynatır. Motor yerine
+sabit sürede rastgele hamle veren bir bot kullanılır; fark sadece gönderimden
+gelir.
+
+Varyantlar:
+  legacy   : eski yol, 3 deneme, aralarda 1 sn / 2 sn, her hata tekrar denenir,
+             sonraki arama gönderim bitene kadar bekler
+  deadline : MoveSender (saatle sınırlı, jitter'lı, 4xx ayrımı), gönderim beklenir
+  overlap  : MoveSender, sonraki arama gönderim onayını beklemez (lichess-bot.py)
+
+Rapor: sunucu tarafı hamle gecikmesi (botun sırası -> hamle sunucuda), süreden
+kaybedilen maçlar, gönderim sonuçları ve enjekte edilen hatalar.
+
+Kullanım: python tools/submit_bench.py [--games 4] [--tc 1+0] [--move-latency 0.08]
+          [--move-faults 0.1] [--think 0.03] [--variants legacy,deadline,overlap]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from lichess_api import LichessClient
+from metrics import Metrics
+from mock_lichess import MockLichess, load_bot_module
+from move_sender import MoveSender, SubmitResult
+from load_test import summarize
+
+
+class LegacySender:
+    """lichess-bot.py'nin önceki gönderim döngüsü (karşılaştırma için)."""
+
+    def __init__(self, client, metrics=None):
+        self.client = client
+
+    async def submit(self, game_id, move, budget):
+        started = time.monotonic()
+        for attempt in range(3):
+            try:
+                await self.client.make_move(game_id, move)
+                return SubmitResult("sent", attempt + 1, time.monotonic() - started, None)
+            except Exception as e:
+                error = e
+                await asyncio.sleep((attempt + 1) * 1)
+        return SubmitResult("failed", 3, time.monotonic() - started, repr(error))
+
+
+class TrackedSender:
+    """Gönderici sarmalayıcı: sonuçları sayar, maç başı süren gönderimi tutar."""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.inflight = {}
+        self.results = Counter()
+
+    async def submit(self, game_id, move, budget):
+        self.inflight[game_id] = asyncio.current_task()
+        result = await self.inner.submit(game_id, move, budget)
+        self.results[result.status] += 1
+        return result
+
+
+class RandomBot:
+    """handle_game'in kullandığı bot arayüzü: `think` sn sonra rastgele yasal hamle."""
+
+    def __init__(self, think, seed, sender=None):
+        self.think = think
+        self.rng = random.Random(seed)
+        self.sender = sender   # Verilirse önceki gönderim bitmeden arama başlamaz (eski davranış)
+        self.metrics = Metrics()
+        self.max_games = 0
+
+    @staticmethod
+    def to_seconds(t):
+        return (t or 0) / 1000.0
+
+    async def get_best_move(self, board, wtime, btime, winc, binc, session=None):
+        pending = self.sender.inflight.get(session.game_id) if self.sender else None
+        if pending and not pending.done():
+            await asyncio.wait({pending})
+        await asyncio.sleep(self.think)
+        return self.rng.choice(list(board.legal_moves))
+
+    async def end_game(self, game_id):
+        self.metrics.end_game(game_id)
+
+
+async def run_variant(module, variant, args):
+    mock = MockLichess(args.games, args.tc, args.delay, args.seed,
+                       move_latency=args.move_latency, move_faults=args.move_faults)
+    await mock.start()
+    client = LichessClient("mock-token", mock.url, pool_size=args.games + 2)
+    inner = LegacySender(client) if variant == "legacy" else MoveSender(client, rng=random.Random(args.seed))
+    sender = TrackedSender(inner)
+    bot = RandomBot(args.think, args.seed, sender=None if variant == "overlap" else sender)
+
+    for _ in range(args.games):
+        mock.start_game(mock.new_challenge()["challenge"]["id"])
+    started = time.monotonic()
+    active = set(mock.games)
+    tasks = [asyncio.create_task(module.handle_game_wrapper(client, game_id, bot, "oxydan", active, sender))
+             for game_id in list(mock.games)]
+    try:
+        await asyncio.wait_for(mock.finished.wait(), args.timeout)
+    except asyncio.TimeoutError:
+        print(f"⚠️ [{variant}] {args.timeout:.0f}s içinde tüm maçlar bitmedi.")
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await client.close()
+    await mock.stop()
+
+    rows = mock.report()
+    return {
+        "variant": variant, "elapsed": time.monotonic() - started, "latency": summarize(mock.latencies),
+        "flagged": sum(1 for r in rows if r[1] == "outoftime" and r[2] == "kayıp"),
+        "games": len(rows), "illegal": sum(r[4] for r in rows),
+        "results": dict(sender.results), "faults": dict(mock.fault_counts),
+    }
+
+
+async def main_async(args):
+    module = load_bot_module()
+    module.SETTINGS["GREETING"] = "bench"
+    print(f"tc {args.tc} | {args.games} maç | gecikme 0..{args.move_latency:.3f}s x2 | hata oranı %{100 * args.move_faults:.0f} "
+          f"| düşünme {args.think:.3f}s")
+    print(f"{'varyant':>9} | {'p50':>6} | {'p90':>6} | {'p99':>6} | {'max':>6} | {'süre kaybı':>10} | gönderim / enjekte hatalar")
+    for variant in args.variants.split(","):
+        r = await run_variant(module, variant, args)
+        lat = r["latency"]
+        print(f"{variant:>9} | {lat['p50']:6.3f} | {lat['p90']:6.3f} | {lat['p99']:6.3f} | {lat['max']:6.2f} | "
+              f"{r['flagged']:>4}/{r['games']:<5} | {r['results']} / {r['faults']}", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--games',        type=int,   default=4)
+    parser.add_argument('--tc',           default='1+0')
+    parser.add_argument('--delay',        type=float, default=0.02, help='rakip düşünme süresi (sn)')
+    parser.add_argument('--think',        type=float, default=0.03, help='bot düşünme süresi (sn)')
+    parser.add_argument('--move-latency', type=float, default=0.08, help='istek ve cevap başına en fazla gecikme (sn)')
+    parser.add_argument('--move-faults',  type=float, default=0.1, help='hamle isteği hata oranı')
+    parser.add_argument('--seed',         type=int,   default=1)
+    parser.add_argument('--timeout',      type=float, default=300)
+    parser.add_argument('--variants',     default='legacy,deadline,overlap')
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+lichess tablebase API'si için yerel stub sunucu.
+
+TablebaseProber'ın çevrimiçi yolunu (keep-alive oturum, zaman aşımı,
+hata sonrası bekleme, önbellek) gerçek API'ye gitmeden test etmek için.
+Her istekte ilk yasal hamleyi döndürür; gecikme ve hata oranı ayarlanabilir.
+
+Sunucu:   python tools/tablebase_stub.py --port 8765 --latency 80 --fail-rate 0.1
+          TABLEBASE_URL=http://127.0.0.1:8765/standard python -u lichess-bot.py
+Öz-test:  python tools/tablebase_stub.py --selftest
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import chess
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tablebase import TablebaseProber
+
+ENDGAMES = [
+    "8/8/8/4k3/8/8/4P3/4K3 w - - 0 1",
+    "8/8/8/8/3k4/8/3KQ3/8 w - - 0 1",
+    "8/5k2/8/8/8/2R5/3K4/8 w - - 0 1",
+    "8/8/4k3/8/2B5/2N5/3K4/8 w - - 0 1",
+    "6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1",
+]
+
+
+def make_server(port=0, latency=0.0, fail_rate=0.0, seed=1):
+    rng = random.Random(seed)
+    counters = {"requests": 0, "connections": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"   # keep-alive
+
+        def setup(self):
+            super().setup()
+            counters["connections"] += 1
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            counters["requests"] += 1
+            time.sleep(latency)
+            if rng.random() < fail_rate:
+                self._reply(503, {"error": "stub failure"})
+                return
+            fen = parse_qs(urlparse(self.path).query).get("fen", [""])[0].replace("_", " ")
+            try:
+                board = chess.Board(fen)
+            except ValueError:
+                self._reply(400, {"error": "bad fen"})
+                return
+            moves = [{"uci": m.uci(), "category": "win"} for m in list(board.legal_moves)[:1]]
+            self._reply(200, {"category": "win", "moves": moves})
+
+        def _reply(self, code, body):
+            data = json.dumps(body).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    return server, counters
+
+
+def selftest(args):
+    server, counters = make_server(0, args.latency / 1000, args.fail_rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/standard"
+
+    # Eski yol: her sorguda yeni bağlantı
+    old = []
+    for fen in ENDGAMES * args.rounds:
+        start = time.perf_counter()
+        try: requests.get(url, params={"fen": fen}, timeout=0.5)
+        except requests.RequestException: pass
+        old.append((time.perf_counter() - start) * 1000)
+    old_conns = counters["connections"]
+
+    prober = TablebaseProber(online_url=url, cooldown=1.0)
+    new = []
+    for fen in ENDGAMES * args.rounds:
+        start = time.perf_counter()
+        asyncio.run(prober.probe(chess.Board(fen), timeout=0.5))
+        new.append((time.perf_counter() - start) * 1000)
+    time.sleep(0.2)
+
+    print(f"requests.get : ort {statistics.mean(old):6.1f} ms | bağlantı {old_conns}")
+    print(f"Prober       : ort {statistics.mean(new):6.1f} ms | bağlantı {counters['connections'] - old_conns} | {prober.stats}")
+    prober.close()
+    server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--port',      type=int,   default=8765)
+    parser.add_argument('--latency',   type=float, default=50.0, help='ms')
+    parser.add_argument('--fail-rate', type=float, default=0.0)
+    parser.add_argument('--rounds',    type=int,   default=4)
+    parser.add_argument('--selftest',  action='store_true')
+    args = parser.parse_args()
+
+    if args.selftest:
+        selftest(args)
+        return
+
+    server, _ = make_server(args.port, args.latency / 1000, args.fail_rate)
+    print(f"Tablebase stub: http://127.0.0.1:{args.port}/standard")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
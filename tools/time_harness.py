@@ -0,0 +1,183 @@
+"""
+Zaman yönetimi modlarını (smart / native / hybrid) çevrimdışı karşılaştırır.
+
+Kaydedilmiş saat izlerini tekrar oynatır ve her mod için hamle başına ortalama
+süre kullanımını, maç sonu kalan süreyi ve süreden kaybetme riskini raporlar.
+
+İz kaynakları:
+  - Lichess PGN dışa aktarımı ([%clk h:mm:ss] yorumları ve TimeControl başlığı)
+  - JSONL izler, her satır bir maç:
+      {"game_id": "...", "color": "white", "clock": 60, "inc": 0,
+       "plies": [{"fen": "...", "clock": 59.2}, ...]}
+    (plies: sadece bizim hamle sıramızdaki pozisyonlar ve o andaki saatimiz)
+
+Native mod, src/timeman.c'nin ideal/max bütçesiyle modellenir; motorun
+PV kararlılığına göre erken durması/uzatması log-normal bir çarpanla,
+ağ gecikmesi ise sabit taban + ara sıra sıçrama ile simüle edilir.
+
+Kullanım: python tools/time_harness.py traces.pgn [traces.jsonl ...] [--runs 20] [--player Oxydan]
+"""
+import argparse
+import json
+import math
+import os
+import random
+import re
+import statistics
+import sys
+
+import chess
+import chess.pgn
+import yaml
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from time_manager import TIME_MODES, ethereal_budget, hybrid_cap, smart_think_time
+
+CLK_RE = re.compile(r"\[%clk (\d+):(\d+):(\d+(?:\.\d+)?)\]")
+
+
+def parse_clock(comment):
+    m = CLK_RE.search(comment or "")
+    if not m: return None
+    h, mnt, sec = m.groups()
+    return int(h) * 3600 + int(mnt) * 60 + float(sec)
+
+
+def traces_from_pgn(path, player):
+    traces = []
+    with open(path) as fin:
+        while (game := chess.pgn.read_game(fin)) is not None:
+            tc = game.headers.get("TimeControl", "-")
+            if "+" not in tc: continue
+            base, inc = (float(x) for x in tc.split("+"))
+            white = game.headers.get("White", "")
+            color = chess.WHITE if not player or player.lower() in white.lower() else chess.BLACK
+
+            plies, board = [], game.board()
+            for node in game.mainline():
+                if board.turn == color:
+                    plies.append({"fen": board.fen(), "clock": parse_clock(node.comment)})
+                board.push(node.move)
+            traces.append({"game_id": game.headers.get("Site", path), "color": color,
+                           "clock": base, "inc": inc, "plies": plies})
+    return traces
+
+
+def traces_from_jsonl(path):
+    traces = []
+    with open(path) as fin:
+        for line in fin:
+            if not line.strip(): continue
+            t = json.loads(line)
+            t["color"] = chess.WHITE if t.get("color", "white") == "white" else chess.BLACK
+            traces.append(t)
+    return traces
+
+
+def lag_sample(rng, args):
+    lag = max(0.0, rng.gauss(args.lag, args.lag / 3))
+    if rng.random() < args.spike_rate:
+        lag += rng.uniform(0.5, 1.5) * args.spike
+    return lag
+
+
+def engine_usage(rng, clock, inc, overhead, spread):
+    """Ethereal'in kendi saatle oynarken harcadığı süre (model)."""
+    ideal, hard = ethereal_budget(clock, inc, overhead)
+    if ideal <= 0: return 0.01
+    factor = math.exp(rng.gauss(0.0, spread))
+    return max(0.01, min(hard, ideal * factor))
+
+
+def simulate(trace, mode, rng, args):
+    clock, inc = float(trace["clock"]), float(trace.get("inc", 0))
+    used, min_clock = [], clock
+
+    for ply in trace["plies"]:
+        board = chess.Board(ply["fen"]) if ply.get("fen") else None
+
+        if mode == "smart":
+            think = smart_think_time(clock, inc, board, args.buffer)
+        elif mode == "native":
+            think = engine_usage(rng, clock, inc, args.overhead, args.spread)
+        elif mode == "hybrid":
+            think = engine_usage(rng, max(0.01, clock - args.buffer), inc, args.overhead, args.spread)
+            think = min(think, hybrid_cap(clock, args.buffer))
+        else:
+            raise ValueError(mode)
+
+        spent = think + lag_sample(rng, args)
+        clock -= spent
+        used.append(spent)
+        min_clock = min(min_clock, clock)
+        if clock <= 0:
+            return used, min_clock, True
+        clock += inc
+
+    return used, min_clock, False
+
+
+def recorded(trace):
+    """İzdeki gerçek saatlerden harcanan süre (karşılaştırma için)."""
+    clocks = [p.get("clock") for p in trace["plies"]]
+    if None in clocks or len(clocks) < 2: return None
+    inc = float(trace.get("inc", 0))
+    return [max(0.0, a - b + inc) for a, b in zip(clocks, clocks[1:])]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('traces', nargs='+', help='PGN veya JSONL iz dosyaları')
+    parser.add_argument('--player',     default='Oxydan', help='PGN içinde bizim oyuncu adımız')
+    parser.add_argument('--runs',       type=int,   default=20, help='Her iz için simülasyon sayısı')
+    parser.add_argument('--seed',       type=int,   default=1)
+    parser.add_argument('--lag',        type=float, default=0.12, help='Ortalama ağ gecikmesi (sn)')
+    parser.add_argument('--spike-rate', type=float, default=0.03)
+    parser.add_argument('--spike',      type=float, default=0.8, help='Gecikme sıçraması (sn)')
+    parser.add_argument('--spread',     type=float, default=0.35, help='Motor süre çarpanı log-sigma')
+    parser.add_argument('--buffer',     type=float, default=0.15, help='LATENCY_BUFFER (sn)')
+    parser.add_argument('--overhead',   type=float, default=None, help='MoveOverhead (sn), varsayılan config.yml')
+    args = parser.parse_args()
+
+    if args.overhead is None:
+        with open(os.path.join(ROOT, 'config.yml')) as f:
+            opts = yaml.safe_load(f).get('engine', {}).get('uci_options', {})
+        args.overhead = opts.get('MoveOverhead', 300) / 1000.0
+
+    traces = []
+    for path in args.traces:
+        traces += traces_from_jsonl(path) if path.endswith('.jsonl') else traces_from_pgn(path, args.player)
+    traces = [t for t in traces if t["plies"]]
+    if not traces:
+        print("İz bulunamadı.")
+        return
+
+    print(f"{len(traces)} maç, {sum(len(t['plies']) for t in traces)} hamle | MoveOverhead {args.overhead:.2f}s "
+          f"| gecikme {args.lag:.2f}s (+%{args.spike_rate * 100:.0f} sıçrama)")
+    print(f"{'mod':>9} | {'ort/hamle':>9} | {'kalan (ort)':>11} | {'min saat p5':>11} | {'<1sn':>6} | {'süre kaybı':>10}")
+
+    real = [x for t in traces if (r := recorded(t)) for x in r]
+    if real:
+        print(f"{'kayıt':>9} | {statistics.mean(real):8.2f}s | {'-':>11} | {'-':>11} | {'-':>6} | {'-':>10}")
+
+    for mode in TIME_MODES:
+        rng = random.Random(args.seed)
+        per_move, end_frac, mins, forfeits, close, n = [], [], [], 0, 0, 0
+        for trace in traces:
+            for _ in range(args.runs):
+                used, min_clock, lost = simulate(trace, mode, rng, args)
+                per_move += used
+                mins.append(min_clock)
+                start = float(trace["clock"])
+                end_frac.append(max(0.0, start - sum(used) + float(trace.get("inc", 0)) * len(used)) / start)
+                forfeits += lost
+                close += min_clock < 1.0
+                n += 1
+        p5 = sorted(mins)[int(0.05 * (len(mins) - 1))]
+        print(f"{mode:>9} | {statistics.mean(per_move):8.2f}s | {100 * statistics.mean(end_frac):10.1f}% "
+              f"| {p5:10.2f}s | {100 * close / n:5.1f}% | {100 * forfeits / n:9.1f}%")
+
+
+if __name__ == "__main__":
+    main()
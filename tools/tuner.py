@@ -0,0 +1,470 @@
+"""
+Texel tuner (src/tuner.c'nin vektörel NumPy karşılığı).
+
+src/tuner.c her TEntry'yi C'de seri dolaşır ve ayarlanacak terimler derleme
+anında (Tune* bayrakları, NTERMS) seçilir; her değişiklik yeni bir TUNE
+derlemesi ister. Bu araç:
+
+  1. `make tune` ile bir kez derlenen motorun `tunerdata` komutuyla yazılan
+     dosyayı okur: tüm 904 terimin katsayıları, TTuple ile aynı seyrek
+     (indeks, beyaz, siyah) demetler halinde.
+  2. Ayarlanacak terimleri çalışma anında seçer (--normal/--safety/--complexity,
+     --terms), diğer terimlerin demetlerini atar ve kalanları parça başına
+     kompakt dizilere yükler.
+  3. linearEvaluation / updateSingleGradient'i tüm batch üzerinde vektörel
+     hesaplar (bincount ile toplama); büyük setlerde veri --workers sürece
+     bölünür, her süreç kendi parçasının gradyanını döndürür.
+  4. Adagrad güncellemesi, K araması ve hata tuner.c ile aynıdır; sonuç
+     evaluate.c'deki biçimde yazılır (--apply ile dosyada yerinde güncellenir).
+
+Bağımlılık: pip install -r tools/requirements.txt (NumPy)
+
+Hazırlık: cd src && make tune && ./Ethereal tunerdata FENS tuner.bin
+  (FENS satırı: "<fen> [1.0]" / "[0.5]" / "[0.0]"; tuner.bin.terms terim listesi)
+
+Kullanım: python tools/tuner.py src/tuner.bin --normal --epochs 100 --workers 8
+          python tools/tuner.py src/tuner.bin --terms KnightMobility,BishopMobility --apply src/evaluate.c
+"""
+import argparse
+import math
+import multiprocessing as mp
+import re
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+NORMAL, COMPLEXITY, SAFETY = 0, 1, 2     # tuner.h: enum { NORMAL, COMPLEXITY, SAFETY }
+MG, EG = 0, 1
+WHITE, BLACK = 0, 1
+
+HEADER = np.dtype([("magic", "S8"), ("nterms", "<i4"), ("tempo", "<i4"),
+                   ("npositions", "<i8"), ("ntuples", "<i8")])
+ENTRY = np.dtype([("ntuples", "<i4"), ("seval", "<i4"), ("phase", "<i4"), ("turn", "<i4"),
+                  ("eval", "<i4", (2,)), ("safety", "<i4", (2, 2)), ("complexity", "<i4"),
+                  ("padding", "<i4"), ("result", "<f8"), ("sfactor", "<f8")])
+TUPLE = np.dtype([("index", "<u2"), ("wcoeff", "i1"), ("bcoeff", "i1")])
+MAGIC = b"ETTUNER1"
+
+Term = namedtuple("Term", "name method shape suffix start size")
+
+
+# --- Veri ---
+class TunerData:
+    """tunerdata dosyasının salt okunur görünümü (memmap; kopya yok)."""
+
+    def __init__(self, path):
+        self.path = path
+        header = np.fromfile(path, dtype=HEADER, count=1)[0]
+        if header["magic"] != MAGIC:
+            raise ValueError(f"{path}: tunerdata dosyası değil")
+        self.nterms, self.tempo = int(header["nterms"]), int(header["tempo"])
+        self.npositions, self.ntuples = int(header["npositions"]), int(header["ntuples"])
+
+        offset = HEADER.itemsize
+        self.methods = np.fromfile(path, dtype="<i4", count=self.nterms, offset=offset)
+        offset += 4 * self.nterms
+        self.cparams = np.fromfile(path, dtype="<i4", count=2 * self.nterms, offset=offset).reshape(-1, 2)
+        offset += 8 * self.nterms
+        self.entries = np.memmap(path, dtype=ENTRY, mode="r", offset=offset, shape=(self.npositions,))
+        offset += ENTRY.itemsize * self.npositions
+        self.tuples = np.memmap(path, dtype=TUPLE, mode="r", offset=offset, shape=(self.ntuples,))
+        self.offsets = np.concatenate(([0], np.cumsum(self.entries["ntuples"], dtype=np.int64)))
+        self.terms = read_terms(path + ".terms")
+
+        if sum(t.size for t in self.terms) != self.nterms:
+            raise ValueError(f"{path}.terms: terim sayısı başlıkla uyuşmuyor")
+
+
+def read_terms(path):
+    """name|method|boyutlar|sonek satırları (EXPORT_TERM makroları)."""
+    terms, start = [], 0
+    with open(path) as f:
+        for line in f:
+            name, method, dims, suffix = line.rstrip("\n").split("|", 3)
+            shape = tuple(int(d) for d in dims.split(",")) if dims else ()
+            size = math.prod(shape)
+            terms.append(Term(name, int(method), shape, suffix, start, size))
+            start += size
+    return terms
+
+
+def active_mask(data, args):
+    """Ayarlanacak terimler (tuner.h'deki Tune* bayraklarının çalışma anı karşılığı)."""
+    mask = np.zeros(data.nterms, dtype=bool)
+    wanted = set(args.terms.split(",")) if args.terms else set()
+    known = {t.name for t in data.terms}
+    if wanted - known:
+        raise SystemExit(f"Bilinmeyen terim(ler): {', '.join(sorted(wanted - known))}")
+    for term in data.terms:
+        if (term.name in wanted
+                or (args.normal and term.method == NORMAL)
+                or (args.safety and term.method == SAFETY)
+                or (args.complexity and term.method == COMPLEXITY)):
+            mask[term.start:term.start + term.size] = True
+    return mask
+
+
+class Group:
+    """Tek yöntemin (NORMAL/SAFETY/COMPLEXITY) demetleri, pozisyon sırasıyla; dar tiplerle."""
+
+    def __init__(self, index, wcoeff, bcoeff, rows, npositions):
+        self.index = index                                     # u2
+        self.wcoeff, self.bcoeff = wcoeff, bcoeff              # i1
+        self.diff = wcoeff.astype(np.int16) - bcoeff           # i2
+        self.rows = rows.astype(np.int32)
+        self.offsets = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=npositions))))
+
+    def batch(self, lo, hi):
+        """[lo, hi) pozisyonlarının dilimi ve yerel satır indeksleri."""
+        s = slice(self.offsets[lo], self.offsets[hi])
+        return s, self.rows[s] - lo
+
+
+class Shard:
+    """Bir süreçteki pozisyon aralığı; sadece etkin terimlerin demetleri, kompakt dizilerde."""
+
+    def __init__(self, path, start, stop, active):
+        data = TunerData(path)
+        self.tempo, self.nterms = data.tempo, data.nterms
+        entries = np.array(data.entries[start:stop])
+        tuples = data.tuples[data.offsets[start]:data.offsets[stop]]
+        rows = np.repeat(np.arange(len(entries), dtype=np.int32), entries["ntuples"])
+
+        index = np.asarray(tuples["index"])
+        keep = active[index]
+        method = data.methods[index]
+        self.groups = {}
+        for m in (NORMAL, SAFETY, COMPLEXITY):
+            sel = keep & (method == m)
+            self.groups[m] = Group(index[sel], np.asarray(tuples["wcoeff"])[sel],
+                                   np.asarray(tuples["bcoeff"])[sel], rows[sel], len(entries))
+        self.ntuples = sum(len(g.index) for g in self.groups.values())
+
+        self.result = entries["result"]
+        self.sfactor = entries["sfactor"]
+        self.phase = entries["phase"].astype(np.float64)
+        self.tempo_sign = np.where(entries["turn"] == WHITE, 1.0, -1.0)
+        self.eval = entries["eval"].astype(np.float64)
+        self.safety = entries["safety"].astype(np.float64)
+        self.complexity = entries["complexity"].astype(np.float64)
+        self.size = len(entries)
+
+    def evaluate(self, params, lo, hi):
+        """linearEvaluation: (E, TGradientData alanları) [lo, hi) için."""
+        n = hi - lo
+        pmg, peg = params[:, MG], params[:, EG]
+        base_safety = self.safety[lo:hi]
+
+        # Orijinal değerler + değiştirilen parametreler
+        g = self.groups[NORMAL]
+        s, rows = g.batch(lo, hi)
+        index, diff = g.index[s], g.diff[s]
+        normal_mg = self.eval[lo:hi, MG] + np.bincount(rows, diff * pmg[index], minlength=n)
+        normal_eg = self.eval[lo:hi, EG] + np.bincount(rows, diff * peg[index], minlength=n)
+
+        g = self.groups[SAFETY]
+        s, rows = g.batch(lo, hi)
+        index, w, b = g.index[s], g.wcoeff[s], g.bcoeff[s]
+        smg, seg = pmg[index], peg[index]
+        wsafety_mg = base_safety[:, WHITE, MG] + np.bincount(rows, w * smg, minlength=n)
+        wsafety_eg = base_safety[:, WHITE, EG] + np.bincount(rows, w * seg, minlength=n)
+        bsafety_mg = base_safety[:, BLACK, MG] + np.bincount(rows, b * smg, minlength=n)
+        bsafety_eg = base_safety[:, BLACK, EG] + np.bincount(rows, b * seg, minlength=n)
+
+        g = self.groups[COMPLEXITY]
+        s, rows = g.batch(lo, hi)
+        complexity_eg = self.complexity[lo:hi] + np.bincount(rows, g.wcoeff[s] * peg[g.index[s]], minlength=n)
+
+        # "normal" değere iki kez katılmış orijinal güvenlik değerini çıkar
+        owm, obm = base_safety[:, WHITE, MG], base_safety[:, BLACK, MG]
+        owe, obe = base_safety[:, WHITE, EG], base_safety[:, BLACK, EG]
+        normal_mg -= np.minimum(0, -owm * np.abs(owm) / 720.0) - np.minimum(0, -obm * np.abs(obm) / 720.0)
+        normal_eg -= np.minimum(0, -owe / 20.0) - np.minimum(0, -obe / 20.0)
+
+        safety_mg = (np.minimum(0, -wsafety_mg * np.abs(wsafety_mg) / 720.0)
+                     - np.minimum(0, -bsafety_mg * np.abs(bsafety_mg) / 720.0))
+        safety_eg = np.minimum(0, -wsafety_eg / 20.0) - np.minimum(0, -bsafety_eg / 20.0)
+        egeval = normal_eg + safety_eg
+
+        midgame = normal_mg + safety_mg
+        endgame = egeval + np.sign(egeval) * np.maximum(-np.abs(egeval), complexity_eg)
+        phase = self.phase[lo:hi]
+        mixed = (midgame * phase + endgame * (24.0 - phase) * self.sfactor[lo:hi]) / 24.0
+        E = mixed + self.tempo * self.tempo_sign[lo:hi]
+        return E, (egeval, complexity_eg, wsafety_mg, bsafety_mg, wsafety_eg, bsafety_eg)
+
+    def gradient(self, params, K, lo, hi):
+        """computeGradient/updateSingleGradient: [nterms, 2] toplam gradyan."""
+        E, (egeval, complexity, wsmg, bsmg, wseg, bseg) = self.evaluate(params, lo, hi)
+        S = sigmoid(K, E)
+        A = (self.result[lo:hi] - S) * S * (1 - S)
+        mg_base = A * self.phase[lo:hi] / 24.0
+        eg_base = A * (1 - self.phase[lo:hi] / 24.0)
+        sfactor = self.sfactor[lo:hi]
+
+        bounded = complexity >= -np.abs(egeval)
+        eg_active = (egeval == 0.0) | bounded
+        gradient = np.zeros((self.nterms, 2))
+
+        # Pozisyon başına çarpanlar; demetlere satır indeksiyle dağıtılır
+        g = self.groups[NORMAL]
+        s, rows = g.batch(lo, hi)
+        index, diff = g.index[s], g.diff[s]
+        gradient[:, MG] += np.bincount(index, mg_base[rows] * diff, minlength=self.nterms)
+        gradient[:, EG] += np.bincount(index, (eg_base * sfactor * eg_active)[rows] * diff, minlength=self.nterms)
+
+        g = self.groups[COMPLEXITY]
+        s, rows = g.batch(lo, hi)
+        factor = eg_base * np.sign(egeval) * sfactor * bounded
+        gradient[:, EG] += np.bincount(g.index[s], factor[rows] * g.wcoeff[s], minlength=self.nterms)
+
+        g = self.groups[SAFETY]
+        s, rows = g.batch(lo, hi)
+        index, w, b = g.index[s], g.wcoeff[s], g.bcoeff[s]
+        mg_w, mg_b = mg_base / 360.0 * np.maximum(wsmg, 0), mg_base / 360.0 * np.maximum(bsmg, 0)
+        eg_w, eg_b = eg_base / 20.0 * (wseg > 0) * eg_active, eg_base / 20.0 * (bseg > 0) * eg_active
+        gradient[:, MG] += np.bincount(index, mg_b[rows] * b - mg_w[rows] * w, minlength=self.nterms)
+        gradient[:, EG] += np.bincount(index, eg_b[rows] * b - eg_w[rows] * w, minlength=self.nterms)
+        return gradient
+
+    def error(self, params, K, chunk=1 << 18):
+        """tunedEvaluationErrors'ın bu parçadaki toplamı."""
+        total = 0.0
+        for lo in range(0, self.size, chunk):
+            hi = min(self.size, lo + chunk)
+            E, _ = self.evaluate(params, lo, hi)
+            total += float(np.sum((self.result[lo:hi] - sigmoid(K, E)) ** 2))
+        return total
+
+    def local_batch(self, batch, batches):
+        """Global batch -> bu parçanın [lo, hi) aralığı (parçalar orantılı katkı verir)."""
+        step = -(-self.size // batches)
+        return min(self.size, batch * step), min(self.size, (batch + 1) * step)
+
+
+def sigmoid(K, E):
+    return 1.0 / (1.0 + np.exp(-K * E / 400.0))
+
+
+# --- Süreç havuzu ---
+def shard_worker(conn, path, start, stop, active):
+    shard = Shard(path, start, stop, active)
+    conn.send(shard.ntuples)
+    while (message := conn.recv()) is not None:
+        command, params, K, batch, batches = message
+        if command == "gradient":
+            lo, hi = shard.local_batch(batch, batches)
+            conn.send((shard.gradient(params, K, lo, hi), hi - lo))
+        else:
+            conn.send(shard.error(params, K))
+
+
+class ShardPool:
+    """Her süreç sabit bir pozisyon aralığına sahip; workers=1 ise süreç açılmaz."""
+
+    def __init__(self, data, active, workers):
+        bounds = np.linspace(0, data.npositions, workers + 1).astype(np.int64)
+        self.local, self.conns, self.procs = None, [], []
+        if workers == 1:
+            self.local = Shard(data.path, 0, data.npositions, active)
+            self.ntuples = self.local.ntuples
+            return
+        ctx = mp.get_context("spawn" if sys.platform == "win32" else "fork")
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(target=shard_worker, args=(child, data.path, int(lo), int(hi), active), daemon=True)
+            proc.start()
+            self.conns.append(parent)
+            self.procs.append(proc)
+        self.ntuples = sum(conn.recv() for conn in self.conns)   # Yükleme bitti
+
+    def _all(self, message):
+        for conn in self.conns: conn.send(message)
+        return [conn.recv() for conn in self.conns]
+
+    def gradient(self, params, K, batch, batches):
+        if self.local:
+            lo, hi = self.local.local_batch(batch, batches)
+            return self.local.gradient(params, K, lo, hi), hi - lo
+        parts = self._all(("gradient", params, K, batch, batches))
+        return sum(g for g, _ in parts), sum(n for _, n in parts)
+
+    def error(self, params, K):
+        if self.local: return self.local.error(params, K)
+        return sum(self._all(("error", params, K, 0, 0)))
+
+    def close(self):
+        for conn in self.conns: conn.send(None)
+        for proc in self.procs: proc.join(timeout=5)
+
+
+# --- K ---
+def static_error(data, K, chunk=1 << 20):
+    """staticEvaluationErrors: motorun kendi statik değeriyle ortalama hata."""
+    total = 0.0
+    for lo in range(0, data.npositions, chunk):
+        entries = data.entries[lo:lo + chunk]
+        total += float(np.sum((entries["result"] - sigmoid(K, entries["seval"].astype(np.float64))) ** 2))
+    return total / data.npositions
+
+
+def optimal_k(data, precision=10):
+    """computeOptimalK ile aynı kaba-ince arama."""
+    start, end, step = -10.0, 10.0, 1.0
+    best = static_error(data, start)
+    print("Computing optimal K")
+    for epoch in range(precision):
+        curr = start - step
+        while curr < end:
+            curr += step
+            error = static_error(data, curr)
+            if error <= best:
+                best, start = error, curr
+        print(f"Epoch [{epoch}] K = [{start:.9f}] E = [{best:.9f}]")
+        end, start, step = start + step, start - step, step / 10.0
+    return start
+
+
+# --- Çıktı (print_0 .. print_3, evaluate.c biçiminde) ---
+def c_round(x):
+    return np.sign(x) * np.floor(np.abs(x) + 0.5)
+
+
+def format_term(term, values):
+    """values: [size, 2] tamsayı; evaluate.c'deki tanımla aynı yerleşim."""
+    S = lambda v: f"S({int(v[MG]):4d},{int(v[EG]):4d})"
+    head = f"const int {term.name}{term.suffix} ="
+    if not term.shape:
+        return f"{head} {S(values[0])};"
+
+    def rows(items, indent):
+        lines = [", ".join(S(v) for v in items[i:i + 4]) for i in range(0, len(items), 4)]
+        return (",\n" + indent).join(lines)
+
+    if len(term.shape) == 1:
+        if term.size < 3:
+            return f"{head} {{ {', '.join(S(v) for v in values)} }};"
+        return f"{head} {{\n    {rows(values, '    ')},\n}};"
+
+    if len(term.shape) == 2:
+        A, B = term.shape
+        body = "\n".join(f"   {{{rows(values[a * B:(a + 1) * B], '    ')}}}," for a in range(A))
+        return f"{head} {{\n{body}\n}};"
+
+    A, B, C = term.shape
+    lines = []
+    for a in range(A):
+        for b in range(B):
+            i = (a * B + b) * C
+            prefix, suffix = ("  {{" if b == 0 else "   {"), ("}}," if b == B - 1 else "},")
+            lines.append(f"{prefix}{rows(values[i:i + C], '    ')}{suffix}")
+    return f"{head} {{\n" + "\n".join(lines) + "\n};"
+
+
+def render(data, params, active):
+    """printParameters: sadece ayarlanan terimler, yuvarlanmış (cparams + params)."""
+    tparams = c_round(params + data.cparams).astype(int)
+    blocks = [format_term(t, tparams[t.start:t.start + t.size]) for t in data.terms
+              if active[t.start:t.start + t.size].any()]
+    return "\n\n".join(blocks) + "\n"
+
+
+def apply_terms(path, data, params, active):
+    """evaluate.c'deki ilgili `const int Name... = ...;` tanımlarını yerinde günceller."""
+    with open(path) as f:
+        source = f.read()
+    tparams = c_round(params + data.cparams).astype(int)
+    for term in data.terms:
+        if not active[term.start:term.start + term.size].any(): continue
+        block = format_term(term, tparams[term.start:term.start + term.size])
+        pattern = re.compile(rf"^const int {re.escape(term.name)}\b[^=]*=.*?;$", re.M | re.S)
+        source, count = pattern.subn(lambda _: block, source, count=1)
+        if not count:
+            print(f"⚠️ {path}: {term.name} tanımı bulunamadı")
+    with open(path, "w") as f:
+        f.write(source)
+
+
+# --- Ana döngü ---
+def tune(args):
+    data = TunerData(args.data)
+    active = active_mask(data, args)
+    if not active.any():
+        raise SystemExit("Ayarlanacak terim yok (--normal/--safety/--complexity/--terms)")
+
+    print(f"Tuner will be tuning 2x{int(active.sum())} Terms over {data.npositions} positions "
+          f"({args.workers} workers)")
+
+    K = args.k if args.k is not None else optimal_k(data, args.kprecision)
+    load = time.perf_counter()
+    pool = ShardPool(data, active, args.workers)
+    print(f"Loaded {pool.ntuples} / {data.ntuples} tuples in {time.perf_counter() - load:.2f}s")
+
+    params = np.zeros((data.nterms, 2))
+    adagrad = np.zeros((data.nterms, 2))
+    rate = args.rate
+    batch_size = args.batch_size or data.npositions
+    batches = max(1, -(-data.npositions // batch_size))
+
+    try:
+        for epoch in range(args.epochs):
+            start = time.perf_counter()
+            for batch in range(batches):
+                gradient, count = pool.gradient(params, K, batch, batches)
+                if not count: continue
+                gradient[~active] = 0.0
+                step = (K / 200.0) * gradient / count
+                adagrad += step ** 2
+                params += step * (rate / np.sqrt(1e-8 + adagrad))
+
+            error = pool.error(params, K) / data.npositions
+            if epoch and epoch % args.step_rate == 0: rate /= args.drop_rate
+            print(f"Epoch [{epoch}] Error = [{error:.9f}], Rate = [{rate:g}] ({time.perf_counter() - start:.2f}s)", flush=True)
+
+            if args.report and (epoch + 1) % args.report == 0:
+                write_output(args, render(data, params, active))
+    except KeyboardInterrupt:
+        print("\nDurduruldu; son parametreler yazılıyor.")
+    finally:
+        pool.close()
+
+    write_output(args, render(data, params, active))
+    if args.apply:
+        apply_terms(args.apply, data, params, active)
+        print(f"{args.apply} güncellendi")
+
+
+def write_output(args, text):
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('data',         help='`Ethereal tunerdata FENS out` çıktısı (yanında out.terms)')
+    parser.add_argument('--normal',     action='store_true', help='tüm NORMAL terimler (TuneNormal)')
+    parser.add_argument('--safety',     action='store_true', help='tüm SAFETY terimleri (TuneSafety)')
+    parser.add_argument('--complexity', action='store_true', help='tüm COMPLEXITY terimleri (TuneComplexity)')
+    parser.add_argument('--terms',      default='', help='virgülle ayrılmış terim adları (ör. KnightMobility,RookFile)')
+    parser.add_argument('--epochs',     type=int,   default=100)
+    parser.add_argument('--batch-size', type=int,   default=16384, help='0: tüm veri tek batch')
+    parser.add_argument('--rate',       type=float, default=0.10, help='LRRATE')
+    parser.add_argument('--drop-rate',  type=float, default=1.00, help='LRDROPRATE')
+    parser.add_argument('--step-rate',  type=int,   default=250,  help='LRSTEPRATE')
+    parser.add_argument('--k',          type=float, default=None, help='sabit K (varsayılan: computeOptimalK)')
+    parser.add_argument('--kprecision', type=int,   default=10)
+    parser.add_argument('--workers',    type=int,   default=1, help='parça başına bir süreç')
+    parser.add_argument('--report',     type=int,   default=50, help='her N epoch parametreleri yaz (REPORTING)')
+    parser.add_argument('--output',     default=None, help='parametreleri bu dosyaya yaz (varsayılan: stdout)')
+    parser.add_argument('--apply',      default=None, help='bitince bu evaluate.c dosyasını güncelle')
+    args = parser.parse_args()
+    tune(args)
+
+
+if __name__ == "__main__":
+    main()